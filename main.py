@@ -20,9 +20,38 @@ async def lifespan(app: FastAPI):
     from routers._store import load_global_state_from_db
     from util.utils import log_event
 
+    from database import SessionLocal
+    from services import answer_counter, schema_migrations
+
+    db = SessionLocal()
+    try:
+        # 스키마 마이그레이션 (미적용 버전만)
+        log_event("server_startup", message="Running schema migrations...")
+        schema_migrations.run_migrations(db)
+
+        # hot query 인덱스 사용 점검 (로그만)
+        for r in schema_migrations.explain_hot_queries(db):
+            if not r["uses_index"]:
+                log_event("schema_index_unused", query=r["name"], table=r["table"], error=r.get("error"))
+    except Exception as e:
+        db.rollback()
+        log_event("schema_migration_error", error=str(e))
+    finally:
+        db.close()
+
     log_event("server_startup", message="Loading global state from DB...")
     load_global_state_from_db()
 
+    # 사이클별 답변 수 카운터 재집계 (불일치 보정)
+    db = SessionLocal()
+    try:
+        answer_counter.reconcile(db)
+    except Exception as e:
+        db.rollback()
+        log_event("answer_counter_reconcile_error", error=str(e))
+    finally:
+        db.close()
+
     yield
 
     # Shutdown
@@ -1,128 +1,293 @@
 from __future__ import annotations
 
 import time
-from threading import RLock
-from typing import Dict, Any
+from collections import OrderedDict, deque
+from threading import Lock, RLock
+from types import MappingProxyType
+from typing import Any, Mapping, TYPE_CHECKING
 
-LOCK = RLock()
+from util.utils import register_cache_listener, sync_cache_version
+from util.constants import TALK_RECENT_BUFFER
 
-# 전역 상태(= psano_state 흉내) - 메모리 캐시용
-GLOBAL_STATE: Dict[str, Any] = {
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+# 전역 상태 = psano_state(id=1)의 read-through 스냅샷
+# - 읽기: get_global_state() (만료/무효화 시에만 DB 조회), 락 없이 현재 스냅샷 참조만 반환
+# - 쓰기: DB commit 후 update_global_state() / publish_global_state()
+#   → 새 읽기 전용 스냅샷을 만들어 통째로 교체 (copy-on-write, 쓰기끼리만 _state_write_lock으로 직렬화)
+GLOBAL_STATE: Mapping[str, Any] = MappingProxyType({
     "phase": "teach",              # teach / talk
     "current_question": 1,         # 1~365
-    "formed_at": None,             # timestamp(float) or None
+    "formed_at": None,             # datetime or None
     "persona_prompt": None,        # str or None
     "values_summary": None,        # dict/json or None
     "allow_talk_in_teach": True,
     "global_turn_count": 0,        # 글로벌 턴 카운트 (대화기)
     "cycle_number": 1,             # 현재 사이클 번호
-}
+    "version": 0,                  # 스냅샷 버전 (변경될 때마다 +1)
+})
+_state_write_lock = Lock()
+
+# 다른 워커의 쓰기 반영용 안전망 (주요 변경은 cache_version으로 즉시 무효화)
+STATE_SNAPSHOT_TTL = 30  # 초
+_state_loaded_at: float = 0
 
-# 세션 저장소 - 메모리 캐시용 (DB가 primary)
-SESSIONS: Dict[int, Dict[str, Any]] = {}
+# 세션 저장소 최대 개수 (넘치면 가장 오래 안 쓴 세션부터 제거)
+SESSION_STORE_MAX = 500
+# 세션 레코드 갱신용 락 스트라이프 수 (세션 id % N → 서로 다른 세션 갱신끼리는 대기 없음)
+SESSION_LOCK_STRIPES = 64
 
 
 def now_ts() -> float:
     return time.time()
 
 
-def load_global_state_from_db():
+def load_global_state_from_db(db: "Session | None" = None):
     """
-    서버 시작 시 DB에서 GLOBAL_STATE를 로드합니다.
-    DB가 없거나 오류 발생 시 기본값 유지.
+    DB에서 GLOBAL_STATE를 로드합니다. (서버 시작 시 + 스냅샷 만료 시)
+    DB가 없거나 오류 발생 시 기존 값 유지.
     """
+    global _state_loaded_at
     from database import SessionLocal
     from sqlalchemy import text
     from util.utils import log_event
 
-    db = None
+    own_db = db is None
     try:
-        db = SessionLocal()
+        if own_db:
+            db = SessionLocal()
 
-        # psano_state에서 현재 상태 로드
+        # psano_state에서 현재 상태 로드 (컬럼/슬롯 테이블은 schema_migrations에서 보장)
         result = db.execute(text("""
-            SELECT phase, current_question, persona_prompt, global_turn_count
+            SELECT phase, current_question, persona_prompt, global_turn_count, cycle_number,
+                   values_summary, formed_at
             FROM psano_state
             WHERE id = 1
-        """)).fetchone()
+        """)).mappings().first()
 
         if result:
-            with LOCK:
-                GLOBAL_STATE["phase"] = result[0] or "teach"
-                GLOBAL_STATE["current_question"] = result[1] or 1
-                GLOBAL_STATE["persona_prompt"] = result[2]
-                GLOBAL_STATE["global_turn_count"] = result[3] or 0
-
-                # talk 페이즈일 경우 formed_at 설정
-                if GLOBAL_STATE["phase"] == "talk":
-                    GLOBAL_STATE["formed_at"] = now_ts()
-
-            log_event("global_state_loaded",
-                     phase=GLOBAL_STATE["phase"],
-                     current_question=GLOBAL_STATE["current_question"],
-                     global_turn_count=GLOBAL_STATE["global_turn_count"])
+            # 글로벌 턴 수는 샤드 합계
+            from services import turn_counter
+            global_turn_count = turn_counter.get_total(db)
+
+            update_global_state(
+                phase=result.get("phase") or "teach",
+                current_question=result.get("current_question") or 1,
+                persona_prompt=result.get("persona_prompt"),
+                global_turn_count=global_turn_count,
+                cycle_number=result.get("cycle_number") or 1,
+                values_summary=result.get("values_summary"),
+                formed_at=result.get("formed_at"),
+            )
+            _state_loaded_at = now_ts()
+
+            if own_db:
+                st = GLOBAL_STATE
+                log_event("global_state_loaded",
+                         phase=st["phase"],
+                         current_question=st["current_question"],
+                         global_turn_count=st["global_turn_count"],
+                         cycle_number=st["cycle_number"])
         else:
+            _state_loaded_at = now_ts()
             log_event("global_state_load_no_data", message="psano_state id=1 not found, using defaults")
 
     except Exception as e:
         log_event("global_state_load_error", error=str(e))
     finally:
-        if db:
+        if own_db and db:
             db.close()
 
 
-def remove_session(sid: int) -> bool:
+def get_global_state(db: "Session | None" = None) -> Mapping[str, Any]:
     """
-    종료된 세션을 SESSIONS에서 삭제합니다.
-    메모리 누수 방지를 위해 세션 종료 시 호출.
+    psano_state 스냅샷 조회: 복사본이 아니라 모든 요청이 공유하는 MappingProxyType(읽기 전용)을 그대로 반환.
+    만료(STATE_SNAPSHOT_TTL)됐거나 무효화된 경우에만 DB에서 다시 읽음.
+    갱신은 update_global_state가 새 스냅샷으로 통째로 교체 → 이미 받은 스냅샷은 바뀌지 않음 (한 요청 안에서 일관된 값).
+    값을 바꿔야 하면 dict(...)로 복사해서 쓰고, 저장은 update_global_state로.
     """
-    with LOCK:
-        if sid in SESSIONS:
-            del SESSIONS[sid]
-            return True
-        return False
+    if now_ts() - _state_loaded_at >= STATE_SNAPSHOT_TTL:
+        load_global_state_from_db(db)
+    return GLOBAL_STATE
 
 
-def clear_all_sessions():
+def update_global_state(**fields: Any):
+    """DB commit 후 호출: 새 스냅샷으로 교체 + 버전 증가"""
+    global GLOBAL_STATE
+    with _state_write_lock:
+        nxt = dict(GLOBAL_STATE)
+        nxt.update(fields)
+        nxt["version"] = int(nxt.get("version") or 0) + 1
+        GLOBAL_STATE = MappingProxyType(nxt)
+
+
+def publish_global_state(db: "Session", **fields: Any):
     """
-    모든 세션을 SESSIONS에서 삭제합니다.
-    사이클 리셋 시 호출.
+    DB commit 후 호출: 스냅샷 갱신 + cache_version 증가로 다른 워커도 다시 읽게 함.
+    phase/persona/cycle처럼 드물지만 모든 워커가 바로 알아야 하는 변경용.
     """
-    with LOCK:
-        SESSIONS.clear()
+    from util.utils import bump_cache_version
+
+    update_global_state(**fields)
+    try:
+        bump_cache_version(db)
+    except Exception:
+        db.rollback()
+
+
+def invalidate_global_state():
+    """다음 get_global_state()에서 DB 재조회"""
+    global _state_loaded_at
+    _state_loaded_at = 0
 
 
-def cleanup_ended_sessions(max_keep: int = 100):
+register_cache_listener(invalidate_global_state)
+
+
+# =========================
+# 세션 저장소 (LRU)
+# - 활성 세션은 메모리 레코드가 기준: 조회는 DB 없이, 쓰기는 DB에 write-through 후 레코드 갱신
+# - 없으면 sessions에서 읽어 채움 (read-through, 다른 워커에서 시작된 세션 등)
+# - 다른 워커에서 종료된 세션은 write-through UPDATE(ended_at IS NULL 조건)가 0행이면 제거해 다시 읽게 함
+# =========================
+
+_SESSION_COLUMNS = (
+    "id", "visitor_name", "started_at", "ended_at", "end_reason",
+    "start_question_id", "idle_id", "idle_talk_memory", "idle_turn_count",
+)
+
+
+class SessionRecord:
+    """
+    sessions 한 행 (기존 dict 사용처 호환용 get/[] 지원)
+    recent: 최근 대화 메시지 버퍼 (services/talk_service, None이면 아직 DB에서 안 읽음)
     """
-    종료된 세션 중 오래된 것을 정리합니다.
-    주기적 호출 또는 세션 수가 많을 때 호출.
 
-    Args:
-        max_keep: 유지할 최대 세션 수 (기본 100)
+    __slots__ = _SESSION_COLUMNS + ("recent",)
+
+    def __init__(self, id: int, visitor_name: str | None = None, started_at=None, ended_at=None,
+                 end_reason: str | None = None, start_question_id: int | None = 1, idle_id: int | None = None,
+                 idle_talk_memory: str | None = None, idle_turn_count: int | None = 0):
+        self.id = int(id)
+        self.visitor_name = visitor_name
+        self.started_at = started_at
+        self.ended_at = ended_at
+        self.end_reason = end_reason
+        self.start_question_id = int(start_question_id or 1)
+        self.idle_id = int(idle_id) if idle_id is not None else None
+        self.idle_talk_memory = idle_talk_memory
+        self.idle_turn_count = int(idle_turn_count or 0)
+        self.recent: "deque | None" = None
+
+    @classmethod
+    def from_row(cls, row) -> "SessionRecord":
+        return cls(**{k: row.get(k) for k in _SESSION_COLUMNS})
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key)
+
+
+class SessionStore:
     """
-    from util.utils import log_event
+    LRU 세션 저장소 (OrderedDict: 조회 시 맨 뒤로, 넘치면 맨 앞 1개 제거 → O(1))
+    - _lock: OrderedDict 구조 변경(조회 순서/추가/제거)만 보호, 짧게 잡고 바로 놓음
+    - lock_for(sid): 세션 레코드 필드 갱신용 스트라이프 락 (같은 스트라이프의 세션끼리만 직렬화)
+    """
+
+    def __init__(self, max_size: int, stripes: int = SESSION_LOCK_STRIPES):
+        self.max_size = max_size
+        self._data: "OrderedDict[int, SessionRecord]" = OrderedDict()
+        self._lock = Lock()
+        self._stripes = tuple(RLock() for _ in range(max(1, stripes)))
 
-    with LOCK:
-        session_count = len(SESSIONS)
-        if session_count <= max_keep:
-            return
-
-        # 종료된 세션만 삭제 대상
-        ended_sids = [
-            sid for sid, sess in SESSIONS.items()
-            if sess.get("ended_at") is not None
-        ]
-
-        # 오래된 순으로 정렬 (started_at 기준)
-        ended_sids.sort(key=lambda sid: SESSIONS[sid].get("started_at") or 0)
-
-        # 초과분 삭제
-        to_remove = session_count - max_keep
-        removed = 0
-        for sid in ended_sids[:to_remove]:
-            if sid in SESSIONS:
-                del SESSIONS[sid]
-                removed += 1
-
-        if removed > 0:
-            log_event("sessions_cleanup", removed=removed, remaining=len(SESSIONS))
\ No newline at end of file
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def lock_for(self, sid: int) -> RLock:
+        """세션 레코드 read-modify-write용 락 (with SESSIONS.lock_for(sid): ...)"""
+        return self._stripes[int(sid) % len(self._stripes)]
+
+    def get(self, sid: int) -> SessionRecord | None:
+        with self._lock:
+            rec = self._data.get(int(sid))
+            if rec is not None:
+                self._data.move_to_end(rec.id)
+            return rec
+
+    def put(self, rec: SessionRecord):
+        with self._lock:
+            self._data[rec.id] = rec
+            self._data.move_to_end(rec.id)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def update(self, sid: int, **fields: Any) -> bool:
+        """DB commit 후 호출: 레코드 필드 갱신 (없으면 False)"""
+        with self._lock:
+            rec = self._data.get(int(sid))
+        if rec is None:
+            return False
+        with self.lock_for(rec.id):
+            for k, v in fields.items():
+                setattr(rec, k, v)
+        return True
+
+    def remove(self, sid: int) -> bool:
+        with self._lock:
+            return self._data.pop(int(sid), None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+SESSIONS = SessionStore(SESSION_STORE_MAX)
+# 다른 워커의 사이클 리셋/관리자 리셋(sessions 삭제 후 id 재사용)도 cache_version으로 반영
+register_cache_listener(SESSIONS.clear)
+
+
+def new_recent_buffer() -> deque:
+    """세션별 최근 메시지 버퍼 (오래된 항목은 maxlen으로 자동 제거)"""
+    return deque(maxlen=TALK_RECENT_BUFFER)
+
+
+def load_session(db: "Session", sid: int) -> SessionRecord | None:
+    """세션 레코드 조회 (메모리 우선, 없으면 sessions에서 읽어 채움)"""
+    sync_cache_version(db)  # 다른 워커에서 리셋됐으면 저장소부터 비움 (CACHE_VERSION_CHECK_SEC마다 1회 조회)
+    rec = SESSIONS.get(sid)
+    if rec is not None:
+        return rec
+
+    from sqlalchemy import text
+
+    row = db.execute(
+        text(f"SELECT {', '.join(_SESSION_COLUMNS)} FROM sessions WHERE id = :sid"),
+        {"sid": int(sid)}
+    ).mappings().first()
+    if not row:
+        return None
+
+    rec = SessionRecord.from_row(row)
+    SESSIONS.put(rec)
+    return rec
+
+
+def remove_session(sid: int) -> bool:
+    """
+    종료된 세션을 SESSIONS에서 삭제합니다.
+    메모리 누수 방지를 위해 세션 종료 시 호출.
+    """
+    return SESSIONS.remove(sid)
+
+
+def clear_all_sessions():
+    """
+    모든 세션을 SESSIONS에서 삭제합니다.
+    사이클 리셋 시 호출.
+    """
+    SESSIONS.clear()
@@ -4,16 +4,18 @@ import random
 from io import BytesIO
 from typing import Optional, Dict
 
-from fastapi import APIRouter, Depends, Query, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, Query, HTTPException, File, UploadFile, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from database import get_db
-from util.utils import iso, now_kst_naive, get_config, log_event, clear_config_cache, clear_prompt_cache
+from util.utils import iso, now_kst_naive, get_config, log_event, bump_cache_version
 from util.constants import MAX_QUESTIONS, ALLOWED_VALUE_KEYS
 from routers.persona import _generate_persona
-from routers._store import LOCK, GLOBAL_STATE
-from routers.talk_policy import clear_cache as clear_policy_cache
+from routers._store import publish_global_state, update_global_state, clear_all_sessions
+from services.llm_service import clear_response_cache
+from services import reaction_pool
+from services import answer_counter, schema_migrations, question_catalog, idle_catalog, turn_counter
 from schemas.admin import (
     AdminSessionsResponse, AdminProgressResponse,
     AdminResetRequest, AdminResetResponse,
@@ -279,6 +281,8 @@ async def admin_questions_import(
                 result.unchanged += 1
 
         db.commit()
+        bump_cache_version(db)
+        question_catalog.reload(db)
         return result
 
     except Exception as e:
@@ -414,6 +418,7 @@ async def admin_settings_import(
                 result.unchanged += 1
 
         db.commit()
+        bump_cache_version(db)
         return result
 
     except Exception as e:
@@ -531,6 +536,8 @@ async def admin_idle_import(
                 result.unchanged += 1
 
         db.commit()
+        bump_cache_version(db)
+        idle_catalog.reload(db)
         return result
 
     except Exception as e:
@@ -664,12 +671,7 @@ async def admin_policy_rules_import(
                 result.unchanged += 1
 
         db.commit()
-
-        # 캐시 클리어
-        try:
-            clear_policy_cache()
-        except Exception:
-            pass
+        bump_cache_version(db)
 
         return result
 
@@ -691,43 +693,23 @@ def list_sessions(
     total_row = db.execute(text("SELECT COUNT(*) AS cnt FROM sessions")).mappings().first()
     total = int(total_row["cnt"]) if total_row else 0
 
-    try:
-        rows = db.execute(
-            text("""
-                SELECT id, visitor_name, started_at, ended_at, end_reason
-                FROM sessions
-                ORDER BY started_at DESC
-                LIMIT :limit OFFSET :offset
-            """),
-            {"limit": limit, "offset": offset}
-        ).mappings().all()
-
-        sessions = [{
-            "id": int(r["id"]),
-            "visitor_name": r["visitor_name"],
-            "started_at": iso(r["started_at"]),
-            "ended_at": iso(r["ended_at"]),
-            "end_reason": r.get("end_reason"),
-        } for r in rows]
-
-    except Exception:
-        rows = db.execute(
-            text("""
-                SELECT id, visitor_name, started_at, ended_at
-                FROM sessions
-                ORDER BY started_at DESC
-                LIMIT :limit OFFSET :offset
-            """),
-            {"limit": limit, "offset": offset}
-        ).mappings().all()
-
-        sessions = [{
-            "id": int(r["id"]),
-            "visitor_name": r["visitor_name"],
-            "started_at": iso(r["started_at"]),
-            "ended_at": iso(r["ended_at"]),
-            "end_reason": None,
-        } for r in rows]
+    rows = db.execute(
+        text("""
+            SELECT id, visitor_name, started_at, ended_at, end_reason
+            FROM sessions
+            ORDER BY started_at DESC
+            LIMIT :limit OFFSET :offset
+        """),
+        {"limit": limit, "offset": offset}
+    ).mappings().all()
+
+    sessions = [{
+        "id": int(r["id"]),
+        "visitor_name": r["visitor_name"],
+        "started_at": iso(r["started_at"]),
+        "ended_at": iso(r["ended_at"]),
+        "end_reason": r.get("end_reason"),
+    } for r in rows]
 
     return {"total": total, "sessions": sessions}
 
@@ -739,7 +721,7 @@ def get_progress(db: Session = Depends(get_db)):
     global_turn_max = get_config(db, "global_turn_max", 365)
 
     st = db.execute(
-        text("SELECT phase, current_question, global_turn_count, cycle_number FROM psano_state WHERE id = 1")
+        text("SELECT phase, current_question, cycle_number FROM psano_state WHERE id = 1")
     ).mappings().first()
 
     if not st:
@@ -753,14 +735,10 @@ def get_progress(db: Session = Depends(get_db)):
     cycle_number = int(st.get("cycle_number") or 1)
 
     # 현재 사이클의 답변 수만 카운트
-    cnt_row = db.execute(
-        text("SELECT COUNT(*) AS cnt FROM answers WHERE cycle_id = :cycle_id"),
-        {"cycle_id": cycle_number}
-    ).mappings().first()
-    answered = int(cnt_row["cnt"]) if cnt_row else 0
+    answered = answer_counter.get_answered_total(db, cycle_number)
 
     ratio = float(answered) / float(max_questions) if max_questions > 0 else 0.0
-    global_turn_count = int(st.get("global_turn_count") or 0)
+    global_turn_count = turn_counter.get_total(db)
 
     return {
         "phase": phase,
@@ -774,6 +752,33 @@ def get_progress(db: Session = Depends(get_db)):
     }
 
 
+@router.post("/answer-counter/reconcile")
+def admin_answer_counter_reconcile(db: Session = Depends(get_db)):
+    """사이클별 답변 수 카운터를 answers 기준으로 재집계"""
+    try:
+        fixed = answer_counter.reconcile(db)
+        return {"ok": True, "fixed_cycles": fixed}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"db error: {e}")
+
+
+@router.get("/schema")
+def admin_schema_status(db: Session = Depends(get_db)):
+    """적용된 마이그레이션 버전 + hot query 인덱스 사용 여부 (EXPLAIN)"""
+    try:
+        applied = schema_migrations.applied_versions(db)
+        latest = schema_migrations.MIGRATIONS[-1][0]
+        return {
+            "applied_versions": applied,
+            "latest_version": latest,
+            "up_to_date": latest in applied,
+            "hot_queries": schema_migrations.explain_hot_queries(db),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"db error: {e}")
+
+
 # =========================
 # 상태 관리 (Reset, Phase, Question)
 # =========================
@@ -796,6 +801,7 @@ def admin_reset(req: AdminResetRequest, db: Session = Depends(get_db)):
 
         if req.reset_answers:
             _reset_table("answers")
+            answer_counter.reset(db)
 
         if req.reset_sessions:
             try:
@@ -814,31 +820,39 @@ def admin_reset(req: AdminResetRequest, db: Session = Depends(get_db)):
             """))
 
         if req.reset_state:
-            try:
-                db.execute(text("""
-                    UPDATE psano_state
-                    SET phase = 'teach', current_question = 1,
-                        formed_at = NULL, persona_prompt = NULL, values_summary = NULL,
-                        global_turn_count = 0
-                    WHERE id = 1
-                """))
-            except Exception:
-                db.execute(text("""
-                    UPDATE psano_state
-                    SET phase = 'teach', current_question = 1, global_turn_count = 0
-                    WHERE id = 1
-                """))
-
-            # 메모리 캐시 동기화
-            with LOCK:
-                GLOBAL_STATE["phase"] = "teach"
-                GLOBAL_STATE["current_question"] = 1
-                GLOBAL_STATE["formed_at"] = None
-                GLOBAL_STATE["persona_prompt"] = None
-                GLOBAL_STATE["values_summary"] = None
-                GLOBAL_STATE["global_turn_count"] = 0
+            db.execute(text("""
+                UPDATE psano_state
+                SET phase = 'teach', current_question = 1,
+                    formed_at = NULL, persona_prompt = NULL, values_summary = NULL,
+                    global_turn_count = 0
+                WHERE id = 1
+            """))
+            turn_counter.reset(db)
 
         db.commit()
+
+        # 메모리 캐시 동기화 (commit 후, 다른 워커에도 알림)
+        if req.reset_state:
+            publish_global_state(
+                db,
+                phase="teach",
+                current_question=1,
+                formed_at=None,
+                persona_prompt=None,
+                values_summary=None,
+                global_turn_count=0,
+            )
+        elif req.reset_sessions or req.reset_personality:
+            # sessions를 비우고 AUTO_INCREMENT도 1로 → 다른 워커의 세션 저장소가 재사용 id를 옛 레코드로 응답하지 않게
+            # personality 초기화 → 다른 워커의 선호 value 캐시도 폐기
+            bump_cache_version(db)
+
+        if req.reset_personality:
+            idle_catalog.bump_personality_version()
+
+        if req.reset_sessions:
+            clear_all_sessions()
+
         return AdminResetResponse(
             ok=True,
             reset_answers=req.reset_answers,
@@ -878,32 +892,20 @@ def admin_set_phase(req: AdminPhaseSetRequest, db: Session = Depends(get_db)):
         ensure_psano_state_row(db)
 
         if req.phase == "teach":
-            try:
-                db.execute(text("UPDATE psano_state SET phase = 'teach', formed_at = NULL WHERE id = 1"))
-            except Exception:
-                db.execute(text("UPDATE psano_state SET phase = 'teach' WHERE id = 1"))
-
-            # 메모리 캐시 동기화
-            with LOCK:
-                GLOBAL_STATE["phase"] = "teach"
-                GLOBAL_STATE["formed_at"] = None
+            db.execute(text("UPDATE psano_state SET phase = 'teach', formed_at = NULL WHERE id = 1"))
+            formed_at = None
         else:
             formed_at = now_kst_naive()
-            try:
-                db.execute(
-                    text("UPDATE psano_state SET phase = 'talk', formed_at = :formed_at WHERE id = 1"),
-                    {"formed_at": formed_at}
-                )
-            except Exception:
-                db.execute(text("UPDATE psano_state SET phase = 'talk' WHERE id = 1"))
-                formed_at = None
-
-            # 메모리 캐시 동기화
-            with LOCK:
-                GLOBAL_STATE["phase"] = "talk"
-                GLOBAL_STATE["formed_at"] = formed_at
+            db.execute(
+                text("UPDATE psano_state SET phase = 'talk', formed_at = :formed_at WHERE id = 1"),
+                {"formed_at": formed_at}
+            )
 
         db.commit()
+
+        # 메모리 캐시 동기화 (commit 후, 다른 워커에도 알림)
+        publish_global_state(db, phase=req.phase, formed_at=formed_at)
+
         return AdminPhaseSetResponse(ok=True, phase=req.phase)
 
     except Exception as e:
@@ -922,9 +924,8 @@ def admin_set_current_question(req: AdminSetCurrentQuestionRequest, db: Session
         )
         db.commit()
 
-        # 메모리 캐시 동기화
-        with LOCK:
-            GLOBAL_STATE["current_question"] = int(req.current_question)
+        # 메모리 캐시 동기화 (commit 후, 다른 워커에도 알림)
+        publish_global_state(db, current_question=int(req.current_question))
 
         return AdminSetCurrentQuestionResponse(ok=True, current_question=int(req.current_question))
 
@@ -1019,6 +1020,11 @@ def admin_personality_set(
         )
 
         db.commit()
+
+        # 선호 value 캐시 무효화 (이 워커 + 다른 워커)
+        idle_catalog.bump_personality_version()
+        bump_cache_version(db)
+
         return AdminPersonalitySetResponse(ok=True, updated=(res.rowcount == 1))
 
     except Exception as e:
@@ -1096,6 +1102,7 @@ def admin_config_update(
             )
 
         db.commit()
+        bump_cache_version(db)
         return {"ok": True, "key": key, "value": value}
 
     except HTTPException:
@@ -1106,9 +1113,9 @@ def admin_config_update(
 
 
 @router.post("/config/clear-cache")
-def admin_config_clear_cache():
-    """설정 캐시 초기화"""
-    clear_config_cache()
+def admin_config_clear_cache(db: Session = Depends(get_db)):
+    """설정 캐시 초기화 (모든 워커)"""
+    bump_cache_version(db)
     return {"ok": True, "message": "config cache cleared"}
 
 
@@ -1189,6 +1196,7 @@ def admin_prompt_update(
             )
 
         db.commit()
+        bump_cache_version(db)
         return {"ok": True, "key": key}
 
     except HTTPException:
@@ -1199,12 +1207,69 @@ def admin_prompt_update(
 
 
 @router.post("/prompts/clear-cache")
-def admin_prompts_clear_cache():
-    """프롬프트 캐시 초기화"""
-    clear_prompt_cache()
+def admin_prompts_clear_cache(db: Session = Depends(get_db)):
+    """프롬프트 캐시 초기화 (모든 워커, 이 워커의 LLM 응답 캐시 포함)"""
+    bump_cache_version(db)
+    clear_response_cache()
     return {"ok": True, "message": "prompt cache cleared"}
 
 
+# =========================
+# 반응 풀 (psano_reaction_pool)
+# =========================
+
+@router.post("/reaction-pool/generate")
+def admin_reaction_pool_generate(
+    background_tasks: BackgroundTasks,
+    per_key: Optional[int] = Query(None, ge=1, le=20),
+    question_id: Optional[int] = Query(None),
+):
+    """
+    형성기 반응 풀 생성 (백그라운드)
+    - per_key 미지정 시 psano_config.reaction_pool_size 사용
+    - question_id 지정 시 해당 질문만 생성
+    """
+    if reaction_pool.is_generating():
+        raise HTTPException(status_code=409, detail="reaction pool generation already running")
+
+    background_tasks.add_task(
+        reaction_pool.generate_pool,
+        per_key=per_key,
+        question_ids=[question_id] if question_id else None,
+    )
+    return {"ok": True, "message": "reaction pool generation started"}
+
+
+@router.get("/reaction-pool")
+def admin_reaction_pool_status(db: Session = Depends(get_db)):
+    """반응 풀 현황"""
+    try:
+        row = db.execute(
+            text("""
+                SELECT COUNT(*) AS total, COUNT(DISTINCT question_id) AS questions
+                FROM psano_reaction_pool
+            """)
+        ).mappings().first()
+        return {
+            "total": int(row["total"] or 0) if row else 0,
+            "questions": int(row["questions"] or 0) if row else 0,
+            "generating": reaction_pool.is_generating(),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"db error: {e}")
+
+
+@router.post("/reaction-pool/clear")
+def admin_reaction_pool_clear(db: Session = Depends(get_db)):
+    """반응 풀 전체 삭제 (프롬프트/성장단계 수정 후 재생성 전에)"""
+    try:
+        deleted = reaction_pool.clear_pool(db)
+        return {"ok": True, "deleted": deleted}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"db error: {e}")
+
+
 # =========================
 # Questions 조회/관리
 # =========================
@@ -1274,6 +1339,8 @@ def admin_question_toggle(
             {"id": question_id, "enabled": new_enabled}
         )
         db.commit()
+        bump_cache_version(db)
+        question_catalog.reload(db)
 
         return {"ok": True, "id": question_id, "enabled": bool(new_enabled)}
 
@@ -1357,6 +1424,7 @@ def admin_growth_stage_update(
             params
         )
         db.commit()
+        bump_cache_version(db)
 
         return {"ok": True, "stage_id": stage_id}
 
@@ -1531,17 +1599,8 @@ def admin_quick_test(
         current_qid = start_question_id
 
         for i in range(answer_count):
-            # 질문 조회
-            q = db.execute(
-                text("""
-                    SELECT id, value_a_key, value_b_key, enabled
-                    FROM questions
-                    WHERE id >= :qid AND enabled = 1
-                    ORDER BY id ASC
-                    LIMIT 1
-                """),
-                {"qid": current_qid}
-            ).mappings().first()
+            # 질문 조회 (점프 테이블)
+            q = question_catalog.next_enabled(db, current_qid)
 
             if not q:
                 break  # 더 이상 질문이 없음
@@ -1567,6 +1626,9 @@ def admin_quick_test(
 
             current_qid = qid + 1
 
+        if answers_submitted:
+            answer_counter.increment(db, current_cycle, len(answers_submitted))
+
         # 4) psano_personality 업데이트 (SQL Injection 방지: whitelist 검증)
         for ans in answers_submitted:
             col = ans["chosen_value_key"]
@@ -1577,15 +1639,7 @@ def admin_quick_test(
 
         # 5) psano_state.current_question 업데이트
         if answers_submitted:
-            next_q = db.execute(
-                text("""
-                    SELECT id FROM questions
-                    WHERE id > :last_qid AND enabled = 1
-                    ORDER BY id ASC
-                    LIMIT 1
-                """),
-                {"last_qid": answers_submitted[-1]["question_id"]}
-            ).mappings().first()
+            next_q = question_catalog.next_enabled(db, answers_submitted[-1]["question_id"] + 1)
 
             # 다음 질문이 없으면 모든 질문 완료 상태로
             new_current_q = int(next_q["id"]) if next_q else (MAX_QUESTIONS + 1)
@@ -1607,6 +1661,10 @@ def admin_quick_test(
 
         db.commit()
 
+        if answers_submitted:
+            update_global_state(current_question=new_current_q)
+            idle_catalog.bump_personality_version()
+
         return {
             "ok": True,
             "session_id": session_id,
@@ -1694,6 +1752,8 @@ def admin_idle_toggle(
             {"id": idle_id, "enable": new_enable}
         )
         db.commit()
+        bump_cache_version(db)
+        idle_catalog.reload(db)
 
         return {"ok": True, "id": idle_id, "enable": bool(new_enable)}
 
@@ -1781,9 +1841,7 @@ def admin_policy_rule_toggle(
             {"id": rule_id, "enabled": new_enabled}
         )
         db.commit()
-
-        # 캐시 클리어
-        clear_policy_cache()
+        bump_cache_version(db)
 
         return {"ok": True, "id": rule_id, "enabled": new_enabled}
 
@@ -1,241 +1,183 @@
 import time
+import asyncio
 import logging
+from collections import OrderedDict
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from pymysql.constants.ER import DUP_ENTRY as ER_DUP_ENTRY
 
-from database import get_db
+from database import get_db, SessionLocal
 
 logger = logging.getLogger("psano")
 from schemas.answer import AnswerRequest, AnswerResponse
-from services.llm_service import call_llm
-from util.utils import load_growth_stage, get_config, get_prompt
+from services.llm_service import acall_llm
+from services import reaction_pool
+from services import answer_counter
+from services import question_catalog
+from services.reaction_prompt import build_reaction_request, reaction_cache_key, reaction_stage_id
+from routers._store import get_global_state
+from util.utils import get_config
 from util.constants import ALLOWED_VALUE_KEYS, DEFAULT_SESSION_QUESTION_LIMIT
 
 router = APIRouter()
 
-# 하드코딩 fallback (DB 없을 때)
-_DEFAULT_FALLBACK_REACTIONS = ["흠, 그렇구나.", "알겠어.", "오케이."]
-_DEFAULT_FALLBACK_LAST = "좋아. 오늘은 여기까지 해보자."
+# 다음 질문 반응 prefetch 캐시: (session_id, question_id, choice) → (만료 시각, 반응)
+# (이벤트 루프에서만 접근 → 락 없음, LRU로 크기 제한: 넘치면 가장 오래된 항목부터 제거)
+PREFETCH_TTL_SEC = 300
+PREFETCH_MAX = 1000  # 세션당 A/B 2개 × 세션 저장소 크기(SESSION_STORE_MAX)
+_PREFETCH: "OrderedDict[tuple[int, int, str], tuple[float, str]]" = OrderedDict()
+_prefetch_tasks: set[asyncio.Task] = set()
 
 
-def _build_style_guide(db: Session, stage) -> str:
-    """성장단계에 따른 스타일 가이드 생성 (임계값 DB에서 로드)"""
-    if not stage:
-        return ""
-
-    metaphor = float(stage.get("metaphor_density") or 0.3)
-    certainty = float(stage.get("certainty") or 0.4)
-    empathy = float(stage.get("empathy_level") or 0.6)
-
-    # 임계값 DB에서 로드
-    metaphor_low = get_config(db, "style_metaphor_low", 0.25)
-    metaphor_high = get_config(db, "style_metaphor_high", 0.45)
-    certainty_low = get_config(db, "style_certainty_low", 0.45)
-    empathy_high = get_config(db, "style_empathy_high", 0.70)
-
-    guides = []
-    if metaphor <= metaphor_low:
-        guides.append("은유 없이 직접적으로")
-    elif metaphor >= metaphor_high:
-        guides.append("은유적으로")
-
-    if certainty <= certainty_low:
-        guides.append("조심스럽게")
-
-    if empathy >= empathy_high:
-        guides.append("공감하며")
-
-    return ", ".join(guides) if guides else "담백하게"
+def _reaction_request(
+    db: Session,
+    question_id: int,
+    question_text: str,
+    choice: str,
+    chosen_value_key: str,
+    session_question_index: int,
+    answered_total: int,
+    is_last: bool,
+    next_question_text: str = "",
+) -> tuple[str, str, int, tuple]:
+    """반응 프롬프트 + 응답 캐시 키 (DB 조회 포함 → threadpool에서 호출)"""
+    prompt, fallback_text, max_tokens = build_reaction_request(
+        db, question_text, choice, chosen_value_key, session_question_index, answered_total, next_question_text
+    )
+    return prompt, fallback_text, max_tokens, reaction_cache_key(db, question_id, choice, answered_total, is_last)
 
 
-def _reaction_text_gpt(
+async def _reaction_text_gpt(
     db: Session,
+    question_id: int,
     question_text: str,
     choice: str,
     chosen_value_key: str,
     session_question_index: int,
     answered_total: int,
+    is_last: bool,
     next_question_text: str = "",
 ) -> str:
     """유저 답변에 GPT가 성장단계 스타일로 짧게 반응"""
-    # 설정 로드
-    session_limit = get_config(db, "session_question_limit", DEFAULT_SESSION_QUESTION_LIMIT)
-    fallback_reactions = get_config(db, "fallback_reactions", _DEFAULT_FALLBACK_REACTIONS)
-    fallback_last = get_config(db, "fallback_reaction_last", _DEFAULT_FALLBACK_LAST)
-    reaction_max_tokens = get_config(db, "reaction_max_tokens", 50)
-
-    is_last = session_question_index >= session_limit
-
-    # 성장단계 로드
-    stage = load_growth_stage(db, answered_total) or {}
-    stage_name = stage.get("stage_name_kr") or "태동기"
-    style_guide = _build_style_guide(db, stage)
-    notes = (stage.get("notes") or "").strip()
-
-    # 프롬프트 템플릿 로드 (DB에서)
-    prompt_template = get_prompt(db, "reaction_prompt", "")
-
-    if prompt_template:
-        # DB 템플릿 사용
-        notes_line = f"[말투 예시: {notes}]" if notes else ""
-        last_instruction = '마지막이니까 "오늘은 여기까지" 느낌으로' if is_last else "다음으로 넘어가는 느낌"
-
-        prompt = prompt_template.format(
-            stage_name=stage_name,
-            style_guide=style_guide,
-            notes_line=notes_line,
-            question_text=question_text,
-            current_question_text=question_text,  # 템플릿 호환용 별칭
-            next_question_text=next_question_text,
-            choice=choice,
-            session_question_index=session_question_index,
-            session_question_limit=session_limit,
-            last_instruction=last_instruction,
-        )
-    else:
-        # fallback: 하드코딩 프롬프트
-        prompt = f"""너는 전시 작품 '사노'야. 관람객이 질문에 답했어.
-
-[성장단계: {stage_name}]
-[스타일: {style_guide}]
-{f'[말투 예시: {notes}]' if notes else ''}
-
-질문: {question_text}
-선택: {choice}
-진행: {session_question_index}/{session_limit}
-
-규칙:
-- 한국어, 30자 이내
-- 판단/평가 금지
-- 가볍게 수긍하거나 호기심 표현
-- {'마지막이니까 "오늘은 여기까지" 느낌으로' if is_last else '다음으로 넘어가는 느낌'}
-- 위 [말투 예시]의 톤과 어미를 참고해서 말해
-
-한 문장으로 반응해줘."""
-
-    # fallback 텍스트 결정
-    if is_last:
-        fallback_text = fallback_last
-    else:
-        fallback_text = fallback_reactions[int(time.time()) % len(fallback_reactions)]
+    prompt, fallback_text, reaction_max_tokens, cache_key = await run_in_threadpool(
+        _reaction_request,
+        db,
+        question_id,
+        question_text,
+        choice,
+        chosen_value_key,
+        session_question_index,
+        answered_total,
+        is_last,
+        next_question_text,
+    )
 
     # LLM 호출 (설정: psano_config에서 로드)
-    result = call_llm(
+    result = await acall_llm(
         prompt,
         db=db,
         max_tokens=reaction_max_tokens,
         fallback_text=fallback_text,
+        cache=True,  # 성장단계 × 질문 × 선택 → 같은 반응을 세션/사이클 간 재사용
+        cache_key=cache_key,
     )
 
     return result.content
 
 
-def _post_answer_core(db: Session, sid: int, qid: int, choice: str):
-    """답변 처리 핵심 로직 (POST/GET 공용)"""
+def _insert_answer(db: Session, sid: int, qid: int, choice: str, reaction_text: str | None = None) -> dict:
+    """
+    답변 검증 + 저장 + 다음 질문 조회 (DB 작업만, LLM 호출 전 단계)
+    짧은 트랜잭션 1개: 세션+답변수 조회 → 카운터 증가 → (반응 풀 조회) → INSERT(반응 포함) → commit
+    - 중복 제출은 UNIQUE(session_id, question_id) 위반으로 판별
+    - reaction_text(prefetch) 또는 풀 반응이 있으면 INSERT에 같이 저장 (이후 UPDATE 없음)
+    """
 
     # 설정 로드
     session_limit = get_config(db, "session_question_limit", DEFAULT_SESSION_QUESTION_LIMIT)
+    prefetch_enabled = bool(get_config(db, "reaction_prefetch_enabled", False))
 
-    # 현재 사이클 번호 조회
-    cycle_row = db.execute(
-        text("SELECT cycle_number FROM psano_state WHERE id = 1")
-    ).mappings().first()
-    current_cycle = int(cycle_row["cycle_number"]) if cycle_row else 1
-
-    # 0) 세션 존재/종료 체크 + start_question_id 조회
-    ses = db.execute(
-        text("SELECT id, ended_at, start_question_id FROM sessions WHERE id = :sid"),
-        {"sid": sid}
-    ).mappings().first()
-
-    if not ses:
-        raise HTTPException(status_code=404, detail=f"session not found: {sid}")
-    if ses["ended_at"] is not None:
-        raise HTTPException(status_code=409, detail="session already ended")
-
-    start_question_id = int(ses.get("start_question_id") or 1)
-
-    # 중복 제출 방지: 같은 session_id + question_id 이미 있으면 409
-    dup = db.execute(
-        text("""
-            SELECT id
-            FROM answers
-            WHERE session_id = :sid AND question_id = :qid
-            LIMIT 1
-        """),
-        {"sid": sid, "qid": qid}
-    ).mappings().first()
-
-    if dup:
-        raise HTTPException(status_code=409, detail="already answered")
-
-    # 1) 질문 조회(가치키 포함, GPT 반응용 question_text도)
-    q = db.execute(
-        text("""
-            SELECT id, enabled, value_a_key, value_b_key, question_text
-            FROM questions
-            WHERE id = :qid
-        """),
-        {"qid": qid}
-    ).mappings().first()
+    # 현재 사이클 번호 (메모리 스냅샷)
+    current_cycle = int(get_global_state(db).get("cycle_number") or 1)
 
-    if not q:
-        raise HTTPException(status_code=404, detail=f"question not found: {qid}")
-    if not bool(q["enabled"]):
-        raise HTTPException(status_code=409, detail=f"question disabled: {qid}")
+    try:
+        # 0) 세션 존재/종료 체크 + start_question_id + 현재 답변 수 (1회 조회)
+        ses = db.execute(
+            text("""
+                SELECT s.ended_at, s.start_question_id,
+                       (SELECT COUNT(*) FROM answers a WHERE a.session_id = s.id) AS answered
+                FROM sessions s
+                WHERE s.id = :sid
+            """),
+            {"sid": sid}
+        ).mappings().first()
 
-    value_a_key = q.get("value_a_key")
-    value_b_key = q.get("value_b_key")
+        if not ses:
+            raise HTTPException(status_code=404, detail=f"session not found: {sid}")
+        if ses["ended_at"] is not None:
+            raise HTTPException(status_code=409, detail="session already ended")
 
-    # 2) chosen_value_key 결정
-    if choice == "A":
-        chosen_value_key = (value_a_key or "").strip()
-    else:
-        chosen_value_key = (value_b_key or "").strip()
+        start_question_id = int(ses.get("start_question_id") or 1)
+        answered_before = int(ses.get("answered") or 0)
 
-    if not chosen_value_key:
-        raise HTTPException(status_code=400, detail="chosen_value_key is empty (check value_a_key/value_b_key)")
+        # 질문 조회(가치키 포함, GPT 반응용 question_text도) - 메모리 카탈로그
+        q = question_catalog.get_question(db, qid)
 
-    # 3) value key whitelist 검증
-    if chosen_value_key not in ALLOWED_VALUE_KEYS:
-        raise HTTPException(status_code=400, detail=f"invalid chosen_value_key: {chosen_value_key}")
+        if not q:
+            raise HTTPException(status_code=404, detail=f"question not found: {qid}")
+        if not q["enabled"]:
+            raise HTTPException(status_code=409, detail=f"question disabled: {qid}")
 
-    try:
-        # 세션 내 답변 순서 검증: start_question_id + 현재답변수 == 제출 question_id
-        cnt_before = db.execute(
-            text("SELECT COUNT(*) AS cnt FROM answers WHERE session_id = :sid"),
-            {"sid": sid}
-        ).mappings().first()
-        answered_before = int(cnt_before["cnt"]) if cnt_before else 0
+        # chosen_value_key 결정
+        if choice == "A":
+            chosen_value_key = (q.get("value_a_key") or "").strip()
+        else:
+            chosen_value_key = (q.get("value_b_key") or "").strip()
 
+        if not chosen_value_key:
+            raise HTTPException(status_code=400, detail="chosen_value_key is empty (check value_a_key/value_b_key)")
+
+        # value key whitelist 검증
+        if chosen_value_key not in ALLOWED_VALUE_KEYS:
+            raise HTTPException(status_code=400, detail=f"invalid chosen_value_key: {chosen_value_key}")
+
+        # 세션 내 답변 순서 검증: start_question_id + 현재답변수 == 제출 question_id
+        # (이미 답한 질문을 다시 보내면 순서가 어긋나므로 여기서도 409)
         expected_qid = start_question_id + answered_before
         if qid != expected_qid:
+            if start_question_id <= qid < expected_qid:
+                raise HTTPException(status_code=409, detail="already answered")
             raise HTTPException(
                 status_code=409,
                 detail=f"question_id mismatch: expected {expected_qid}, got {qid}"
             )
 
-        # 4) answers 저장 (psano_personality, current_question은 세션 종료 시 일괄 반영)
+        session_question_index = answered_before + 1
+        session_should_end = (session_question_index >= session_limit)
+        is_last = session_question_index >= session_limit
+
+        # 1) 전역 answered_total 갱신 (현재 사이클 카운터, INSERT 전이므로 inserted=False)
+        answered_total = answer_counter.increment(db, current_cycle, inserted=False)
+
+        # 2) 반응 풀 조회 (prefetch가 없을 때만)
+        if reaction_text is None:
+            reaction_text = _pooled_reaction(db, qid, choice, answered_total, is_last)
+
+        # 3) answers 저장 (psano_personality, current_question은 세션 종료 시 일괄 반영)
         db.execute(
             text("""
-                INSERT INTO answers (session_id, question_id, choice, chosen_value_key, cycle_id)
-                VALUES (:sid, :qid, :choice, :chosen_value_key, :cycle_id)
+                INSERT INTO answers (session_id, question_id, choice, chosen_value_key, cycle_id, assistant_reaction)
+                VALUES (:sid, :qid, :choice, :chosen_value_key, :cycle_id, :reaction)
             """),
-            {"sid": sid, "qid": qid, "choice": choice, "chosen_value_key": chosen_value_key, "cycle_id": current_cycle}
+            {
+                "sid": sid, "qid": qid, "choice": choice, "chosen_value_key": chosen_value_key,
+                "cycle_id": current_cycle, "reaction": reaction_text,
+            }
         )
 
-        # 5) session_question_index 계산 (방금 저장했으니 +1)
-        session_question_index = answered_before + 1
-        session_should_end = (session_question_index >= session_limit)
-
-        # 6) 전역 answered_total 계산 (현재 사이클만, GPT 반응 성장단계용)
-        total_row = db.execute(
-            text("SELECT COUNT(*) AS cnt FROM answers WHERE cycle_id = :cycle_id"),
-            {"cycle_id": current_cycle}
-        ).mappings().first()
-        answered_total = int(total_row["cnt"]) if total_row else 0
-
         db.commit()
 
         # 페르소나 생성은 클라이언트에서 /persona/generate API 직접 호출
@@ -243,6 +185,11 @@ def _post_answer_core(db: Session, sid: int, qid: int, choice: str):
     except HTTPException:
         db.rollback()
         raise
+    except IntegrityError as e:
+        db.rollback()
+        if e.orig is not None and e.orig.args and e.orig.args[0] == ER_DUP_ENTRY:
+            raise HTTPException(status_code=409, detail="already answered")
+        raise HTTPException(status_code=500, detail=f"db error: {e}")
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"db error: {e}")
@@ -252,17 +199,8 @@ def _post_answer_core(db: Session, sid: int, qid: int, choice: str):
     next_question = None
     next_question_text = ""
     if not session_should_end:
-        # 다음 enabled 질문 찾기 (텍스트 포함)
-        next_q = db.execute(
-            text("""
-                SELECT id, question_text
-                FROM questions
-                WHERE id > :qid AND enabled = 1
-                ORDER BY id ASC
-                LIMIT 1
-            """),
-            {"qid": qid}
-        ).mappings().first()
+        # 다음 enabled 질문 찾기 (텍스트 포함, 점프 테이블)
+        next_q = question_catalog.next_enabled(db, qid + 1)
         if next_q:
             next_question = int(next_q["id"])
             next_question_text = next_q.get("question_text") or ""
@@ -270,19 +208,121 @@ def _post_answer_core(db: Session, sid: int, qid: int, choice: str):
             # 다음 질문 없음 (365 도달) → 세션 종료 처리
             session_should_end = True
 
-    # GPT 반응 생성 (성장단계 스타일 반영)
-    question_text = q.get("question_text") or ""
-    reaction_text = _reaction_text_gpt(
-        db,
-        question_text,
-        choice,
-        chosen_value_key,
-        session_question_index,
-        answered_total,
-        next_question_text=next_question_text,
-    )
+    return {
+        "question_text": q.get("question_text") or "",
+        "chosen_value_key": chosen_value_key,
+        "session_question_index": session_question_index,
+        "session_should_end": session_should_end,
+        "is_last": is_last,
+        "session_limit": session_limit,
+        "prefetch_enabled": prefetch_enabled,
+        "answered_total": answered_total,
+        "next_question": next_question,
+        "next_question_text": next_question_text,
+        "reaction_text": reaction_text,
+    }
+
+
+def _pooled_reaction(db: Session, qid: int, choice: str, answered_total: int, is_last: bool) -> str | None:
+    """미리 생성된 반응 풀에서 조회 (없으면 None → 실시간 생성)"""
+    return reaction_pool.pick_reaction(db, qid, choice, reaction_stage_id(db, answered_total), is_last)
+
+
+def _put_prefetched(sid: int, qid: int, choice: str, reaction_text: str):
+    """prefetch 반응 저장 (PREFETCH_MAX 넘으면 가장 오래된 항목 제거)"""
+    key = (sid, qid, choice)
+    _PREFETCH[key] = (time.time() + PREFETCH_TTL_SEC, reaction_text)
+    _PREFETCH.move_to_end(key)
+    while len(_PREFETCH) > PREFETCH_MAX:
+        _PREFETCH.popitem(last=False)
 
-    # DB에 사노 반응 저장 (실패해도 응답은 반환)
+
+def _peek_prefetched(sid: int, qid: int, choice: str) -> str | None:
+    """prefetch된 반응 조회 (꺼내지 않음 → 답변 저장이 실패해도 재시도 때 다시 사용, 만료됐으면 정리)"""
+    key = (sid, qid, choice)
+    entry = _PREFETCH.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.time():
+        _PREFETCH.pop(key, None)
+        return None
+    return entry[1]
+
+
+def _drop_prefetched(sid: int, qid: int):
+    """답변 commit 후 해당 질문의 A/B prefetch 정리"""
+    _PREFETCH.pop((sid, qid, "A"), None)
+    _PREFETCH.pop((sid, qid, "B"), None)
+
+
+def _prepare_prefetch(db: Session, next_qid: int, session_question_index: int, answered_total: int,
+                      session_limit: int) -> list[tuple[str, str, int, tuple]]:
+    """다음 질문 A/B 반응 프롬프트 구성 (풀에 이미 있는 선택지는 제외) → [(choice, prompt, max_tokens, cache_key)]"""
+    is_last = session_question_index >= session_limit
+    stage_id = reaction_stage_id(db, answered_total)
+
+    q = question_catalog.get_question(db, next_qid)
+    if not q:
+        return []
+
+    following_text = ""
+    if not is_last:
+        following = question_catalog.next_enabled(db, next_qid + 1)
+        following_text = (following or {}).get("question_text") or ""
+
+    requests = []
+    for choice in ("A", "B"):
+        if reaction_pool.pick_reaction(db, next_qid, choice, stage_id, is_last) is not None:
+            continue
+        prompt, _fallback, max_tokens = build_reaction_request(
+            db, q.get("question_text") or "", choice, "", session_question_index, answered_total, following_text
+        )
+        requests.append((choice, prompt, max_tokens, reaction_cache_key(db, next_qid, choice, answered_total, is_last)))
+    return requests
+
+
+async def _prefetch_llm(prompt: str, max_tokens: int, cache_key: tuple):
+    """prefetch LLM 호출 1건 (gather로 동시에 도는 호출끼리 DB 세션/연결을 공유하지 않게 각자 세션 사용)"""
+    db = SessionLocal()
+    try:
+        return await acall_llm(prompt, db=db, max_tokens=max_tokens, cache=True, cache_key=cache_key)
+    finally:
+        db.close()
+
+
+async def _prefetch_next_reactions(sid: int, next_qid: int, session_question_index: int, answered_total: int,
+                                   session_limit: int):
+    """다음 질문의 A/B 반응을 미리 생성해 _PREFETCH에 저장 (응답 반환 후 백그라운드 실행)"""
+    try:
+        db = SessionLocal()
+        try:
+            requests = await run_in_threadpool(
+                _prepare_prefetch, db, next_qid, session_question_index, answered_total, session_limit
+            )
+        finally:
+            db.close()
+
+        results = await asyncio.gather(*[
+            _prefetch_llm(prompt, max_tokens, cache_key)
+            for _choice, prompt, max_tokens, cache_key in requests
+        ])
+        for (choice, _prompt, _max_tokens, _key), result in zip(requests, results):
+            if result.success and result.content:
+                _put_prefetched(sid, next_qid, choice, result.content)
+
+        # 만료 항목 정리 (세션 중도 이탈 등, 오래된 것부터 → 만료 안 된 항목을 만나면 중단)
+        now = time.time()
+        while _PREFETCH:
+            key, (expires, _) = next(iter(_PREFETCH.items()))
+            if expires > now:
+                break
+            _PREFETCH.pop(key, None)
+    except Exception as e:
+        logger.warning(f"reaction prefetch failed for session={sid}, question={next_qid}: {e}")
+
+
+def _save_reaction(db: Session, sid: int, qid: int, reaction_text: str):
+    """DB에 사노 반응 저장 (실패해도 응답은 반환)"""
     try:
         db.execute(
             text("""
@@ -297,18 +337,57 @@ def _post_answer_core(db: Session, sid: int, qid: int, choice: str):
         logger.warning(f"Failed to save assistant_reaction for session={sid}, question={qid}: {e}")
         db.rollback()
 
+
+async def _post_answer_core(db: Session, sid: int, qid: int, choice: str):
+    """
+    답변 처리 핵심 로직 (POST/GET 공용)
+    DB 작업은 threadpool에서, LLM 대기는 이벤트 루프에서 처리 (워커 점유 X)
+    """
+    # prefetch → 반응 풀(저장 트랜잭션 안에서) → 실시간 GPT 반응 생성 순 (성장단계 스타일 반영)
+    prefetched = _peek_prefetched(sid, qid, choice)
+    ctx = await run_in_threadpool(_insert_answer, db, sid, qid, choice, prefetched)
+    _drop_prefetched(sid, qid)  # commit 성공 후에만 정리 (409/실패면 남겨 둠 → TTL/LRU로 정리)
+
+    reaction_text = ctx["reaction_text"]
+    if reaction_text is None:
+        reaction_text = await _reaction_text_gpt(
+            db,
+            qid,
+            ctx["question_text"],
+            choice,
+            ctx["chosen_value_key"],
+            ctx["session_question_index"],
+            ctx["answered_total"],
+            ctx["is_last"],
+            next_question_text=ctx["next_question_text"],
+        )
+        # 실시간 생성분만 별도 저장 (INSERT 시점엔 아직 없음)
+        await run_in_threadpool(_save_reaction, db, sid, qid, reaction_text)
+
+    # (옵션) 관람객이 다음 질문을 읽는 동안 A/B 반응을 미리 생성
+    if ctx["prefetch_enabled"] and ctx["next_question"] and not ctx["session_should_end"]:
+        task = asyncio.create_task(_prefetch_next_reactions(
+            sid,
+            ctx["next_question"],
+            ctx["session_question_index"] + 1,
+            ctx["answered_total"] + 1,
+            ctx["session_limit"],
+        ))
+        _prefetch_tasks.add(task)
+        task.add_done_callback(_prefetch_tasks.discard)
+
     return {
         "ok": True,
-        "session_should_end": session_should_end,
-        "session_question_index": session_question_index,
-        "chosen_value_key": chosen_value_key,
+        "session_should_end": ctx["session_should_end"],
+        "session_question_index": ctx["session_question_index"],
+        "chosen_value_key": ctx["chosen_value_key"],
         "assistant_reaction_text": reaction_text,
-        "next_question": next_question,
+        "next_question": ctx["next_question"],
         "persona_generated": False,  # 클라이언트에서 /persona/generate 직접 호출
     }
 
 
 @router.post("", response_model=AnswerResponse)
-def post_answer(req: AnswerRequest, db: Session = Depends(get_db)):
+async def post_answer(req: AnswerRequest, db: Session = Depends(get_db)):
     """POST /answer - 형성기 답변 제출"""
-    return _post_answer_core(db, int(req.session_id), int(req.question_id), req.choice)
+    return await _post_answer_core(db, int(req.session_id), int(req.question_id), req.choice)
@@ -13,7 +13,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from database import get_db
-from util.utils import get_config
+from util.utils import get_config, load_growth_stage
+from routers._store import get_global_state
+from services import answer_counter, idle_catalog
 
 router = APIRouter()
 
@@ -56,39 +58,11 @@ def get_idle_greeting(db: Session = Depends(get_db)):
     TouchDesigner에서 idle 상태의 사노를 클릭했을 때 호출.
     """
     # 1) 현재 사이클의 answered_total 조회
-    cycle_row = db.execute(
-        text("SELECT cycle_number FROM psano_state WHERE id = 1")
-    ).mappings().first()
-    current_cycle = int(cycle_row["cycle_number"]) if cycle_row else 1
-
-    total_row = db.execute(
-        text("SELECT COUNT(*) AS cnt FROM answers WHERE cycle_id = :cycle_id"),
-        {"cycle_id": current_cycle}
-    ).mappings().first()
-    answered_total = int(total_row["cnt"]) if total_row else 0
-
-    # 2) 성장단계 조회 (idle_greeting 포함)
-    row = db.execute(
-        text("""
-            SELECT stage_id, stage_name_kr, stage_name_en, idle_greeting
-            FROM psano_growth_stages
-            WHERE :n BETWEEN min_answers AND max_answers
-            ORDER BY stage_id ASC
-            LIMIT 1
-        """),
-        {"n": answered_total},
-    ).mappings().first()
+    current_cycle = int(get_global_state(db).get("cycle_number") or 1)
+    answered_total = answer_counter.get_answered_total(db, current_cycle)
 
-    if not row:
-        # fallback: 가장 낮은 단계
-        row = db.execute(
-            text("""
-                SELECT stage_id, stage_name_kr, stage_name_en, idle_greeting
-                FROM psano_growth_stages
-                ORDER BY stage_id ASC
-                LIMIT 1
-            """)
-        ).mappings().first()
+    # 2) 성장단계 조회 (idle_greeting 포함, 메모리 구간 인덱스)
+    row = load_growth_stage(db, answered_total)
 
     if not row:
         # 테이블 자체가 비어있으면 하드코딩 fallback
@@ -154,39 +128,20 @@ def _get_preferred_values(db: Session) -> list[str]:
 def idle_random(db: Session = Depends(get_db)):
     """
     GET /idle/random
-    5개 가치축 각각에서 선호하는 value의 혼잣말 중 랜덤으로 1개 반환
+    5개 가치축 각각에서 선호하는 value의 혼잣말 중 1개 반환 (셔플 백: 연속 중복 없음)
     """
     try:
-        # 1) 각 가치축에서 선호하는 value 조회 (5개)
-        preferred_values = _get_preferred_values(db)
+        # 1) 각 가치축에서 선호하는 value (5개, 메모리 캐시)
+        preferred_values = idle_catalog.preferred_values(db, _get_preferred_values)
 
         # 2) 그 중 하나를 랜덤 선택
         selected_value = random.choice(preferred_values)
 
-        # 3) 해당 value의 혼잣말 조회
-        rows = db.execute(
-            text("""
-                SELECT id, axis_key, question_text, value
-                FROM psano_idle
-                WHERE enable = 1 AND value = :val
-            """),
-            {"val": selected_value}
-        ).mappings().all()
-
-        # 4) 해당 value에 혼잣말이 없으면 전체에서 선택
-        if not rows:
-            rows = db.execute(
-                text("""
-                    SELECT id, axis_key, question_text, value
-                    FROM psano_idle
-                    WHERE enable = 1
-                """)
-            ).mappings().all()
-
-        if not rows:
-            raise HTTPException(status_code=404, detail="No active idle monologues found")
+        # 3) 해당 value의 셔플 백에서 1개 (없으면 전체에서)
+        selected = idle_catalog.draw(db, selected_value)
 
-        selected = random.choice(list(rows))
+        if not selected:
+            raise HTTPException(status_code=404, detail="No active idle monologues found")
 
         return IdleRandomResponse(
             id=int(selected["id"]),
@@ -211,14 +166,7 @@ def idle_get(idle_id: int, db: Session = Depends(get_db)):
     특정 ID의 혼잣말 조회
     """
     try:
-        row = db.execute(
-            text("""
-                SELECT id, axis_key, question_text
-                FROM psano_idle
-                WHERE id = :id AND enable = 1
-            """),
-            {"id": idle_id}
-        ).mappings().first()
+        row = idle_catalog.get_idle(db, idle_id)
 
         if not row:
             raise HTTPException(status_code=404, detail=f"Idle monologue not found: {idle_id}")
@@ -14,8 +14,11 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from database import get_db
-from util.utils import get_config
+from util.utils import get_config, get_cache_refresh_stats, get_prompt_render_stats
 from util.constants import MAX_QUESTIONS
+from services.llm_service import breaker as llm_breaker, response_cache_stats, usage_stats as llm_usage_stats
+from routers._store import get_global_state
+from services import answer_counter, turn_counter
 
 router = APIRouter()
 
@@ -29,28 +32,18 @@ def get_monitor_data(db: Session = Depends(get_db)):
     """
     모니터링 대시보드용 종합 데이터
     """
-    # 1) 현재 상태
-    st = db.execute(
-        text("""
-            SELECT phase, current_question, global_turn_count, cycle_number,
-                   formed_at, persona_prompt
-            FROM psano_state WHERE id = 1
-        """)
-    ).mappings().first()
+    # 1) 현재 상태 (메모리 스냅샷)
+    st = get_global_state(db)
 
     max_questions = get_config(db, "max_questions", MAX_QUESTIONS)
     global_turn_max = get_config(db, "global_turn_max", 365)
 
     cycle_number = int(st.get("cycle_number") or 1) if st else 1
-    global_turn_count = int(st.get("global_turn_count") or 0) if st else 0
+    global_turn_count = turn_counter.get_total(db)  # 워커 스냅샷이 아닌 슬롯 합계
     phase = st.get("phase", "teach") if st else "teach"
 
     # 현재 사이클 답변 수
-    cnt_row = db.execute(
-        text("SELECT COUNT(*) AS cnt FROM answers WHERE cycle_id = :cycle_id"),
-        {"cycle_id": cycle_number}
-    ).mappings().first()
-    answered_count = int(cnt_row["cnt"]) if cnt_row else 0
+    answered_count = answer_counter.get_answered_total(db, cycle_number)
 
     # 2) 활성 세션 수
     active_row = db.execute(
@@ -60,7 +53,11 @@ def get_monitor_data(db: Session = Depends(get_db)):
 
     # 오늘 총 세션 수
     today_row = db.execute(
-        text("SELECT COUNT(*) AS cnt FROM sessions WHERE DATE(started_at) = CURDATE()")
+        # started_at 인덱스를 타도록 범위 조건 사용
+        text("""
+            SELECT COUNT(*) AS cnt FROM sessions
+            WHERE started_at >= CURDATE() AND started_at < CURDATE() + INTERVAL 1 DAY
+        """)
     ).mappings().first()
     today_sessions = int(today_row["cnt"]) if today_row else 0
 
@@ -122,6 +119,7 @@ def get_monitor_data(db: Session = Depends(get_db)):
             "progress_percent": round(answered_count / max_questions * 100, 1) if max_questions > 0 else 0,
             "global_progress_percent": round(global_turn_count / global_turn_max * 100, 1) if global_turn_max > 0 else 0,
             "has_persona": bool(st.get("persona_prompt")) if st else False,
+            "state_version": st.get("version"),
         },
         "sessions": {
             "active": active_sessions,
@@ -129,6 +127,11 @@ def get_monitor_data(db: Session = Depends(get_db)):
         },
         "recent_events": recent_events,
         "llm_stats": llm_stats,
+        "llm_breaker": llm_breaker.snapshot(),
+        "llm_cache": response_cache_stats(),
+        "llm_usage": llm_usage_stats(),
+        "cache_refresh": get_cache_refresh_stats(),
+        "prompt_render": get_prompt_render_stats(),
         "llm_raw_logs": llm_raw_logs,
     }
 
@@ -500,6 +503,10 @@ MONITOR_HTML = r"""
           <span class="stat-label">Recent Calls</span>
           <span id="totalCalls" class="stat-value">0</span>
         </div>
+        <div class="stat-row">
+          <span class="stat-label">Circuit</span>
+          <span id="llmCircuit" class="stat-value">-</span>
+        </div>
         <div class="llm-chart" id="llmChart"></div>
       </div>
     </div>
@@ -576,6 +583,10 @@ MONITOR_HTML = r"""
       const llm = data.llm_stats;
       document.getElementById('avgElapsed').textContent = llm.avg_elapsed_ms ? llm.avg_elapsed_ms + 'ms' : '-';
       document.getElementById('totalCalls').textContent = llm.total_calls;
+      const brk = data.llm_breaker;
+      document.getElementById('llmCircuit').textContent = brk
+        ? brk.state + (brk.consecutive_failures ? ' (' + brk.consecutive_failures + ' fails)' : '')
+        : '-';
 
       // LLM Chart
       const chartEl = document.getElementById('llmChart');
@@ -1,7 +1,7 @@
 import time
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 
 from database import get_db
 from schemas.common import Status
@@ -10,9 +10,14 @@ from schemas.monologue import (
     NudgeRequest, NudgeResponse
 )
 
-from services.llm_service import call_llm
-from util.utils import trim, summary_to_text, load_growth_stage, get_config
-from util.talk_utils import apply_policy_guard, OUTPUT_LIMIT
+from services.llm_service import acall_llm
+from util.utils import trim, load_growth_stage, get_config
+from util.talk_utils import apply_policy_guard, build_system_prefix, OUTPUT_LIMIT
+from util.prompt_template import PromptParts
+from routers._store import get_global_state, load_session
+from services import answer_counter, idle_catalog
+from services.talk_service import persist_turn, recent_messages
+from util.constants import TALK_RECENT_BUFFER
 
 router = APIRouter()
 
@@ -41,15 +46,8 @@ def _apply_policy_guard(db: Session, text_for_check: str, user_text: str = ""):
 def _answered_total(db: Session) -> int:
     # 현재 사이클의 답변 수만 카운트
     try:
-        cycle_row = db.execute(
-            text("SELECT cycle_number FROM psano_state WHERE id = 1")
-        ).mappings().first()
-        current_cycle = int(cycle_row["cycle_number"]) if cycle_row else 1
-        n = db.execute(
-            text("SELECT COUNT(*) FROM answers WHERE cycle_id = :cycle_id"),
-            {"cycle_id": current_cycle}
-        ).scalar()
-        return int(n or 0)
+        current_cycle = int(get_global_state(db).get("cycle_number") or 1)
+        return answer_counter.get_answered_total(db, current_cycle)
     except Exception:
         return 0
 
@@ -65,10 +63,7 @@ def _char_budget(sentence_length_label: str) -> int:
     return 140
 
 
-def build_idle_monologue_prompt(*, persona: str | None, values_summary, stage, answered_total: int) -> str:
-    persona = (persona or "").strip()
-    summary_text = summary_to_text(values_summary).strip()
-
+def build_idle_monologue_prompt(*, persona: str | None, values_summary, stage, answered_total: int) -> PromptParts:
     # stage가 None일 경우 기본값 처리
     stage = stage or {}
 
@@ -86,11 +81,6 @@ def build_idle_monologue_prompt(*, persona: str | None, values_summary, stage, a
                     "공감은 과하지 않게 해."
 
     base = []
-    if persona:
-        base.append(f"[persona_prompt]\n{persona}\n")
-    if summary_text:
-        base.append(f"[values_summary]\n{summary_text}\n")
-
     base.append(
         f"""너는 전시 작품 '사노'다.
 지금은 관람객의 직접 입력이 없는 상태에서, 짧게 혼잣말을 한다.
@@ -116,16 +106,11 @@ def build_idle_monologue_prompt(*, persona: str | None, values_summary, stage, a
 
 혼잣말 1개를 생성해줘."""
     )
-    return "\n".join(base).strip()
+    return PromptParts(build_system_prefix(persona, values_summary), "\n".join(base).strip())
 
 
-def _idle_monologue_core(
-    db: Session,
-    model: str = "gpt-4o",
-    max_output_tokens: int | None = None,
-    answered_total_override: int | None = None
-):
-    """혼잣말 생성 핵심 로직 (POST/GET 공용)"""
+def _prepare_idle_monologue(db: Session, answered_total_override: int | None) -> dict:
+    """혼잣말 생성의 LLM 호출 전 단계 (DB 작업)"""
     if answered_total_override is not None:
         answered_total = int(answered_total_override)
     else:
@@ -133,16 +118,9 @@ def _idle_monologue_core(
 
     stage = load_growth_stage(db, answered_total) or {}
 
-    st = db.execute(
-        text("""
-            SELECT persona_prompt, values_summary
-            FROM psano_state
-            WHERE id = 1
-        """)
-    ).mappings().first()
-
-    persona = (st or {}).get("persona_prompt")
-    values_summary = (st or {}).get("values_summary")
+    st = get_global_state(db)
+    persona = st.get("persona_prompt")
+    values_summary = st.get("values_summary")
 
     prompt = build_idle_monologue_prompt(
         persona=persona,
@@ -151,8 +129,30 @@ def _idle_monologue_core(
         answered_total=answered_total,
     )
 
-    # (선택) 정책 필터
-    policy = _apply_policy_guard(db, prompt)
+    fallback_lines = _get_fallback_lines(db)
+    fallback_text = fallback_lines[int(time.time()) % len(fallback_lines)]
+
+    return {
+        "prompt": prompt,
+        "stage": stage,
+        "answered_total": answered_total,
+        "policy": _apply_policy_guard(db, prompt.text),  # (선택) 정책 필터
+        "fallback_text": fallback_text,
+    }
+
+
+async def _idle_monologue_core(
+    db: Session,
+    model: str = "gpt-4o",
+    max_output_tokens: int | None = None,
+    answered_total_override: int | None = None
+):
+    """혼잣말 생성 핵심 로직 (POST/GET 공용)"""
+    ctx = await run_in_threadpool(_prepare_idle_monologue, db, answered_total_override)
+    stage = ctx["stage"]
+    answered_total = ctx["answered_total"]
+
+    policy = ctx["policy"]
     if policy:
         return {
             "status": policy["status"],
@@ -165,14 +165,13 @@ def _idle_monologue_core(
         }
 
     # LLM 호출 (설정: psano_config에서 로드)
-    fallback_lines = _get_fallback_lines(db)
-    fallback_text = fallback_lines[int(time.time()) % len(fallback_lines)]
-    result = call_llm(
-        prompt,
+    result = await acall_llm(
+        ctx["prompt"],
         db=db,
         model=model,
         max_tokens=max_output_tokens or 800,  # GPT-5 reasoning 모델 대응
-        fallback_text=fallback_text,
+        fallback_text=ctx["fallback_text"],
+        cache=True,
     )
 
     if result.success:
@@ -196,9 +195,9 @@ def _idle_monologue_core(
 
 
 @router.post("", response_model=MonologueResponse)
-def idle_monologue(req: MonologueRequest, db: Session = Depends(get_db)):
+async def idle_monologue(req: MonologueRequest, db: Session = Depends(get_db)):
     """POST /monologue - 혼잣말 생성"""
-    return _idle_monologue_core(
+    return await _idle_monologue_core(
         db,
         model=req.model,
         max_output_tokens=req.max_output_tokens,
@@ -211,38 +210,18 @@ def idle_monologue(req: MonologueRequest, db: Session = Depends(get_db)):
 # -----------------------
 
 def _load_idle(db: Session, idle_id: int):
-    """idle 혼잣말 로드"""
-    return db.execute(
-        text("""
-            SELECT id, axis_key, question_text, value
-            FROM psano_idle
-            WHERE id = :id
-        """),
-        {"id": idle_id}
-    ).mappings().first()
+    """idle 혼잣말 로드 (메모리 카탈로그)"""
+    return idle_catalog.get_idle(db, idle_id, enabled_only=False)
 
 
 def _get_recent_messages(db: Session, sid: int, limit: int = 6):
-    """idle_talk_messages에서 최근 메시지 조회 (시간순 정렬)"""
-    limit = max(2, min(int(limit or 6), 12))
-    rows = db.execute(
-        text("""
-            SELECT user_text, assistant_text
-            FROM idle_talk_messages
-            WHERE session_id = :sid
-            ORDER BY id DESC
-            LIMIT :lim
-        """),
-        {"sid": int(sid), "lim": int(limit)}
-    ).mappings().all()
-    # 최신 -> 과거 순으로 왔으니 뒤집어서 시간순으로
-    return list(rows)[::-1]
-
-
-def build_nudge_prompt(*, persona: str | None, values_summary, idle_ctx: str, recent_msgs: list, session_memory: str | None):
-    """nudge 프롬프트 생성"""
-    persona = (persona or "").strip()
-    summary_text = summary_to_text(values_summary).strip()
+    """최근 메시지 조회 (시간순 정렬, 세션 메시지 버퍼에서)"""
+    limit = max(2, min(int(limit or 6), TALK_RECENT_BUFFER))
+    return recent_messages(db, sid, limit)
+
+
+def build_nudge_prompt(*, persona: str | None, values_summary, idle_ctx: str, recent_msgs: list, session_memory: str | None) -> PromptParts:
+    """nudge 프롬프트 생성 (system: persona/summary 고정 앞부분, user: 대화 흐름)"""
     mem = (session_memory or "").strip()
 
     convo_lines = []
@@ -261,11 +240,6 @@ def build_nudge_prompt(*, persona: str | None, values_summary, idle_ctx: str, re
     convo = "\n".join(convo_lines).strip()
 
     base = []
-    if persona:
-        base.append(f"[persona_prompt]\n{persona}\n")
-    if summary_text:
-        base.append(f"[values_summary]\n{summary_text}\n")
-
     base.append(idle_ctx)
 
     if mem:
@@ -290,38 +264,18 @@ def build_nudge_prompt(*, persona: str | None, values_summary, idle_ctx: str, re
 
 출력은 문장만, 다른 라벨/설명 없이."""
     )
-    return "\n".join(base).strip()
+    return PromptParts(build_system_prefix(persona, values_summary), "\n".join(base).strip())
 
 
-def _talk_nudge_core(
-    db: Session,
-    sid: int,
-    model: str = "gpt-4o",
-    max_output_tokens: int | None = None,
-    recent_messages: int | None = None
-):
-    """nudge 핵심 로직 (POST/GET 공용)"""
-    # 1) psano_state (persona/summary)
-    st = db.execute(
-        text("""
-            SELECT persona_prompt, values_summary
-            FROM psano_state
-            WHERE id = 1
-        """)
-    ).mappings().first()
-
-    persona = (st or {}).get("persona_prompt")
-    values_summary = (st or {}).get("values_summary")
-
-    # 2) 세션 체크 (talk 시작 했는지)
-    sess = db.execute(
-        text("""
-            SELECT id, ended_at, idle_id, idle_talk_memory
-            FROM sessions
-            WHERE id = :sid
-        """),
-        {"sid": sid}
-    ).mappings().first()
+def _prepare_nudge(db: Session, sid: int, recent_messages: int | None) -> dict:
+    """nudge의 LLM 호출 전 단계 (DB 작업)"""
+    # 1) psano_state (persona/summary, 메모리 스냅샷)
+    st = get_global_state(db)
+    persona = st.get("persona_prompt")
+    values_summary = st.get("values_summary")
+
+    # 2) 세션 체크 (talk 시작 했는지, 메모리 저장소)
+    sess = load_session(db, sid)
 
     if not sess:
         raise HTTPException(status_code=404, detail="session not found")
@@ -359,20 +313,47 @@ def _talk_nudge_core(
     # 6) 정책 필터
     user_texts = "\n".join([m.get("user_text", "") for m in recent_msgs if m])
     policy = _apply_policy_guard(db, idle_ctx + "\n" + user_texts, user_texts)
+
+    fallback_lines = _get_fallback_lines(db)
+    fallback_text = fallback_lines[int(time.time()) % len(fallback_lines)]
+
+    return {
+        "prompt": prompt,
+        "idle_id": idle_id,
+        "policy": policy,
+        "fallback_text": fallback_text,
+    }
+
+
+def _save_nudge(db: Session, sid: int, idle_id: int, nudge_text: str, status: Status):
+    """idle_talk_messages 저장 (nudge 마킹, 턴/메모는 그대로)"""
+    persist_turn(db, sid, idle_id, "[nudge]", nudge_text, status.value)
+
+
+async def _talk_nudge_core(
+    db: Session,
+    sid: int,
+    model: str = "gpt-4o",
+    max_output_tokens: int | None = None,
+    recent_messages: int | None = None
+):
+    """nudge 핵심 로직 (POST/GET 공용)"""
+    ctx = await run_in_threadpool(_prepare_nudge, db, sid, recent_messages)
+    idle_id = ctx["idle_id"]
+
+    policy = ctx["policy"]
     if policy:
         nudge_text = policy["assistant_text"]
         fallback_code = policy["fallback_code"]
         status = Status.fallback
     else:
         # LLM 호출
-        fallback_lines = _get_fallback_lines(db)
-        fallback_text = fallback_lines[int(time.time()) % len(fallback_lines)]
-        result = call_llm(
-            prompt,
+        result = await acall_llm(
+            ctx["prompt"],
             db=db,
             model=model,
             max_tokens=max_output_tokens or 800,
-            fallback_text=fallback_text,
+            fallback_text=ctx["fallback_text"],
         )
 
         if result.success:
@@ -385,20 +366,7 @@ def _talk_nudge_core(
             fallback_code = result.fallback_code
 
     # 7) idle_talk_messages 저장 (nudge 마킹)
-    db.execute(
-        text("""
-            INSERT INTO idle_talk_messages (session_id, idle_id, user_text, assistant_text, status)
-            VALUES (:sid, :iid, :u, :a, :s)
-        """),
-        {
-            "sid": sid,
-            "iid": idle_id,
-            "u": "[nudge]",
-            "a": nudge_text,
-            "s": status.value,
-        }
-    )
-    db.commit()
+    await run_in_threadpool(_save_nudge, db, sid, idle_id, nudge_text, status)
 
     return {
         "status": status,
@@ -410,9 +378,9 @@ def _talk_nudge_core(
 
 
 @router.post("/nudge", response_model=NudgeResponse)
-def talk_nudge(req: NudgeRequest, db: Session = Depends(get_db)):
+async def talk_nudge(req: NudgeRequest, db: Session = Depends(get_db)):
     """POST /monologue/nudge - 대화 중 사용자 반응이 없을 때 사노가 툭 던지는 한마디"""
-    return _talk_nudge_core(
+    return await _talk_nudge_core(
         db,
         sid=int(req.session_id),
         model=req.model,
@@ -10,7 +10,8 @@ from database import get_db
 from schemas.persona import PersonaGenerateRequest, PersonaGenerateResponse
 from util.utils import now_kst_naive, iso, get_config, get_prompt
 from util.constants import MAX_QUESTIONS, DEFAULT_PAIR_QUESTION_COUNT
-from routers._store import LOCK, GLOBAL_STATE
+from routers._store import publish_global_state
+from services import answer_counter
 
 router = APIRouter()
 
@@ -158,7 +159,7 @@ def _generate_persona(db: Session, *, force: bool, model: str | None, allow_unde
     try:
         st = db.execute(
             text("""
-                SELECT phase, current_question, persona_prompt, values_summary, formed_at
+                SELECT phase, current_question, persona_prompt, values_summary, formed_at, cycle_number
                 FROM psano_state
                 WHERE id = 1
                 FOR UPDATE
@@ -168,7 +169,7 @@ def _generate_persona(db: Session, *, force: bool, model: str | None, allow_unde
         # FOR UPDATE 안 먹는 환경이면 그냥 일반 조회로
         st = db.execute(
             text("""
-                SELECT phase, current_question, persona_prompt, values_summary, formed_at
+                SELECT phase, current_question, persona_prompt, values_summary, formed_at, cycle_number
                 FROM psano_state
                 WHERE id = 1
             """)
@@ -177,17 +178,9 @@ def _generate_persona(db: Session, *, force: bool, model: str | None, allow_unde
     if not st:
         raise HTTPException(status_code=500, detail="psano_state(id=1) not found")
 
-    # answered_total: answers 테이블에서 직접 COUNT (현재 사이클만)
-    cycle_row = db.execute(
-        text("SELECT cycle_number FROM psano_state WHERE id = 1")
-    ).mappings().first()
-    current_cycle = int(cycle_row["cycle_number"]) if cycle_row else 1
-
-    total_row = db.execute(
-        text("SELECT COUNT(*) AS cnt FROM answers WHERE cycle_id = :cycle_id"),
-        {"cycle_id": current_cycle}
-    ).mappings().first()
-    answered_total = int(total_row["cnt"]) if total_row else 0
+    # answered_total: 현재 사이클 답변 수 카운터
+    current_cycle = int(st.get("cycle_number") or 1)
+    answered_total = answer_counter.get_answered_total(db, current_cycle)
 
     if answered_total > total_questions:
         answered_total = total_questions
@@ -309,12 +302,14 @@ def _generate_persona(db: Session, *, force: bool, model: str | None, allow_unde
 
     db.commit()
 
-    # 메모리 캐시 동기화
-    with LOCK:
-        GLOBAL_STATE["phase"] = "talk"
-        GLOBAL_STATE["formed_at"] = formed_at
-        GLOBAL_STATE["persona_prompt"] = persona_prompt
-        GLOBAL_STATE["values_summary"] = values_summary
+    # 메모리 캐시 동기화 (commit 후, 다른 워커에도 알림)
+    publish_global_state(
+        db,
+        phase="talk",
+        formed_at=formed_at,
+        persona_prompt=persona_prompt,
+        values_summary=values_summary,
+    )
 
     # 이벤트 로깅
     from util.utils import log_event
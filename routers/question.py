@@ -5,6 +5,8 @@ from sqlalchemy import text
 from database import get_db
 from schemas.question import QuestionResponse
 from util.utils import get_config
+from routers._store import get_global_state, load_session
+from services import question_catalog
 from util.constants import MAX_QUESTIONS, DEFAULT_SESSION_QUESTION_LIMIT
 
 router = APIRouter()
@@ -18,15 +20,8 @@ def get_current_question(
     session_limit = get_config(db, "session_question_limit", DEFAULT_SESSION_QUESTION_LIMIT)
     max_questions = get_config(db, "max_questions", MAX_QUESTIONS)
 
-    # 0) 세션 유효성 + start_question_id 조회
-    ses = db.execute(
-        text("""
-            SELECT id, ended_at, start_question_id
-            FROM sessions
-            WHERE id = :sid
-        """),
-        {"sid": int(session_id)}
-    ).mappings().first()
+    # 0) 세션 유효성 + start_question_id 조회 (메모리 저장소)
+    ses = load_session(db, int(session_id))
 
     if not ses:
         raise HTTPException(status_code=404, detail=f"session not found: {session_id}")
@@ -36,18 +31,8 @@ def get_current_question(
 
     start_question_id = int(ses.get("start_question_id") or 1)
 
-    # 1) phase 확인
-    st = db.execute(
-        text("""
-            SELECT phase
-            FROM psano_state
-            WHERE id = 1
-        """)
-    ).mappings().first()
-
-    if not st:
-        raise HTTPException(status_code=500, detail="psano_state(id=1) not found")
-
+    # 1) phase 확인 (메모리 스냅샷)
+    st = get_global_state(db)
     if st["phase"] != "teach":
         raise HTTPException(status_code=409, detail="phase is not teach")
 
@@ -73,37 +58,17 @@ def get_current_question(
     if qid > max_questions:
         raise HTTPException(status_code=409, detail="teach phase already completed")
 
-    # 4) 질문 조회
-    q = db.execute(
-        text("""
-            SELECT id, axis_key, question_text, choice_a, choice_b, enabled, value_a_key, value_b_key
-            FROM questions
-            WHERE id = :qid
-        """),
-        {"qid": qid}
-    ).mappings().first()
+    # 4) 질문 조회 (메모리 카탈로그, disabled면 다음 enabled 질문)
+    q = question_catalog.get_question(db, qid)
 
     if not q:
         raise HTTPException(status_code=404, detail=f"question not found: {qid}")
 
-    # disabled면 다음 enabled 질문 찾기
-    if not bool(q["enabled"]):
-        next_q = db.execute(
-            text("""
-                SELECT id, axis_key, question_text, choice_a, choice_b, enabled, value_a_key, value_b_key
-                FROM questions
-                WHERE id > :qid AND enabled = 1
-                ORDER BY id ASC
-                LIMIT 1
-            """),
-            {"qid": qid}
-        ).mappings().first()
-
-        if not next_q:
+    if not q["enabled"]:
+        q = question_catalog.next_enabled(db, qid + 1)
+        if not q:
             raise HTTPException(status_code=409, detail="no enabled question available")
 
-        q = next_q
-
     # 5) 응답
     return {
         "id": int(q["id"]),
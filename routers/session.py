@@ -10,7 +10,7 @@ from schemas.session import (
     SessionStartRequest, SessionStartResponse,
     SessionEndRequest, SessionEndResponse
 )
-from routers._store import LOCK, GLOBAL_STATE, SESSIONS
+from routers._store import SESSIONS, SessionRecord, get_global_state, load_session, new_recent_buffer
 from database import get_db
 from util.utils import now_kst_naive, iso
 from util.constants import VISITOR_NAME_MAX_LEN
@@ -52,19 +52,6 @@ def _validate_visitor_name(name: str | None) -> str:
     return name
 
 
-def _read_session_row(db: Session, sid: int):
-    """sessions 테이블에서 세션 정보 조회"""
-    return db.execute(
-        text("""
-            SELECT id, visitor_name, started_at, ended_at, end_reason,
-                   idle_id, idle_talk_memory, idle_turn_count, start_question_id
-            FROM sessions
-            WHERE id = :sid
-        """),
-        {"sid": sid}
-    ).mappings().first()
-
-
 def _start_session_core(db: Session, visitor_name: str | None):
     """세션 시작 핵심 로직"""
     name = _validate_visitor_name(visitor_name)
@@ -97,18 +84,14 @@ def _start_session_core(db: Session, visitor_name: str | None):
         db.rollback()
         raise HTTPException(status_code=500, detail=f"db error: {e}")
 
-    with LOCK:
-        SESSIONS[sid] = {
-            "id": sid,
-            "visitor_name": name,
-            "started_at": started_at,
-            "ended_at": None,
-            "end_reason": None,
-            "start_question_id": start_question_id,
-            "idle_id": None,
-            "idle_talk_memory": None,
-            "idle_turn_count": 0,
-        }
+    rec = SessionRecord(
+        id=sid,
+        visitor_name=name,
+        started_at=started_at,
+        start_question_id=start_question_id,
+    )
+    rec.recent = new_recent_buffer()  # 새 세션은 메시지가 없으므로 DB 조회 불필요
+    SESSIONS.put(rec)
 
     # 이벤트 로깅
     from util.utils import log_event
@@ -116,7 +99,7 @@ def _start_session_core(db: Session, visitor_name: str | None):
 
     return {
         "session_id": sid,
-        "phase": GLOBAL_STATE["phase"],
+        "phase": get_global_state(db)["phase"],
         "current_question": start_question_id,
     }
 
@@ -136,30 +119,14 @@ def end_session(req: SessionEndRequest, db: Session = Depends(get_db)):
 def get_session(session_id: int, db: Session = Depends(get_db)):
     sid = int(session_id)
 
-    # 1) 메모리 캐시 우선
-    with LOCK:
-        sess = SESSIONS.get(sid)
-        if sess:
-            return {
-                "session_id": sid,
-                "visitor_name": sess.get("visitor_name"),
-                "started_at": iso(sess.get("started_at")),
-                "ended_at": iso(sess.get("ended_at")),
-                "end_reason": sess.get("end_reason"),
-                # talk 전용(없으면 None/0)
-                "idle_id": sess.get("idle_id"),
-                "idle_talk_memory": sess.get("idle_talk_memory"),
-                "idle_turn_count": sess.get("idle_turn_count", 0),
-            }
-
-    # 2) DB fallback
-    row = _read_session_row(db, sid)
+    # 메모리 저장소 우선, 없으면 DB에서 읽어 채움
+    row = load_session(db, sid)
     if not row:
         raise HTTPException(status_code=404, detail="session not found")
 
     ended_at = row.get("ended_at")
     return {
-        "session_id": int(row["id"]),
+        "session_id": row.id,
         "visitor_name": row.get("visitor_name"),
         "started_at": iso(row.get("started_at")),
         "ended_at": iso(ended_at) if ended_at else None,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
@@ -6,6 +6,8 @@ from schemas.state import StateResponse
 from database import get_db
 from util.constants import VALUE_KEYS_ORDERED, TALK_UNLOCK_THRESHOLD, DEFAULT_GLOBAL_TURN_MAX
 from util.utils import get_config
+from routers._store import get_global_state
+from services import answer_counter, turn_counter
 
 router = APIRouter()
 
@@ -13,27 +15,8 @@ VALUE_KEYS = VALUE_KEYS_ORDERED
 
 @router.get("", response_model=StateResponse)
 def get_state(db: Session = Depends(get_db)):
-    # 1) psano_state 가져오기
-    #    persona_prompt, global_turn_count, cycle_number 컬럼이 있을 수도/없을 수도 있으니 try로 안전 처리
-    try:
-        row = db.execute(
-            text("""
-                SELECT phase, current_question, formed_at, persona_prompt, global_turn_count, cycle_number
-                FROM psano_state
-                WHERE id = 1
-            """)
-        ).mappings().first()
-    except Exception:
-        row = db.execute(
-            text("""
-                SELECT phase, current_question, formed_at
-                FROM psano_state
-                WHERE id = 1
-            """)
-        ).mappings().first()
-
-    if not row:
-        raise HTTPException(status_code=500, detail="psano_state(id=1) not found")
+    # 1) psano_state 가져오기 (메모리 스냅샷)
+    row = get_global_state(db)
 
     formed_at = row.get("formed_at")
     formed_iso = formed_at.isoformat() if formed_at is not None else None
@@ -45,11 +28,7 @@ def get_state(db: Session = Depends(get_db)):
 
     # 3) answered_total (현재 사이클의 누적 답변 수)
     current_cycle = int(row.get("cycle_number") or 1)
-    cnt_row = db.execute(
-        text("SELECT COUNT(*) AS cnt FROM answers WHERE cycle_id = :cycle_id"),
-        {"cycle_id": current_cycle}
-    ).mappings().first()
-    answered_total = int(cnt_row["cnt"]) if cnt_row else 0
+    answered_total = answer_counter.get_answered_total(db, current_cycle)
 
     # 4) axis_scores(10) from psano_personality(id=1)
     cols_sql = ", ".join([f"`{k}`" for k in VALUE_KEYS])
@@ -68,8 +47,8 @@ def get_state(db: Session = Depends(get_db)):
     # 5) talk_unlocked
     talk_unlocked = (phase_out == "talk") or (answered_total >= TALK_UNLOCK_THRESHOLD)
 
-    # 6) 글로벌 엔딩 정보
-    global_turn_count = int(row.get("global_turn_count") or 0)
+    # 6) 글로벌 엔딩 정보 (슬롯 합계: 어느 워커가 응답해도 같은 값)
+    global_turn_count = turn_counter.get_total(db)
     global_turn_max = get_config(db, "global_turn_max", DEFAULT_GLOBAL_TURN_MAX)
     global_ended = global_turn_count >= global_turn_max
 
@@ -80,7 +59,7 @@ def get_state(db: Session = Depends(get_db)):
         "axis_scores": axis_scores,
         "talk_unlocked": talk_unlocked,
         "formed_at": formed_iso,
-        "persona_prompt": row.get("persona_prompt") if "persona_prompt" in row else None,
+        "persona_prompt": row.get("persona_prompt"),
         "global_turn_count": global_turn_count,
         "global_turn_max": global_turn_max,
         "global_ended": global_ended,
@@ -1,9 +1,16 @@
+import asyncio
 import time
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from services.session_service import end_session_core, reset_cycle_core
-from util.utils import trim, summary_to_text, get_prompt, get_config
+from services import idle_catalog, turn_counter
+from services.talk_service import persist_turn, recent_turns_text
+from util.utils import trim, summary_to_text, get_prompt_template, render_prompt_parts, get_config
+from util.prompt_template import PromptParts
 from util.constants import (
     DEFAULT_GLOBAL_TURN_MAX, DEFAULT_GLOBAL_WARNING_START,
     TALK_INPUT_LIMIT, TALK_MEMORY_LIMIT, TALK_RECENT_TURNS
@@ -22,10 +29,10 @@ from schemas.talk import (
 )
 
 from schemas.common import Status
-from database import get_db
-from services.llm_service import call_llm
-from util.talk_utils import get_policy_guide, OUTPUT_LIMIT
-from routers._store import LOCK, SESSIONS
+from database import get_db, SessionLocal
+from services.llm_service import acall_llm, LLMResult, LLMStream
+from util.talk_utils import build_system_prefix, get_policy_guide, OUTPUT_LIMIT
+from routers._store import SESSIONS, get_global_state, update_global_state, load_session
 
 # constants에서 import한 값 사용 (하위 호환성을 위한 별칭)
 INPUT_LIMIT = TALK_INPUT_LIMIT
@@ -47,30 +54,13 @@ def _get_fallback_lines(db: Session) -> list:
     return get_config(db, "talk_fallback_lines", _DEFAULT_FALLBACK_LINES)
 
 
-def _safe_format(template: str, **kwargs) -> str:
-    """
-    .format() 대신 수동 replace. {key}만 치환하고 JSON의 {...}는 그대로 둠.
-    """
-    result = template
-    for key, value in kwargs.items():
-        result = result.replace("{" + key + "}", str(value))
-    return result
-
-
 # =========================
 # Idle 관련 헬퍼 함수
 # =========================
 
 def _load_idle(db: Session, idle_id: int):
-    """idle 혼잣말 로드"""
-    return db.execute(
-        text("""
-            SELECT id, axis_key, question_text, value
-            FROM psano_idle
-            WHERE id = :id AND enable = 1
-        """),
-        {"id": idle_id}
-    ).mappings().first()
+    """idle 혼잣말 로드 (메모리 카탈로그)"""
+    return idle_catalog.get_idle(db, idle_id)
 
 
 def _idle_context(db: Session, idle_id: int) -> tuple[str, str]:
@@ -84,55 +74,21 @@ def _idle_context(db: Session, idle_id: int) -> tuple[str, str]:
     return ctx, monologue
 
 
-def _format_recent_turns(rows) -> str:
-    """
-    rows: [{user_text, assistant_text}, ...] in chronological order
-    """
-    lines = []
-    for r in rows:
-        u = trim(r.get("user_text") or "", INPUT_LIMIT)
-        a = trim(r.get("assistant_text") or "", OUTPUT_LIMIT)
-        if u:
-            lines.append(f"U: {u}")
-        if a:
-            lines.append(f"A: {a}")
-    return "\n".join(lines).strip()
-
-
-def _get_recent_turns(db: Session, session_id: int, limit_rows: int) -> str:
-    """
-    idle_talk_messages에서 최근 limit_rows개를 가져와서 오래된 -> 최신 순서로 포맷.
-    """
-    rows = db.execute(
-        text("""
-            SELECT id, user_text, assistant_text
-            FROM idle_talk_messages
-            WHERE session_id = :sid
-            ORDER BY id DESC
-            LIMIT :lim
-        """),
-        {"sid": session_id, "lim": int(limit_rows)},
-    ).mappings().all()
-
-    rows = list(rows or [])
-    rows.reverse()
-    return _format_recent_turns(rows)
-
-
 # =========================
 # 프롬프트 빌더
 # =========================
 
-def _build_start_prompt(db: Session, *, persona: str | None, summary, idle_ctx: str, visitor_name: str = "") -> str:
-    """대화 시작 프롬프트 생성"""
+def _build_start_prompt(db: Session, *, persona: str | None, summary, idle_ctx: str, visitor_name: str = "") -> PromptParts:
+    """대화 시작 프롬프트 생성 (system: persona/summary 고정 앞부분, user: 이번 요청 내용)"""
     persona = (persona or "").strip()
     summary_text = summary_to_text(summary).strip()
     visitor_name = (visitor_name or "").strip()
 
-    template = get_prompt(db, "talk_start_prompt", "")
+    template = get_prompt_template(db, "talk_start_prompt")
 
     if template:
-        return _safe_format(
+        # 컴파일된 템플릿: {key}만 치환하고 JSON의 {...}는 그대로 둠
+        return render_prompt_parts(
             template,
             persona=persona,
             values_summary=summary_text,
@@ -143,10 +99,6 @@ def _build_start_prompt(db: Session, *, persona: str | None, summary, idle_ctx:
 
     # fallback: 하드코딩 프롬프트
     base = []
-    if persona:
-        base.append(f"[persona_prompt]\n{persona}\n")
-    if summary_text:
-        base.append(f"[values_summary]\n{summary_text}\n")
     if visitor_name:
         base.append(f"[visitor_name]\n{visitor_name}\n")
     base.append(idle_ctx)
@@ -159,7 +111,7 @@ def _build_start_prompt(db: Session, *, persona: str | None, summary, idle_ctx:
         "- 관람객의 이름이 주어지면 가끔 친근하게 이름을 불러줘\n\n"
         "관람객에게 건네는 첫 마디를 만들어줘."
     )
-    return "\n".join(base).strip()
+    return PromptParts(build_system_prefix(persona, summary), "\n".join(base).strip())
 
 
 def _build_turn_prompt(
@@ -175,8 +127,8 @@ def _build_turn_prompt(
     policy_guide: str | None = None,
     local_warning: str | None = None,
     ask_continue: bool = False,
-) -> str:
-    """대화 턴 프롬프트 생성"""
+) -> PromptParts:
+    """대화 턴 프롬프트 생성 (system: persona/summary 고정 앞부분, user: 이번 턴 내용)"""
     persona = persona or "You are Psano."
     summary_text = summary_to_text(summary)
     visitor_name = (visitor_name or "").strip()
@@ -195,10 +147,10 @@ def _build_turn_prompt(
     mem = trim(session_memory or "", MEMORY_LIMIT)
     recent = (recent_turns or "").strip()
 
-    template = get_prompt(db, "talk_turn_prompt", "")
+    template = get_prompt_template(db, "talk_turn_prompt")
 
     if template:
-        return _safe_format(
+        return render_prompt_parts(
             template,
             persona=persona,
             values_summary=summary_text,
@@ -216,11 +168,9 @@ def _build_turn_prompt(
 
     # fallback: 하드코딩 프롬프트
     visitor_section = f"[visitor_name]\n{visitor_name}\n\n" if visitor_name else ""
-    return (
-        f"{persona}\n"
+    user = (
         "Output language: Korean.\n"
-        "Tone: philosophical/metaphorical, but avoid exaggerated emotions.\n"
-        f"Values summary: {summary_text}\n\n"
+        "Tone: philosophical/metaphorical, but avoid exaggerated emotions.\n\n"
         f"{visitor_section}"
         f"{idle_ctx}\n"
         f"{policy_section}"
@@ -239,6 +189,7 @@ def _build_turn_prompt(
         "MEMORY: ...\n\n"
         f"User: {user_text}\n"
     ).strip()
+    return PromptParts(build_system_prefix(persona, summary), user)
 
 
 def _parse_assistant_and_memory(raw: str) -> tuple[str, str]:
@@ -285,59 +236,92 @@ def _parse_assistant_and_memory(raw: str) -> tuple[str, str]:
     return trim(assistant, OUTPUT_LIMIT), trim(memory, MEMORY_LIMIT)
 
 
-def _update_session_memory(db: Session, session_id: int, memory: str):
-    """sessions.idle_talk_memory / idle_turn_count 업데이트"""
-    mem_trimmed = trim(memory or "", MEMORY_LIMIT)
-    db.execute(
-        text("""
-            UPDATE sessions
-            SET idle_talk_memory = :mem,
-                idle_turn_count = COALESCE(idle_turn_count, 0) + 1
-            WHERE id = :sid
-        """),
-        {"sid": session_id, "mem": mem_trimmed},
-    )
-    db.commit()
+class _AssistantStreamSplitter:
+    """
+    스트리밍 출력에서 ASSISTANT 부분만 골라 내보내는 증분 파서.
+    - "ASSISTANT: ..." 이후 텍스트를 내보내고, "MEMORY:"부터는 서버에만 버퍼링
+    - JSON 형식이면 도중에 내보내지 않음 (종료 후 _parse_assistant_and_memory 결과 사용)
+    - 최종 값은 항상 _parse_assistant_and_memory(전체 텍스트)로 확정
+    """
+
+    _A = "ASSISTANT:"
+    _M = "MEMORY:"
+
+    def __init__(self):
+        self.buf = ""
+        self.mode = "pre"      # pre / assistant / memory / json
+        self.pos = 0           # buf에서 다음에 내보낼 위치
+        self.emitted = 0       # 지금까지 내보낸 글자 수 (OUTPUT_LIMIT 컷)
+
+    def feed(self, delta: str) -> str:
+        self.buf += delta
+
+        if self.mode == "pre":
+            head = self.buf.lstrip()
+            if head.startswith(("{", "`")):
+                self.mode = "json"
+            elif head.startswith(self._A):
+                self.mode = "assistant"
+                self.pos = self.buf.index(self._A) + len(self._A)
+            elif len(head) >= len(self._A) or not self._A.startswith(head):
+                # 라벨 없이 바로 본문이 오는 경우 (파서도 raw 전체를 assistant로 씀)
+                self.mode = "assistant"
+                self.pos = len(self.buf) - len(head)
+            else:
+                return ""
+
+        if self.mode != "assistant":
+            return ""
+
+        idx = self.buf.find(self._M, self.pos)
+        if idx >= 0:
+            end = idx
+            self.mode = "memory"
+        else:
+            # "MEMORY:"가 청크 경계에 걸칠 수 있으니 꼬리는 남겨둠
+            end = max(self.pos, len(self.buf) - len(self._M))
+
+        out = self.buf[self.pos:end]
+        self.pos = end
+        if self.emitted == 0:
+            out = out.lstrip()
+        if self.mode == "memory":
+            out = out.rstrip()
+
+        return self._cap(out)
+
+    def flush(self) -> str:
+        """스트림 종료 시 남겨둔 꼬리 내보내기"""
+        if self.mode != "assistant":
+            return ""
+        out = self.buf[self.pos:].rstrip()
+        self.pos = len(self.buf)
+        if self.emitted == 0:
+            out = out.lstrip()
+        return self._cap(out)
 
-    # 메모리 캐시 동기화
-    with LOCK:
-        sess = SESSIONS.get(session_id)
-        if sess:
-            sess["idle_talk_memory"] = mem_trimmed
-            sess["idle_turn_count"] = (sess.get("idle_turn_count") or 0) + 1
+    def _cap(self, out: str) -> str:
+        out = out[:max(0, OUTPUT_LIMIT - self.emitted)]
+        self.emitted += len(out)
+        return out
+
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 한 건 포맷"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
 
 
 # =========================
 # API 엔드포인트
 # =========================
 
-@router.post("/start", response_model=TalkStartResponse)
-def talk_start(req: TalkStartRequest, db: Session = Depends(get_db)):
-    """
-    POST /talk/start
-    idle 혼잣말 기반 대화 시작
-    """
-    # 1) psano_state 읽기
-    st = db.execute(
-        text("""
-            SELECT phase, persona_prompt, values_summary
-            FROM psano_state
-            WHERE id = 1
-        """)
-    ).mappings().first()
-
-    if not st:
-        raise HTTPException(status_code=500, detail="psano_state(id=1) not found")
-
-    # 2) 세션 체크
-    sess = db.execute(
-        text("""
-            SELECT id, ended_at, idle_id, idle_talk_memory, idle_turn_count, visitor_name
-            FROM sessions
-            WHERE id = :sid
-        """),
-        {"sid": req.session_id},
-    ).mappings().first()
+def _prepare_start(db: Session, req: TalkStartRequest) -> tuple[str, str, str]:
+    """talk/start의 LLM 호출 전 단계 (DB 작업) → (prompt, fallback_text, monologue_text)"""
+    # 1) psano_state 읽기 (메모리 스냅샷)
+    st = get_global_state(db)
+
+    # 2) 세션 체크 (메모리 저장소)
+    sess = load_session(db, req.session_id)
 
     if not sess:
         raise HTTPException(status_code=404, detail="session not found")
@@ -351,23 +335,23 @@ def talk_start(req: TalkStartRequest, db: Session = Depends(get_db)):
 
     # talk 최초 1회만 초기화
     if sess.get("idle_id") is None:
-        db.execute(
+        res = db.execute(
             text("""
                 UPDATE sessions
                 SET idle_id = :iid, idle_talk_memory = '', idle_turn_count = 0
-                WHERE id = :sid
+                WHERE id = :sid AND ended_at IS NULL
             """),
             {"sid": req.session_id, "iid": int(req.idle_id)},
         )
         db.commit()
 
-        # 메모리 캐시 동기화
-        with LOCK:
-            cached_sess = SESSIONS.get(req.session_id)
-            if cached_sess:
-                cached_sess["idle_id"] = int(req.idle_id)
-                cached_sess["idle_talk_memory"] = ""
-                cached_sess["idle_turn_count"] = 0
+        # 다른 워커에서 이미 종료된 세션 → 저장소에서 빼고 409
+        if (res.rowcount or 0) == 0:
+            SESSIONS.remove(req.session_id)
+            raise HTTPException(status_code=409, detail="session already ended")
+
+        # 메모리 저장소 동기화 (commit 후)
+        SESSIONS.update(req.session_id, idle_id=int(req.idle_id), idle_talk_memory="", idle_turn_count=0)
 
     # 3) idle 컨텍스트 로드
     idle_ctx, monologue_text = _idle_context(db, req.idle_id)
@@ -381,10 +365,21 @@ def talk_start(req: TalkStartRequest, db: Session = Depends(get_db)):
         visitor_name=sess.get("visitor_name") or "",
     )
 
-    # 5) LLM 호출
     fallback_lines = _get_fallback_lines(db)
     fallback_text = fallback_lines[int(time.time()) % len(fallback_lines)]
-    result = call_llm(
+    return prompt, fallback_text, monologue_text
+
+
+@router.post("/start", response_model=TalkStartResponse)
+async def talk_start(req: TalkStartRequest, db: Session = Depends(get_db)):
+    """
+    POST /talk/start
+    idle 혼잣말 기반 대화 시작
+    """
+    prompt, fallback_text, monologue_text = await run_in_threadpool(_prepare_start, db, req)
+
+    # 5) LLM 호출
+    result = await acall_llm(
         prompt,
         db=db,
         model=getattr(req, "model", None),
@@ -413,42 +408,43 @@ def talk_start(req: TalkStartRequest, db: Session = Depends(get_db)):
     }
 
 
-@router.post("/turn", response_model=TalkTurnResponse)
-def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
+def _prepare_turn(db: Session, req: TalkTurnRequest) -> dict:
     """
-    POST /talk/turn
-    idle 혼잣말 기반 대화 턴
+    talk/turn의 LLM 호출 전 단계 (DB 작업).
+    엔딩 등으로 LLM 호출이 필요 없으면 {"response": ...}만 담아 반환.
     """
-    # 1) psano_state 읽기 (글로벌 턴 카운트 포함)
-    st = db.execute(
-        text("""
-            SELECT phase, persona_prompt, values_summary, global_turn_count
-            FROM psano_state
-            WHERE id = 1
-        """)
-    ).mappings().first()
-
-    if not st:
-        raise HTTPException(status_code=500, detail="psano_state(id=1) not found")
+    # 1) psano_state 읽기 (메모리 스냅샷)
+    st = get_global_state(db)
 
     # 글로벌 설정 로드
     global_turn_max = get_config(db, "global_turn_max", DEFAULT_GLOBAL_TURN_MAX)
     global_warning_start = get_config(db, "global_warning_start", DEFAULT_GLOBAL_WARNING_START)
-    global_turn_count = int(st.get("global_turn_count") or 0)
+
+    # 글로벌 턴 카운트: 턴마다 슬롯 합계를 1번 읽음 (잠금 없음, 워커 스냅샷은 다른 워커의 턴을 모름)
+    # → 예고/복구 판정 모두 이 값으로
+    global_turn_count = turn_counter.get_total(db)
+    cycle_number = int(st.get("cycle_number") or 1)
+    if global_turn_count != int(st.get("global_turn_count") or 0):
+        update_global_state(global_turn_count=global_turn_count)
 
     # 2) 글로벌 엔딩 체크 (이미 max 도달한 경우 - 리셋 실패 복구용)
     if global_turn_count >= global_turn_max:
         # 이전 턴에서 리셋이 실패했을 수 있음 - 다시 시도
+        # 사이클 번호는 합계와 같은 트랜잭션 스냅샷에서 DB로 읽음 (워커 스냅샷이 오래됐어도 복구가 skip되지 않게)
+        # 같은 사이클일 때만 리셋 (psano_state 행 잠금 → 엔딩 선점 요청/다른 복구 요청과 중복 리셋 없음)
         from util.utils import log_event
         log_event("global_ending_recovery", turn_count=global_turn_count, turn_max=global_turn_max)
 
+        recovery_cycle = int(db.execute(
+            text("SELECT cycle_number FROM psano_state WHERE id = 1")
+        ).scalar() or 1)
         try:
-            reset_cycle_core(db, reason="global_token_exhausted_recovery")
+            reset_cycle_core(db, reason="global_token_exhausted_recovery", expected_cycle=recovery_cycle)
         except Exception as e:
             log_event("cycle_reset_error", error=str(e))
 
         global_ending_msg = get_config(db, "global_ending_message", "고마웠어.")
-        return {
+        return {"response": {
             "status": Status.ok,
             "ui_text": global_ending_msg,
             "fallback_code": None,
@@ -456,7 +452,7 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
             "should_end": True,
             "warning_text": None,
             "global_ended": True,
-        }
+        }}
 
     # 3) 예고 구간 체크 (355~364)
     warning_text = None
@@ -472,15 +468,8 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
         except Exception:
             warning_text = "이제 시간이 거의 다 되어가는 것 같아."
 
-    # 2) 세션 체크
-    sess = db.execute(
-        text("""
-            SELECT id, ended_at, idle_id, idle_talk_memory, idle_turn_count, visitor_name
-            FROM sessions
-            WHERE id = :sid
-        """),
-        {"sid": req.session_id},
-    ).mappings().first()
+    # 2) 세션 체크 (메모리 저장소)
+    sess = load_session(db, req.session_id)
 
     if not sess:
         raise HTTPException(status_code=404, detail="session not found")
@@ -503,7 +492,7 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
 
     # 로컬 토큰 소진 → 즉시 종료 (엔딩 멘트 없음)
     if remaining_turns <= 0:
-        return {
+        return {"response": {
             "status": Status.ok,
             "ui_text": "",
             "fallback_code": None,
@@ -511,7 +500,7 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
             "should_end": True,
             "warning_text": None,
             "global_ended": False,
-        }
+        }}
 
     # 로컬 예고 (잔여 ≤ threshold)
     local_warning = None
@@ -538,7 +527,7 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
 
     # 6) 세션 메모 + 최근 턴 로드
     session_memory = trim(sess.get("idle_talk_memory") or "", MEMORY_LIMIT)
-    recent_turns = _get_recent_turns(db, req.session_id, RECENT_TURNS)
+    recent_turns = recent_turns_text(db, req.session_id, RECENT_TURNS)
 
     # 7) 프롬프트 구성
     prompt = _build_turn_prompt(
@@ -555,16 +544,32 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
         ask_continue=ask_continue,
     )
 
-    # 8) LLM 호출
     fallback_lines = _get_fallback_lines(db)
     fallback_text = fallback_lines[int(time.time()) % len(fallback_lines)]
-    result = call_llm(
-        prompt,
-        db=db,
-        model=getattr(req, "model", None),
-        max_tokens=getattr(req, "max_output_tokens", None) or 1000,
-        fallback_text="",
-    )
+
+    return {
+        "response": None,
+        "prompt": prompt,
+        "fallback_text": fallback_text,
+        "user_text": user_text,
+        "idle_id": int(sess["idle_id"]),
+        "session_memory": session_memory,
+        "policy_category": policy_category,
+        "warning_text": warning_text,
+        "remaining_turns": remaining_turns,
+        "global_turn_count": global_turn_count,
+        "global_turn_max": global_turn_max,
+        "cycle_number": cycle_number,
+    }
+
+
+def _finish_turn(db: Session, req: TalkTurnRequest, ctx: dict, result: LLMResult) -> dict:
+    """talk/turn의 LLM 호출 후 단계: 응답 파싱 + DB 저장 + 글로벌 엔딩 처리"""
+    user_text = ctx["user_text"]
+    fallback_text = ctx["fallback_text"]
+    session_memory = ctx["session_memory"]
+    remaining_turns = ctx["remaining_turns"]
+    global_turn_max = ctx["global_turn_max"]
 
     new_memory = session_memory
 
@@ -584,38 +589,33 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
         fallback_code = result.fallback_code
         assistant_text = trim(fallback_text, OUTPUT_LIMIT)
 
-    # 9) DB 저장
-    db.execute(
-        text("""
-            INSERT INTO idle_talk_messages (session_id, idle_id, user_text, assistant_text, status)
-            VALUES (:sid, :iid, :u, :a, :s)
-        """),
-        {
-            "sid": req.session_id,
-            "iid": int(sess["idle_id"]),
-            "u": user_text,
-            "a": assistant_text,
-            "s": status.value,
-        },
-    )
-    db.commit()
-
-    # 10) 세션 메모/턴카운트 업데이트
-    _update_session_memory(db, req.session_id, new_memory)
-
-    # 11) 글로벌 턴 카운트 증가
-    db.execute(
-        text("""
-            UPDATE psano_state
-            SET global_turn_count = COALESCE(global_turn_count, 0) + 1
-            WHERE id = 1
-        """)
+    # 9) DB 저장: 메시지 + 세션 메모/턴카운트 + 글로벌 턴 카운트 (랜덤 슬롯) 한 번에 commit
+    persist_turn(
+        db,
+        req.session_id,
+        ctx["idle_id"],
+        user_text,
+        assistant_text,
+        status.value,
+        memory=new_memory,
+        count_turn=True,
     )
-    db.commit()
 
-    # 글로벌 턴 카운트 증가 후 체크 (이번 턴이 마지막인지)
-    new_global_turn_count = global_turn_count + 1
-    is_global_last_turn = new_global_turn_count >= global_turn_max
+    # commit 후 합계로 판정 (마지막에 commit한 요청은 반드시 최종 합계를 봄, 턴당 합계 조회는 여기 한 번)
+    new_global_turn_count = turn_counter.get_total(db)
+    update_global_state(global_turn_count=new_global_turn_count)
+
+    # max 도달 시 엔딩은 한 요청만 선점 (동시에 넘긴 나머지 턴은 일반 응답)
+    is_global_last_turn = False
+    ending_cycle = ctx["cycle_number"]
+    if new_global_turn_count >= global_turn_max:
+        is_global_last_turn = turn_counter.claim_ending(db, new_global_turn_count, global_turn_max)
+        if is_global_last_turn:
+            # 선점한 행을 잡은 채로 현재 사이클 확인 (스냅샷이 늦었어도 이 사이클만 리셋)
+            ending_cycle = int(db.execute(
+                text("SELECT cycle_number FROM psano_state WHERE id = 1")
+            ).scalar() or 1)
+        db.commit()
 
     # 마지막 턴이면 사이클 리셋 + 엔딩 메시지 추가
     if is_global_last_turn:
@@ -624,7 +624,7 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
         log_event("global_ending", turn_count=new_global_turn_count, turn_max=global_turn_max)
 
         try:
-            reset_cycle_core(db, reason="global_token_exhausted")
+            reset_cycle_core(db, reason="global_token_exhausted", expected_cycle=ending_cycle)
         except Exception as e:
             log_event("cycle_reset_error", error=str(e))
 
@@ -638,13 +638,130 @@ def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
         "status": status,
         "ui_text": assistant_text,
         "fallback_code": fallback_code,
-        "policy_category": policy_category,
+        "policy_category": ctx["policy_category"],
         "should_end": should_end or is_global_last_turn,
-        "warning_text": warning_text,
+        "warning_text": ctx["warning_text"],
         "global_ended": is_global_last_turn,
     }
 
 
+@router.post("/turn", response_model=TalkTurnResponse)
+async def talk_turn(req: TalkTurnRequest, db: Session = Depends(get_db)):
+    """
+    POST /talk/turn
+    idle 혼잣말 기반 대화 턴
+    """
+    ctx = await run_in_threadpool(_prepare_turn, db, req)
+    if ctx["response"] is not None:
+        return ctx["response"]
+
+    # 8) LLM 호출
+    result = await acall_llm(
+        ctx["prompt"],
+        db=db,
+        model=getattr(req, "model", None),
+        max_tokens=getattr(req, "max_output_tokens", None) or 1000,
+        fallback_text="",
+    )
+
+    return await run_in_threadpool(_finish_turn, db, req, ctx, result)
+
+
+_finish_tasks: set[asyncio.Task] = set()
+
+
+def _on_finish_done(task: asyncio.Task):
+    """스트림 턴 저장 태스크 정리 (클라이언트가 끊긴 뒤 실패하면 받을 곳이 없으니 로그로)"""
+    _finish_tasks.discard(task)
+    if task.cancelled():
+        return
+    e = task.exception()
+    if e is not None:
+        from util.utils import log_event
+        log_event("talk_stream_finish_error", error=getattr(e, "detail", None) or str(e))
+
+
+def _finish_turn_in_new_session(req: TalkTurnRequest, ctx: dict, result: LLMResult) -> dict:
+    """스트림 종료 시점엔 요청 스코프 DB 세션이 닫혔을 수 있어 별도 세션으로 저장"""
+    db = SessionLocal()
+    try:
+        return _finish_turn(db, req, ctx, result)
+    finally:
+        db.close()
+
+
+@router.post("/turn/stream")
+async def talk_turn_stream(req: TalkTurnRequest, db: Session = Depends(get_db)):
+    """
+    POST /talk/turn/stream
+    /talk/turn의 SSE 버전.
+    - event: token  → {"text": ...} ASSISTANT 부분만 토큰 단위로 전달
+    - event: done   → TalkTurnResponse와 같은 필드 (ui_text가 최종 확정 텍스트)
+    - event: error  → {"status_code", "detail"} 저장 단계 실패 (세션이 이미 종료됨 등)
+    MEMORY 부분은 서버에서 버퍼링하고, 스트림이 끝난 뒤 한 번에 저장.
+    """
+    # 검증/엔딩 체크는 스트림 시작 전에 → 4xx는 일반 HTTP 에러로 나감
+    ctx = await run_in_threadpool(_prepare_turn, db, req)
+
+    async def event_stream():
+        if ctx["response"] is not None:
+            yield _sse("done", jsonable_encoder(ctx["response"]))
+            return
+
+        stream = None
+        finish_task = None
+
+        def start_finish() -> asyncio.Task:
+            # 저장은 응답 스트림과 분리된 태스크로 → 클라이언트가 끊겨 제너레이터가 취소/종료돼도 턴은 저장됨
+            nonlocal finish_task
+            if finish_task is None:
+                result = (stream.result if stream else None) or LLMResult(success=False, content="", fallback_code="LLM_FAILED")
+                finish_task = asyncio.create_task(run_in_threadpool(_finish_turn_in_new_session, req, ctx, result))
+                _finish_tasks.add(finish_task)
+                finish_task.add_done_callback(_on_finish_done)
+            return finish_task
+
+        try:
+            # 본문이 돌 때는 요청 스코프 db가 닫혔을 수 있음 → LLM 설정 로드용 세션은 스트림 안에서 따로 열고 닫음
+            stream_db = SessionLocal()
+            try:
+                stream = LLMStream(
+                    ctx["prompt"],
+                    db=stream_db,
+                    model=getattr(req, "model", None),
+                    max_tokens=getattr(req, "max_output_tokens", None) or 1000,
+                    fallback_text="",
+                )
+                splitter = _AssistantStreamSplitter()
+
+                async for delta in stream:
+                    out = splitter.feed(delta)
+                    if out:
+                        yield _sse("token", {"text": out})
+            finally:
+                stream_db.close()
+            tail = splitter.flush()
+            if tail:
+                yield _sse("token", {"text": tail})
+
+            try:
+                response = await asyncio.shield(start_finish())
+            except HTTPException as e:
+                # 스트리밍 중 다른 워커에서 세션이 종료됨 등 → 이미 200으로 시작했으니 error 이벤트로 전달
+                yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+                return
+            yield _sse("done", jsonable_encoder(response))
+        finally:
+            # 스트림 도중 연결 끊김(CancelledError/GeneratorExit) → 받은 데까지 결과 없이 폴백으로라도 턴 저장
+            start_finish()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/end", response_model=TalkEndResponse)
 def talk_end(req: TalkEndRequest, db: Session = Depends(get_db)):
     """
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import re
 import time
 
@@ -10,6 +11,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from services.llm_service import call_llm
+from util.utils import register_cache_listener, sync_cache_version, load_growth_stage
+from routers._store import get_global_state
 
 class Action(str, Enum):
     REDIRECT = "redirect"
@@ -31,16 +34,116 @@ class PolicyRule:
     should_end: bool
 
 
-# 캐시 (60초 TTL)
+class _AhoCorasick:
+    """
+    다중 키워드 동시 검색 (Aho-Corasick)
+    - 키워드 수와 무관하게 입력 텍스트를 한 번만 훑음
+    - payload: 키워드마다 붙여둘 값 (여기선 (rule_index, keyword_index))
+    """
+
+    def __init__(self, words: List[Tuple[str, Tuple[int, int]]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int]]] = [[]]
+
+        for word, payload in words:
+            node = 0
+            for ch in word:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(payload)
+
+        # BFS로 실패 링크 구성 + 출력 병합
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def search(self, s: str) -> List[Tuple[int, int]]:
+        """s에 등장하는 모든 키워드의 payload"""
+        found = []
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for ch in s:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.extend(out[node])
+        return found
+
+
+class _CompiledMatcher:
+    """
+    정책 규칙 매처 (_load_rules 갱신 시 1회 빌드)
+    - 규칙은 priority DESC 순 → 인덱스가 작을수록 우선
+    - 키워드: 정규화된 전체 키워드로 만든 Aho-Corasick 한 번 통과
+    - 정규식: 미리 컴파일, 키워드 매칭보다 우선순위가 높은 것만 검사
+    """
+
+    def __init__(self, rules: List[PolicyRule]):
+        self.rules = rules
+        words = []
+        self.regexes: List[Tuple[int, re.Pattern]] = []
+        for ri, rule in enumerate(rules):
+            if rule.is_regex:
+                # 정규식 모드: keywords[0]을 전체 패턴으로 사용
+                pattern = rule.keywords[0] if rule.keywords else ""
+                if pattern:
+                    try:
+                        self.regexes.append((ri, re.compile(pattern, re.IGNORECASE)))
+                    except re.error:
+                        pass
+            else:
+                for ki, kw in enumerate(rule.keywords):
+                    nkw = _norm(kw)
+                    if nkw:
+                        words.append((nkw, (ri, ki)))
+        self.automaton = _AhoCorasick(words)
+
+    def match(self, raw: str) -> Optional[Tuple[PolicyRule, str]]:
+        # 규칙별로 가장 앞쪽 키워드, 전체에선 가장 우선순위 높은 규칙
+        best_ri, best_ki = len(self.rules), 0
+        for ri, ki in self.automaton.search(_norm(raw)):
+            if ri < best_ri or (ri == best_ri and ki < best_ki):
+                best_ri, best_ki = ri, ki
+
+        for ri, regex in self.regexes:
+            if ri >= best_ri:
+                break
+            if regex.search(raw):
+                return (self.rules[ri], "REGEX")
+
+        if best_ri < len(self.rules):
+            rule = self.rules[best_ri]
+            return (rule, rule.keywords[best_ki])
+        return None
+
+
+# 캐시 (admin 수정은 cache_version으로 즉시 반영, TTL은 안전망)
 _rules_cache: List[PolicyRule] = []
+_matcher: Optional[_CompiledMatcher] = None
 _cache_time: float = 0
-CACHE_TTL = 60
+CACHE_TTL = 3600
 
 
 def _load_rules(db: Session) -> List[PolicyRule]:
-    """DB에서 정책 규칙 로드 (캐시 적용)"""
-    global _rules_cache, _cache_time
+    """DB에서 정책 규칙 로드 (캐시 적용, 갱신 시 매처도 재빌드)"""
+    global _rules_cache, _matcher, _cache_time
 
+    sync_cache_version(db)
     if _rules_cache and (time.time() - _cache_time < CACHE_TTL):
         return _rules_cache
 
@@ -76,6 +179,7 @@ def _load_rules(db: Session) -> List[PolicyRule]:
         ))
 
     _rules_cache = rules
+    _matcher = _CompiledMatcher(rules)
     _cache_time = time.time()
     return rules
 
@@ -94,31 +198,10 @@ def moderate_text(db: Session, user_text: str) -> Optional[Tuple[PolicyRule, str
     if not raw:
         return None
 
-    rules = _load_rules(db)
-    normalized = _norm(raw)
-
-    best: Optional[Tuple[PolicyRule, str]] = None
-
-    for rule in rules:
-        if rule.is_regex:
-            # 정규식 모드: keywords[0]을 전체 패턴으로 사용
-            pattern = rule.keywords[0] if rule.keywords else ""
-            if pattern:
-                try:
-                    if re.search(pattern, raw, re.IGNORECASE):
-                        if (best is None) or (rule.priority > best[0].priority):
-                            best = (rule, "REGEX")
-                except re.error:
-                    pass
-        else:
-            # 키워드 모드
-            for kw in rule.keywords:
-                if _norm(kw) in normalized:
-                    if (best is None) or (rule.priority > best[0].priority):
-                        best = (rule, kw)
-                    break  # 이 규칙에서 매칭됐으면 다음 규칙으로
-
-    return best
+    _load_rules(db)
+    if _matcher is None:
+        return None
+    return _matcher.match(raw)
 
 
 def generate_policy_response(
@@ -137,15 +220,9 @@ def generate_policy_response(
     if not use_gpt:
         return (rule.fallback_message, rule.should_end)
 
-    # 성장단계 로드 (스타일 반영용)
-    stage_row = db.execute(
-        text("""
-            SELECT stage_name_kr FROM psano_growth_stages
-            WHERE (SELECT GREATEST(0, current_question - 1) FROM psano_state WHERE id = 1)
-                  BETWEEN min_answers AND max_answers
-            ORDER BY stage_id ASC LIMIT 1
-        """)
-    ).mappings().first()
+    # 성장단계 로드 (스타일 반영용, 메모리 구간 인덱스)
+    answered = max(0, int(get_global_state(db).get("current_question") or 1) - 1)
+    stage_row = load_growth_stage(db, answered, fallback_lowest=False)
     stage_name = stage_row.get("stage_name_kr") if stage_row else "태동기"
 
     prompt = f"""너는 전시 작품 '사노'야. 관람객이 민감한 주제를 언급했어.
@@ -183,6 +260,10 @@ def generate_policy_response(
 
 def clear_cache():
     """캐시 강제 초기화 (테스트/관리용)"""
-    global _rules_cache, _cache_time
+    global _rules_cache, _matcher, _cache_time
     _rules_cache = []
-    _cache_time = 0
\ No newline at end of file
+    _matcher = None
+    _cache_time = 0
+
+
+register_cache_listener(clear_cache)
@@ -0,0 +1,128 @@
+"""
+사이클별 답변 수 카운터 (psano_cycle_answer_counts)
+- answers INSERT/DELETE와 같은 트랜잭션에서 증감 → 조회는 PK 단건 (COUNT(*) 대체)
+- 서버 시작 시 / admin 요청 시 answers 기준으로 재집계 (reconcile)
+- 테이블은 services/schema_migrations.py에서 생성
+"""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from util.utils import log_event
+
+def increment(db: Session, cycle_id: int, n: int = 1, inserted: bool = True) -> int:
+    """
+    answers INSERT 전/후 호출 (commit은 호출자가). 증가 후 값 반환.
+    - 증가값은 LAST_INSERT_ID(expr)로 UPDATE 응답에 실려 옴 → 별도 SELECT 없음
+    - 카운터 행이 없으면 answers에서 한 번 집계해 초기화
+      (inserted=False면 아직 INSERT 전이므로 집계에 n을 더함)
+    """
+    res = db.execute(
+        text("""
+            UPDATE psano_cycle_answer_counts
+            SET answer_count = LAST_INSERT_ID(answer_count + :n)
+            WHERE cycle_id = :cycle_id
+        """),
+        {"cycle_id": cycle_id, "n": n}
+    )
+    if (res.rowcount or 0) > 0 and res.lastrowid:
+        return int(res.lastrowid)
+    if (res.rowcount or 0) == 0:
+        _init_from_answers(db, cycle_id, 0 if inserted else n)
+
+    return _read(db, cycle_id) or 0
+
+
+def decrement(db: Session, cycle_id: int, n: int) -> None:
+    """answers DELETE 직후 호출 (commit은 호출자가)"""
+    res = db.execute(
+        text("""
+            UPDATE psano_cycle_answer_counts
+            SET answer_count = GREATEST(answer_count - :n, 0)
+            WHERE cycle_id = :cycle_id
+        """),
+        {"cycle_id": cycle_id, "n": n}
+    )
+    if (res.rowcount or 0) == 0:
+        _init_from_answers(db, cycle_id)
+
+
+def get_answered_total(db: Session, cycle_id: int) -> int:
+    """현재 사이클 답변 수 (카운터 없으면 COUNT(*) fallback)"""
+    try:
+        n = _read(db, cycle_id)
+    except Exception:
+        n = None
+    if n is not None:
+        return n
+
+    row = db.execute(
+        text("SELECT COUNT(*) AS cnt FROM answers WHERE cycle_id = :cycle_id"),
+        {"cycle_id": cycle_id}
+    ).mappings().first()
+    return int(row["cnt"]) if row else 0
+
+
+def reset(db: Session) -> None:
+    """answers 전체 삭제 시 같이 비움 (commit은 호출자가)"""
+    db.execute(text("DELETE FROM psano_cycle_answer_counts"))
+
+
+def reconcile(db: Session) -> int:
+    """answers 기준으로 전체 재집계 (불일치 보정용) → 보정된 사이클 수"""
+    rows = db.execute(
+        text("""
+            SELECT a.cycle_id, a.cnt, c.answer_count
+            FROM (SELECT cycle_id, COUNT(*) AS cnt FROM answers GROUP BY cycle_id) a
+            LEFT JOIN psano_cycle_answer_counts c ON c.cycle_id = a.cycle_id
+        """)
+    ).mappings().all()
+
+    fixed = 0
+    for r in rows:
+        if r["cycle_id"] is None or r["answer_count"] == r["cnt"]:
+            continue
+        db.execute(
+            text("""
+                INSERT INTO psano_cycle_answer_counts (cycle_id, answer_count)
+                VALUES (:cycle_id, :cnt)
+                ON DUPLICATE KEY UPDATE answer_count = VALUES(answer_count)
+            """),
+            {"cycle_id": int(r["cycle_id"]), "cnt": int(r["cnt"])}
+        )
+        fixed += 1
+        log_event("answer_counter_fixed", cycle_id=r["cycle_id"], counter=r["answer_count"], actual=r["cnt"])
+
+    # answers가 하나도 없는 사이클은 0으로
+    res = db.execute(
+        text("""
+            UPDATE psano_cycle_answer_counts c
+            LEFT JOIN (SELECT DISTINCT cycle_id FROM answers) a ON a.cycle_id = c.cycle_id
+            SET c.answer_count = 0
+            WHERE a.cycle_id IS NULL AND c.answer_count <> 0
+        """)
+    )
+    fixed += res.rowcount or 0
+
+    db.commit()
+    return fixed
+
+
+def _read(db: Session, cycle_id: int) -> int | None:
+    row = db.execute(
+        text("SELECT answer_count FROM psano_cycle_answer_counts WHERE cycle_id = :cycle_id"),
+        {"cycle_id": cycle_id}
+    ).first()
+    return int(row[0]) if row else None
+
+
+def _init_from_answers(db: Session, cycle_id: int, pending: int = 0):
+    db.execute(
+        text("""
+            INSERT INTO psano_cycle_answer_counts (cycle_id, answer_count)
+            SELECT :cycle_id, COUNT(*) + :pending FROM answers WHERE cycle_id = :cycle_id
+            ON DUPLICATE KEY UPDATE answer_count = VALUES(answer_count)
+        """),
+        {"cycle_id": cycle_id, "pending": pending}
+    )
@@ -0,0 +1,180 @@
+"""
+혼잣말 카탈로그 (psano_idle 메모리 스냅샷)
+- psano_idle 전체를 한 번 로드해 id 인덱스 + value별 enabled 목록으로 보관
+- /idle/random은 value별 셔플 백에서 꺼냄 → 백이 빌 때까지 같은 혼잣말 반복 없음
+- admin idle import/토글 시 reload(), 다른 워커는 cache_version으로 무효화 후 다음 조회 때 재구성
+- 선호 value(psano_personality 기반)도 짧게 캐시 → /idle/random은 평소 DB 조회 없음
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from util.utils import CONFIG_CACHE_TTL, log_event, register_cache_listener, sync_cache_version
+
+IdleRow = Mapping[str, object]
+
+# 선호 value 캐시 (personality가 바뀌면 bump_personality_version, 다른 워커 반영은 TTL/cache_version으로)
+PREFERRED_VALUES_TTL = 30  # 초
+
+_ALL = "*"  # 전체 enabled 백 키 (value에 혼잣말이 없을 때 fallback)
+
+
+class IdleCatalog:
+    """불변 혼잣말 스냅샷 (생성 후 수정하지 않음)"""
+
+    __slots__ = ("by_id", "by_value", "enabled", "loaded_at")
+
+    def __init__(self, rows: Tuple[IdleRow, ...]):
+        self.by_id: Dict[int, IdleRow] = {int(r["id"]): r for r in rows}
+        self.enabled: Tuple[int, ...] = tuple(int(r["id"]) for r in rows if r["enable"])
+        by_value: Dict[str, List[int]] = {}
+        for r in rows:
+            if r["enable"]:
+                by_value.setdefault(r.get("value") or "", []).append(int(r["id"]))
+        self.by_value: Dict[str, Tuple[int, ...]] = {k: tuple(v) for k, v in by_value.items()}
+        self.loaded_at = time.time()
+
+    def get(self, idle_id: int, enabled_only: bool = True) -> IdleRow | None:
+        r = self.by_id.get(int(idle_id))
+        if r is None or (enabled_only and not r["enable"]):
+            return None
+        return r
+
+
+_catalog: IdleCatalog | None = None
+_load_lock = threading.Lock()
+
+# 셔플 백: key(value 또는 _ALL) → 남은 id 목록 (끝에서 pop)
+_bags: Dict[str, List[int]] = {}
+_bags_catalog: IdleCatalog | None = None  # 백을 만든 스냅샷 (교체되면 백 폐기)
+_last_served: Dict[str, int] = {}
+_bag_lock = threading.Lock()
+
+_preferred: Tuple[str, ...] = ()
+_preferred_at: float = 0
+_preferred_version: int = -1
+_personality_version: int = 0  # 이 워커에서 psano_personality를 바꿀 때마다 증가
+_personality_lock = threading.Lock()
+
+
+def _fetch(db: Session) -> IdleCatalog | None:
+    try:
+        rows = db.execute(
+            text("SELECT id, axis_key, question_text, value, enable FROM psano_idle ORDER BY id ASC")
+        ).mappings().all()
+    except Exception as e:
+        log_event("idle_catalog_error", error=str(e))
+        return None
+
+    return IdleCatalog(tuple(
+        MappingProxyType({**dict(r), "enable": bool(r["enable"])}) for r in rows
+    ))
+
+
+def get_catalog(db: Session) -> IdleCatalog:
+    """현재 스냅샷 (없거나 만료됐으면 로드)"""
+    sync_cache_version(db)
+    cat = _catalog
+    if cat is not None and time.time() - cat.loaded_at < CONFIG_CACHE_TTL:
+        return cat
+
+    with _load_lock:
+        cat = _catalog
+        if cat is not None and time.time() - cat.loaded_at < CONFIG_CACHE_TTL:
+            return cat
+        return reload(db) or cat or IdleCatalog(())
+
+
+def reload(db: Session) -> IdleCatalog | None:
+    """DB에서 다시 읽어 스냅샷 교체 (admin idle import/토글 후 호출, 셔플 백은 다음 draw에서 초기화)"""
+    global _catalog
+    cat = _fetch(db)
+    if cat is None:
+        return None
+    _catalog = cat
+    log_event("idle_catalog_loaded", total=len(cat.by_id), enabled=len(cat.enabled))
+    return cat
+
+
+def clear_cache():
+    """이 워커의 스냅샷 폐기 (다음 조회 때 재구성)"""
+    global _catalog, _preferred_at
+    _catalog = None
+    _preferred_at = 0
+
+
+def get_idle(db: Session, idle_id: int, enabled_only: bool = True) -> IdleRow | None:
+    return get_catalog(db).get(idle_id, enabled_only)
+
+
+def _draw(cat: IdleCatalog, key: str, ids: Tuple[int, ...]) -> int:
+    """셔플 백에서 1개 (백이 비면 다시 섞되, 직전 항목이 바로 다시 나오지 않게)"""
+    global _bags_catalog
+    with _bag_lock:
+        if _bags_catalog is not cat:
+            _bags.clear()
+            _bags_catalog = cat
+        bag = _bags.get(key)
+        if not bag:
+            bag = list(ids)
+            random.shuffle(bag)
+            # pop()은 끝에서 꺼내므로 직전 항목이 끝에 오면 앞으로 보냄
+            if len(bag) > 1 and bag[-1] == _last_served.get(key):
+                bag[0], bag[-1] = bag[-1], bag[0]
+            _bags[key] = bag
+        idle_id = bag.pop()
+        _last_served[key] = idle_id
+        return idle_id
+
+
+def draw(db: Session, value: str) -> IdleRow | None:
+    """value의 혼잣말 1개 (없으면 전체 enabled에서, 그것도 없으면 None)"""
+    cat = get_catalog(db)
+    ids = cat.by_value.get(value)
+    key = value
+    if not ids:
+        ids, key = cat.enabled, _ALL
+    if not ids:
+        return None
+    return cat.by_id[_draw(cat, key, ids)]
+
+
+def bump_personality_version():
+    """psano_personality 변경 commit 후 호출 (세션 종료 반영/리셋/관리자 설정) → 선호 value 다시 계산"""
+    global _personality_version
+    with _personality_lock:
+        _personality_version += 1
+
+
+def preferred_values(db: Session, compute) -> Tuple[str, ...]:
+    """
+    선호 value 목록 캐시.
+    compute(db)는 psano_personality 조회 함수. 이 워커의 personality 버전이 바뀌거나
+    (bump_personality_version) PREFERRED_VALUES_TTL이 지나면 다시 계산.
+    다른 워커의 관리자 변경/리셋은 cache_version → clear_cache로 반영.
+    """
+    global _preferred, _preferred_at, _preferred_version
+
+    sync_cache_version(db)
+    version = _personality_version
+    if (
+        _preferred
+        and version == _preferred_version
+        and time.time() - _preferred_at < PREFERRED_VALUES_TTL
+    ):
+        return _preferred
+
+    _preferred = tuple(compute(db))
+    _preferred_at = time.time()
+    _preferred_version = version
+    return _preferred
+
+
+register_cache_listener(clear_cache)
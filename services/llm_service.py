@@ -2,16 +2,24 @@
 공통 LLM 호출 래퍼
 - timeout, retry, model: psano_config에서 로드 (DB 우선, fallback 하드코딩)
 - fallback_code 매핑
+- 프롬프트는 str 또는 PromptParts(system, user): system은 사이클 동안 고정된 앞부분
+  → system 메시지로 먼저 보내 제공자 prefix 캐시가 맞게 하고, usage의 cached_tokens를 로그로 남김
 """
 from __future__ import annotations
 
 import time
+import random
+import asyncio
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, TYPE_CHECKING
+from typing import Any, AsyncIterator, Optional, TYPE_CHECKING
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
+from util.prompt_template import PromptParts
 from util.utils import get_config
 
 if TYPE_CHECKING:
@@ -21,12 +29,58 @@ if TYPE_CHECKING:
 DEFAULT_LLM_TIMEOUT = 8
 DEFAULT_LLM_RETRY_COUNT = 2
 DEFAULT_LLM_MODEL = "gpt-4o"
+DEFAULT_LLM_HEDGE_AFTER_MS = 0      # 0이면 hedging 끔 (p90 응답시간 정도로 설정 권장)
+DEFAULT_LLM_DEADLINE_MS = 0         # 재시도 포함 전체 제한시간 → 이후엔 즉시 fallback (0이면 timeout × 시도 수 + backoff)
+DEFAULT_LLM_BREAKER_THRESHOLD = 5   # 연속 실패 N회 → circuit open
+DEFAULT_LLM_BREAKER_COOLDOWN = 30   # open 유지 시간 (초) → 이후 half-open 1회 probe
+DEFAULT_LLM_CACHE_TTL = 3600        # 응답 캐시 TTL (초)
+DEFAULT_LLM_CACHE_MAX_ENTRIES = 512 # 응답 캐시 최대 키 수 (LRU)
+DEFAULT_LLM_CACHE_VARIETY = 3       # 키당 모아둘 응답 수 → 다 차면 그 중 랜덤 재사용
+
+# 재시도 간 대기 시간 (초)
+RETRY_BACKOFF_SEC = 0.5
 
 # OpenAI 클라이언트 (timeout은 호출 시 오버라이드)
-client = OpenAI(timeout=60)  # 최대 허용 timeout
+# 재시도는 call_llm/acall_llm이 deadline 안에서 직접 → SDK 내부 재시도(max_retries 기본 2)는 끔
+client = OpenAI(timeout=60, max_retries=0)  # 최대 허용 timeout
+async_client = AsyncOpenAI(timeout=60, max_retries=0)  # async 라우터용
 
 _llm_raw_logger = logging.getLogger("psano.llm_raw")
 
+# 누적 토큰 사용량 (prefix 캐시 효과 확인용)
+_usage_stats_lock = threading.Lock()
+_usage_stats = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+
+def _as_parts(prompt: "str | PromptParts") -> PromptParts:
+    if isinstance(prompt, PromptParts):
+        return prompt
+    return PromptParts("", prompt or "")
+
+
+def _tokens_info(usage) -> str:
+    """usage → 로그용 문자열 + 누적 통계 반영 (cached = 제공자 prefix 캐시 적중 토큰)"""
+    if not usage:
+        return "n/a"
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = int(getattr(details, "cached_tokens", 0) or 0)
+    prompt_tokens = int(usage.prompt_tokens or 0)
+    completion_tokens = int(usage.completion_tokens or 0)
+    with _usage_stats_lock:
+        _usage_stats["calls"] += 1
+        _usage_stats["prompt_tokens"] += prompt_tokens
+        _usage_stats["cached_tokens"] += cached
+        _usage_stats["completion_tokens"] += completion_tokens
+    return f"in={prompt_tokens}/out={completion_tokens}/cached={cached}"
+
+
+def usage_stats() -> dict[str, Any]:
+    """모니터링용 누적 토큰 통계 (cached_ratio = cached / prompt)"""
+    with _usage_stats_lock:
+        stats = dict(_usage_stats)
+    stats["cached_ratio"] = round(stats["cached_tokens"] / stats["prompt_tokens"], 3) if stats["prompt_tokens"] else 0.0
+    return stats
+
 
 @dataclass
 class LLMResult:
@@ -36,114 +90,546 @@ class LLMResult:
     fallback_code: Optional[str] = None
 
 
+class CircuitBreaker:
+    """
+    프로세스 단위 LLM circuit breaker
+    - closed: 정상 호출, 연속 실패가 threshold에 도달하면 open
+    - open: cooldown 동안 LLM을 부르지 않고 즉시 fallback (LLM_CIRCUIT_OPEN)
+    - half_open: cooldown 후 요청 1개만 probe로 통과 → 성공 시 closed, 실패 시 다시 open
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.probe_in_flight = False
+        self.probe_started_at = 0.0
+        self.total_short_circuited = 0
+
+    def allow(self, cooldown_sec: float) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.time() - (self.opened_at or 0) >= cooldown_sec:
+                self.state = "half_open"
+            # probe가 결과를 남기지 못하고 끊긴 경우(스트림 중단 등) cooldown 후 재-probe
+            probe_stuck = self.probe_in_flight and time.time() - self.probe_started_at >= cooldown_sec
+            if self.state == "half_open" and (not self.probe_in_flight or probe_stuck):
+                self.probe_in_flight = True
+                self.probe_started_at = time.time()
+                return True
+            self.total_short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                _llm_raw_logger.info("[LLM][CIRCUIT] state=closed | prev=%s", self.state)
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probe_in_flight = False
+
+    def record_failure(self, threshold: int):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.probe_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= threshold:
+                if self.state != "open":
+                    _llm_raw_logger.info(
+                        "[LLM][CIRCUIT] state=open | consecutive_failures=%d", self.consecutive_failures
+                    )
+                self.state = "open"
+                self.opened_at = time.time()
+
+    def snapshot(self) -> dict[str, Any]:
+        """모니터링용 상태"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened_at": self.opened_at,
+                "short_circuited": self.total_short_circuited,
+            }
+
+
+breaker = CircuitBreaker()
+
+
+# =========================
+# 응답 캐시 (LRU + TTL, 호출 시 cache=True로 opt-in)
+# =========================
+# key: (model, 정규화 프롬프트 hash 또는 호출자 지정 키, max_tokens) → [만료 시각, 응답 목록, 채운 횟수]
+# 채운 횟수는 응답이 같아도 증가 → 모델이 매번 같은 답을 내도 variety번 채우면 적중 시작
+_response_cache: "OrderedDict[tuple, list]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+_response_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _cache_key(prompt: PromptParts, model: str, max_tokens: int, cache_key: tuple | None = None) -> tuple:
+    """cache_key가 있으면 프롬프트 대신 그 키 사용 (프롬프트에 재사용과 무관한 값이 섞인 호출용)"""
+    if cache_key is not None:
+        return (model, cache_key, max_tokens)
+    normalized = " ".join(prompt.system.split()) + "\x00" + " ".join(prompt.user.split())
+    return (model, hashlib.sha256(normalized.encode("utf-8")).hexdigest(), max_tokens)
+
+
+def _cache_get(key: tuple, variety: int) -> str | None:
+    """variety번 채워졌으면 모인 응답 중 하나를 반환, 아직 덜 채워졌으면 None (→ LLM 호출)"""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry and entry[0] <= time.time():
+            del _response_cache[key]
+            entry = None
+        if not entry or entry[2] < max(1, variety):
+            _response_cache_stats["misses"] += 1
+            return None
+        _response_cache.move_to_end(key)
+        _response_cache_stats["hits"] += 1
+        return random.choice(entry[1])
+
+
+def _cache_put(key: tuple, content: str, settings: _LLMSettings):
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry and entry[0] > time.time():
+            entry[2] += 1
+            if len(entry[1]) < max(1, settings.cache_variety) and content not in entry[1]:
+                entry[1].append(content)
+        else:
+            _response_cache[key] = [time.time() + settings.cache_ttl, [content], 1]
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > settings.cache_max_entries:
+            _response_cache.popitem(last=False)
+
+
+def _cache_hit_result(model: str, content: str) -> LLMResult:
+    _llm_raw_logger.info("[LLM][CACHE_HIT] model=%s | response=%s", model, content[:100])
+    return LLMResult(success=True, content=content, fallback_code=None)
+
+
+def clear_response_cache():
+    """응답 캐시 초기화 (프롬프트 수정 후 등)"""
+    with _response_cache_lock:
+        _response_cache.clear()
+
+
+def response_cache_stats() -> dict[str, Any]:
+    """모니터링용 캐시 통계"""
+    with _response_cache_lock:
+        return {"entries": len(_response_cache), **_response_cache_stats}
+
+
+@dataclass
+class _LLMSettings:
+    """psano_config에서 읽은 LLM 호출 설정"""
+    timeout: float
+    retry_count: int
+    model: str
+    hedge_after_ms: int = 0
+    deadline_ms: int = DEFAULT_LLM_DEADLINE_MS
+    breaker_threshold: int = DEFAULT_LLM_BREAKER_THRESHOLD
+    breaker_cooldown: float = DEFAULT_LLM_BREAKER_COOLDOWN
+    cache_ttl: float = DEFAULT_LLM_CACHE_TTL
+    cache_max_entries: int = DEFAULT_LLM_CACHE_MAX_ENTRIES
+    cache_variety: int = DEFAULT_LLM_CACHE_VARIETY
+
+
+def _deadline_ms(timeout: float, retry_count: int, configured_ms: int) -> int:
+    """전체 deadline: 설정값이 있으면 그대로, 없으면(0) 모든 시도 + 시도 간 backoff가 들어가는 시간"""
+    if configured_ms and int(configured_ms) > 0:
+        return int(configured_ms)
+    attempts = max(1, int(retry_count))
+    return int((float(timeout) * attempts + RETRY_BACKOFF_SEC * (attempts - 1)) * 1000)
+
+
+def _load_llm_settings(db: "Session | None") -> _LLMSettings:
+    """LLM 설정 로드 - DB 없으면 기본값"""
+    if not db:
+        return _LLMSettings(
+            timeout=DEFAULT_LLM_TIMEOUT,
+            retry_count=DEFAULT_LLM_RETRY_COUNT,
+            model=DEFAULT_LLM_MODEL,
+            deadline_ms=_deadline_ms(DEFAULT_LLM_TIMEOUT, DEFAULT_LLM_RETRY_COUNT, DEFAULT_LLM_DEADLINE_MS),
+        )
+    timeout = get_config(db, "llm_timeout", DEFAULT_LLM_TIMEOUT)
+    retry_count = get_config(db, "llm_retry_count", DEFAULT_LLM_RETRY_COUNT)
+    return _LLMSettings(
+        timeout=timeout,
+        retry_count=retry_count,
+        model=get_config(db, "default_llm_model", DEFAULT_LLM_MODEL),
+        hedge_after_ms=get_config(db, "llm_hedge_after_ms", DEFAULT_LLM_HEDGE_AFTER_MS),
+        deadline_ms=_deadline_ms(timeout, retry_count, get_config(db, "llm_deadline_ms", DEFAULT_LLM_DEADLINE_MS)),
+        breaker_threshold=get_config(db, "llm_breaker_threshold", DEFAULT_LLM_BREAKER_THRESHOLD),
+        breaker_cooldown=get_config(db, "llm_breaker_cooldown_sec", DEFAULT_LLM_BREAKER_COOLDOWN),
+        cache_ttl=get_config(db, "llm_cache_ttl_sec", DEFAULT_LLM_CACHE_TTL),
+        cache_max_entries=get_config(db, "llm_cache_max_entries", DEFAULT_LLM_CACHE_MAX_ENTRIES),
+        cache_variety=get_config(db, "llm_cache_variety", DEFAULT_LLM_CACHE_VARIETY),
+    )
+
+
+def _build_request(prompt: PromptParts, model: str, max_tokens: int, llm_timeout: float) -> dict[str, Any]:
+    """chat.completions.create 인자 구성 (sync/async 공용, system이 있으면 맨 앞 메시지로)"""
+    messages = []
+    if prompt.system:
+        messages.append({"role": "system", "content": prompt.system})
+    messages.append({"role": "user", "content": prompt.user})
+    kwargs: dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "timeout": llm_timeout,
+    }
+    # GPT-5, o1, o3 모델은 max_completion_tokens 사용
+    is_new_model = any(x in model for x in ['gpt-5', 'gpt-4.1', 'o1', 'o3'])
+    if is_new_model:
+        kwargs["max_completion_tokens"] = max_tokens
+    else:
+        kwargs["max_tokens"] = max_tokens
+    return kwargs
+
+
+def _log_request(prompt: PromptParts, model: str, attempt: int, llm_retry_count: int, max_tokens: int):
+    # 요청 로그 (간결한 요약)
+    system_len = len(prompt.system)
+    prompt_len = system_len + len(prompt.user)
+    _llm_raw_logger.info(
+        "[LLM][REQ] model=%s | attempt=%d/%d | max_tokens=%d | prompt_len=%d | system_len=%d",
+        model, attempt + 1, llm_retry_count, max_tokens, prompt_len, system_len
+    )
+
+
+def _extract_content(resp, model: str, t0: float) -> str:
+    """응답에서 content 추출 + 로깅 (실패 시 예외)"""
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    if not resp.choices:
+        _llm_raw_logger.info("[LLM][RESP] model=%s | status=error | elapsed=%.0fms | error=no_choices", model, elapsed_ms)
+        raise RuntimeError("no choices in response")
+
+    message = resp.choices[0].message
+    content = (message.content or "").strip()
+
+    if not content:
+        _llm_raw_logger.info("[LLM][RESP] model=%s | status=error | elapsed=%.0fms | error=empty_content", model, elapsed_ms)
+        raise RuntimeError("empty output from LLM")
+
+    # 성공 응답 로그
+    content_len = len(content)
+    tokens_info = _tokens_info(getattr(resp, "usage", None))
+    _llm_raw_logger.info(
+        "[LLM][RESP] model=%s | status=ok | elapsed=%.0fms | tokens=%s | content_len=%d",
+        model, elapsed_ms, tokens_info, content_len
+    )
+    # 실제 응답 내용 (별도 라인)
+    _llm_raw_logger.info("[LLM][CONTENT] %s", content[:500] + "..." if len(content) > 500 else content)
+    return content
+
+
+def _log_attempt_error(model: str, attempt: int, llm_retry_count: int, e: Exception):
+    _llm_raw_logger.info(
+        "[LLM][ERROR] model=%s | attempt=%d/%d | error=%s: %s",
+        model, attempt + 1, llm_retry_count, type(e).__name__, str(e)[:200]
+    )
+
+
+def _circuit_open_result(model: str, fallback_text: str) -> LLMResult:
+    # circuit open → LLM 호출 없이 즉시 fallback
+    _llm_raw_logger.info("[LLM][SKIP] model=%s | circuit_open", model)
+    return LLMResult(success=False, content=fallback_text, fallback_code="LLM_CIRCUIT_OPEN")
+
+
+def _failed_result(model: str, last_error: Exception | None, fallback_text: str, settings: _LLMSettings) -> LLMResult:
+    # 모든 재시도 실패
+    breaker.record_failure(settings.breaker_threshold)
+    _llm_raw_logger.info("[LLM][FAILED] model=%s | all_retries_exhausted | error=%s", model, str(last_error)[:200])
+    fallback_code = _map_error_to_code(last_error)
+    return LLMResult(
+        success=False,
+        content=fallback_text,
+        fallback_code=fallback_code,
+    )
+
+
 def call_llm(
-    prompt: str,
+    prompt: "str | PromptParts",
     *,
     db: "Session | None" = None,
     model: str | None = None,
     max_tokens: int = 150,
     fallback_text: str = "",
+    cache: bool = False,
+    cache_key: tuple | None = None,
 ) -> LLMResult:
     """
     공통 LLM 호출 래퍼
 
     Args:
-        prompt: 프롬프트 텍스트
+        prompt: 프롬프트 텍스트 또는 PromptParts(system 고정 앞부분, user 가변 뒷부분)
         db: DB 세션 (설정 로드용, 없으면 기본값 사용)
         model: 모델명 (기본: psano_config.default_llm_model)
         max_tokens: 최대 토큰 수
         fallback_text: 실패 시 반환할 텍스트
+        cache: True면 응답 캐시 사용 (상태별로 결정적인 프롬프트용)
+        cache_key: 캐시 키를 프롬프트 대신 지정 (예: 성장단계 × 질문 × 선택, cache=True일 때만)
 
     Returns:
         LLMResult: success, content, fallback_code
     """
+    prompt = _as_parts(prompt)
+
     # DB에서 설정 로드 (없으면 기본값)
-    if db:
-        llm_timeout = get_config(db, "llm_timeout", DEFAULT_LLM_TIMEOUT)
-        llm_retry_count = get_config(db, "llm_retry_count", DEFAULT_LLM_RETRY_COUNT)
-        default_model = get_config(db, "default_llm_model", DEFAULT_LLM_MODEL)
-    else:
-        llm_timeout = DEFAULT_LLM_TIMEOUT
-        llm_retry_count = DEFAULT_LLM_RETRY_COUNT
-        default_model = DEFAULT_LLM_MODEL
+    settings = _load_llm_settings(db)
+    llm_retry_count = settings.retry_count
+    deadline = time.perf_counter() + settings.deadline_ms / 1000
 
-    model = model or default_model
+    model = model or settings.model
     last_error = None
 
+    key = _cache_key(prompt, model, max_tokens, cache_key) if cache else None
+    if key:
+        cached = _cache_get(key, settings.cache_variety)
+        if cached is not None:
+            return _cache_hit_result(model, cached)
+
+    if not breaker.allow(settings.breaker_cooldown):
+        return _circuit_open_result(model, fallback_text)
+
     for attempt in range(llm_retry_count):
+        # 전체 deadline 안에서만 시도 (남은 시간으로 timeout 축소)
+        attempt_timeout = min(settings.timeout, deadline - time.perf_counter())
+        if attempt_timeout <= 0:
+            last_error = _deadline_error(settings)
+            break
+
         try:
             t0 = time.perf_counter()
+            _log_request(prompt, model, attempt, llm_retry_count, max_tokens)
 
-            # GPT-5, o1, o3 모델은 max_completion_tokens 사용
-            is_new_model = any(x in model for x in ['gpt-5', 'gpt-4.1', 'o1', 'o3'])
+            resp = client.chat.completions.create(**_build_request(prompt, model, max_tokens, attempt_timeout))
+            content = _extract_content(resp, model, t0)
 
-            # 요청 로그 (간결한 요약)
-            prompt_len = len(prompt) if prompt else 0
-            _llm_raw_logger.info(
-                "[LLM][REQ] model=%s | attempt=%d/%d | max_tokens=%d | prompt_len=%d",
-                model, attempt + 1, llm_retry_count, max_tokens, prompt_len
-            )
+            breaker.record_success()
+            if key and content:
+                _cache_put(key, content, settings)
+            return LLMResult(success=True, content=content, fallback_code=None)
 
-            if is_new_model:
-                resp = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_completion_tokens=max_tokens,
-                    timeout=llm_timeout,
-                )
-            else:
-                resp = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=max_tokens,
-                    timeout=llm_timeout,
-                )
+        except Exception as e:
+            last_error = e
+            _log_attempt_error(model, attempt, llm_retry_count, e)
+            # 마지막 시도가 아니면 잠시 대기 후 재시도
+            if attempt < llm_retry_count - 1:
+                time.sleep(RETRY_BACKOFF_SEC)
+            continue
+
+    return _failed_result(model, last_error, fallback_text, settings)
+
+
+async def acall_llm(
+    prompt: "str | PromptParts",
+    *,
+    db: "Session | None" = None,
+    model: str | None = None,
+    max_tokens: int = 150,
+    fallback_text: str = "",
+    cache: bool = False,
+    cache_key: tuple | None = None,
+) -> LLMResult:
+    """
+    call_llm의 async 버전 (AsyncOpenAI + asyncio.sleep)
+    - LLM 대기 중 threadpool 워커를 점유하지 않음
+    - 인자/반환값은 call_llm과 동일
+    """
+    prompt = _as_parts(prompt)
 
-            elapsed_ms = (time.perf_counter() - t0) * 1000
+    # 설정 캐시 만료 시 SELECT가 나가므로 이벤트 루프 밖에서 로드
+    settings = await asyncio.to_thread(_load_llm_settings, db)
+    llm_retry_count = settings.retry_count
+    deadline = time.perf_counter() + settings.deadline_ms / 1000
 
-            if not resp.choices:
-                _llm_raw_logger.info("[LLM][RESP] model=%s | status=error | elapsed=%.0fms | error=no_choices", model, elapsed_ms)
-                raise RuntimeError("no choices in response")
+    model = model or settings.model
+    last_error = None
 
-            message = resp.choices[0].message
-            content = (message.content or "").strip()
+    key = _cache_key(prompt, model, max_tokens, cache_key) if cache else None
+    if key:
+        cached = _cache_get(key, settings.cache_variety)
+        if cached is not None:
+            return _cache_hit_result(model, cached)
 
-            if not content:
-                _llm_raw_logger.info("[LLM][RESP] model=%s | status=error | elapsed=%.0fms | error=empty_content", model, elapsed_ms)
-                raise RuntimeError("empty output from LLM")
+    if not breaker.allow(settings.breaker_cooldown):
+        return _circuit_open_result(model, fallback_text)
 
-            # 성공 응답 로그
-            content_len = len(content)
-            usage = getattr(resp, "usage", None)
-            tokens_info = f"in={usage.prompt_tokens}/out={usage.completion_tokens}" if usage else "n/a"
-            _llm_raw_logger.info(
-                "[LLM][RESP] model=%s | status=ok | elapsed=%.0fms | tokens=%s | content_len=%d",
-                model, elapsed_ms, tokens_info, content_len
-            )
-            # 실제 응답 내용 (별도 라인)
-            _llm_raw_logger.info("[LLM][CONTENT] %s", content[:500] + "..." if len(content) > 500 else content)
+    for attempt in range(llm_retry_count):
+        attempt_timeout = min(settings.timeout, deadline - time.perf_counter())
+        if attempt_timeout <= 0:
+            last_error = _deadline_error(settings)
+            break
 
+        try:
+            _log_request(prompt, model, attempt, llm_retry_count, max_tokens)
+            content = await _hedged_request(prompt, model, max_tokens, attempt_timeout, settings.hedge_after_ms)
+            breaker.record_success()
+            if key and content:
+                _cache_put(key, content, settings)
             return LLMResult(success=True, content=content, fallback_code=None)
 
         except Exception as e:
             last_error = e
-            _llm_raw_logger.info(
-                "[LLM][ERROR] model=%s | attempt=%d/%d | error=%s: %s",
-                model, attempt + 1, llm_retry_count, type(e).__name__, str(e)[:200]
-            )
-            # 마지막 시도가 아니면 잠시 대기 후 재시도
+            _log_attempt_error(model, attempt, llm_retry_count, e)
             if attempt < llm_retry_count - 1:
-                time.sleep(0.5)
+                await asyncio.sleep(RETRY_BACKOFF_SEC)
             continue
 
-    # 모든 재시도 실패
-    _llm_raw_logger.info("[LLM][FAILED] model=%s | all_retries_exhausted | error=%s", model, str(last_error)[:200])
-    fallback_code = _map_error_to_code(last_error)
-    return LLMResult(
-        success=False,
-        content=fallback_text,
-        fallback_code=fallback_code,
-    )
+    return _failed_result(model, last_error, fallback_text, settings)
+
+
+async def _single_request(prompt: PromptParts, model: str, max_tokens: int, timeout: float) -> str:
+    t0 = time.perf_counter()
+    resp = await async_client.chat.completions.create(**_build_request(prompt, model, max_tokens, timeout))
+    return _extract_content(resp, model, t0)
+
+
+async def _hedged_request(prompt: PromptParts, model: str, max_tokens: int, timeout: float, hedge_after_ms: int) -> str:
+    """
+    hedged 요청: hedge_after_ms 안에 응답이 없으면 같은 요청을 하나 더 보내고
+    먼저 성공한 쪽을 사용, 나머지는 취소. 전체는 timeout을 넘지 않음.
+    """
+    loop = asyncio.get_running_loop()
+    end_at = loop.time() + timeout
+    hedge_after = hedge_after_ms / 1000
+    hedge_at = loop.time() + hedge_after if 0 < hedge_after < timeout else None
+
+    pending = {asyncio.create_task(_single_request(prompt, model, max_tokens, timeout))}
+    last_error: BaseException | None = None
+
+    try:
+        while pending:
+            until = hedge_at if hedge_at is not None else end_at
+            wait_for = until - loop.time()
+            if wait_for <= 0 and hedge_at is None:
+                break
+
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, wait_for), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+
+            if hedge_at is not None and loop.time() >= hedge_at:
+                hedge_at = None
+                if pending:
+                    # 1차 요청이 hedge 기준(p90)을 넘김 → 보조 요청 발사
+                    _llm_raw_logger.info("[LLM][HEDGE] model=%s | after=%dms", model, hedge_after_ms)
+                    remaining = end_at - loop.time()
+                    pending.add(asyncio.create_task(_single_request(prompt, model, max_tokens, remaining)))
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if last_error is not None:
+        raise last_error
+    raise TimeoutError(f"request timed out after {timeout:.1f}s")
+
+
+def _deadline_error(settings: _LLMSettings) -> TimeoutError:
+    return TimeoutError(f"llm deadline timed out ({settings.deadline_ms}ms)")
+
+
+class LLMStream:
+    """
+    스트리밍 LLM 호출 (SSE 등)
+    - async for로 토큰(delta)을 받고, 종료 후 .result에 LLMResult가 채워짐
+    - 첫 토큰 전 실패만 재시도 (이미 내보낸 토큰은 되돌릴 수 없음)
+    """
+
+    def __init__(
+        self,
+        prompt: "str | PromptParts",
+        *,
+        db: "Session | None" = None,
+        model: str | None = None,
+        max_tokens: int = 150,
+        fallback_text: str = "",
+    ):
+        self.prompt = _as_parts(prompt)
+        self.db = db
+        self.model = model
+        self.max_tokens = max_tokens
+        self.fallback_text = fallback_text
+        self.result: LLMResult | None = None
+        self.ttft_ms: float | None = None
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        settings = await asyncio.to_thread(_load_llm_settings, self.db)
+        llm_retry_count = settings.retry_count
+        deadline = time.perf_counter() + settings.deadline_ms / 1000
+        model = self.model or settings.model
+        last_error = None
+
+        if not breaker.allow(settings.breaker_cooldown):
+            self.result = _circuit_open_result(model, self.fallback_text)
+            return
+
+        for attempt in range(llm_retry_count):
+            chunks: list[str] = []
+            usage = None
+            attempt_timeout = min(settings.timeout, deadline - time.perf_counter())
+            if attempt_timeout <= 0:
+                last_error = _deadline_error(settings)
+                break
+            try:
+                t0 = time.perf_counter()
+                _log_request(self.prompt, model, attempt, llm_retry_count, self.max_tokens)
+
+                kwargs = _build_request(self.prompt, model, self.max_tokens, attempt_timeout)
+                stream = await async_client.chat.completions.create(
+                    **kwargs,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                async for event in stream:
+                    if getattr(event, "usage", None):
+                        usage = event.usage
+                    if not event.choices:
+                        continue
+                    delta = event.choices[0].delta.content or ""
+                    if not delta:
+                        continue
+                    if self.ttft_ms is None:
+                        self.ttft_ms = (time.perf_counter() - t0) * 1000
+                    chunks.append(delta)
+                    yield delta
+
+                elapsed_ms = (time.perf_counter() - t0) * 1000
+                content = "".join(chunks).strip()
+                if not content:
+                    _llm_raw_logger.info("[LLM][RESP] model=%s | status=error | elapsed=%.0fms | error=empty_content", model, elapsed_ms)
+                    raise RuntimeError("empty output from LLM")
+
+                tokens_info = _tokens_info(usage)
+                _llm_raw_logger.info(
+                    "[LLM][RESP] model=%s | status=ok | elapsed=%.0fms | ttft=%.0fms | tokens=%s | content_len=%d",
+                    model, elapsed_ms, self.ttft_ms or 0, tokens_info, len(content)
+                )
+                _llm_raw_logger.info("[LLM][CONTENT] %s", content[:500] + "..." if len(content) > 500 else content)
+
+                breaker.record_success()
+                self.result = LLMResult(success=True, content=content, fallback_code=None)
+                return
+
+            except Exception as e:
+                last_error = e
+                _log_attempt_error(model, attempt, llm_retry_count, e)
+                if chunks:
+                    # 이미 일부를 내보냈으면 재시도하지 않음
+                    break
+                if attempt < llm_retry_count - 1:
+                    await asyncio.sleep(RETRY_BACKOFF_SEC)
+                continue
+
+        self.result = _failed_result(model, last_error, self.fallback_text, settings)
 
 
 def _map_error_to_code(error: Exception | None) -> str:
@@ -0,0 +1,125 @@
+"""
+질문 카탈로그 (questions 메모리 스냅샷)
+- questions 전체를 한 번 로드해 불변 tuple + id 인덱스 + next_enabled 점프 테이블로 보관
+- next_enabled[i] = id >= i 인 첫 enabled 질문 id (없으면 0) → "WHERE id >= :x AND enabled = 1 ORDER BY id LIMIT 1" 대체
+- admin 질문 import/토글 시 reload(), 다른 워커는 cache_version으로 무효화 후 다음 조회 때 재구성
+- 스냅샷은 통째로 교체 (읽는 쪽은 락 없이 참조 하나만 잡고 사용)
+"""
+from __future__ import annotations
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from util.utils import CONFIG_CACHE_TTL, log_event, register_cache_listener, sync_cache_version
+
+QuestionRow = Mapping[str, object]
+
+
+class QuestionCatalog:
+    """불변 질문 스냅샷 (생성 후 수정하지 않음)"""
+
+    __slots__ = ("rows", "by_id", "next_enabled", "loaded_at")
+
+    def __init__(self, rows: Tuple[QuestionRow, ...]):
+        self.rows = rows
+        self.by_id: Dict[int, QuestionRow] = {int(r["id"]): r for r in rows}
+        self.loaded_at = time.time()
+
+        # 뒤에서부터 채우기: 인덱스 0 ~ max_id+1 (max_id+1은 항상 0 = 없음)
+        max_id = max(self.by_id) if self.by_id else 0
+        table = [0] * (max_id + 2)
+        nxt = 0
+        for i in range(max_id, -1, -1):
+            r = self.by_id.get(i)
+            if r is not None and r["enabled"]:
+                nxt = i
+            table[i] = nxt
+        self.next_enabled: Tuple[int, ...] = tuple(table)
+
+    def get(self, qid: int) -> QuestionRow | None:
+        return self.by_id.get(int(qid))
+
+    def next_enabled_from(self, qid: int) -> QuestionRow | None:
+        """id >= qid 인 첫 enabled 질문"""
+        qid = max(0, int(qid))
+        if qid >= len(self.next_enabled):
+            return None
+        nid = self.next_enabled[qid]
+        return self.by_id[nid] if nid else None
+
+    def enabled_rows(self) -> Tuple[QuestionRow, ...]:
+        return tuple(r for r in self.rows if r["enabled"])
+
+
+_catalog: QuestionCatalog | None = None
+_load_lock = threading.Lock()
+
+
+def _fetch(db: Session) -> QuestionCatalog | None:
+    try:
+        rows = db.execute(
+            text("""
+                SELECT id, axis_key, question_text, choice_a, choice_b, enabled, value_a_key, value_b_key
+                FROM questions
+                ORDER BY id ASC
+            """)
+        ).mappings().all()
+    except Exception as e:
+        log_event("question_catalog_error", error=str(e))
+        return None
+
+    return QuestionCatalog(tuple(
+        MappingProxyType({**dict(r), "enabled": bool(r["enabled"])}) for r in rows
+    ))
+
+
+def get_catalog(db: Session) -> QuestionCatalog:
+    """현재 스냅샷 (없거나 만료됐으면 로드)"""
+    sync_cache_version(db)
+    cat = _catalog
+    if cat is not None and time.time() - cat.loaded_at < CONFIG_CACHE_TTL:
+        return cat
+
+    with _load_lock:
+        cat = _catalog
+        if cat is not None and time.time() - cat.loaded_at < CONFIG_CACHE_TTL:
+            return cat
+        return reload(db) or cat or QuestionCatalog(())
+
+
+def reload(db: Session) -> QuestionCatalog | None:
+    """DB에서 다시 읽어 스냅샷 교체 (admin 질문 import/토글 후 호출)"""
+    global _catalog
+    cat = _fetch(db)
+    if cat is None:
+        return None
+    _catalog = cat
+    log_event("question_catalog_loaded", questions=len(cat.rows), enabled=len(cat.enabled_rows()))
+    return cat
+
+
+def clear_cache():
+    """이 워커의 스냅샷 폐기 (다음 조회 때 재구성)"""
+    global _catalog
+    _catalog = None
+
+
+def get_question(db: Session, qid: int) -> QuestionRow | None:
+    return get_catalog(db).get(qid)
+
+
+def next_enabled(db: Session, qid: int) -> QuestionRow | None:
+    """id >= qid 인 첫 enabled 질문 (없으면 None)"""
+    return get_catalog(db).next_enabled_from(qid)
+
+
+def enabled_questions(db: Session) -> Tuple[QuestionRow, ...]:
+    return get_catalog(db).enabled_rows()
+
+
+register_cache_listener(clear_cache)
@@ -0,0 +1,164 @@
+"""
+형성기 반응 풀 (psano_reaction_pool)
+- (question_id, choice, stage_id, is_last) 별로 GPT 반응을 K개 미리 생성해 저장
+- /answer는 풀에서 랜덤 1개를 꺼내 쓰고, 없을 때만 실시간 생성
+- 테이블은 services/schema_migrations.py에서 생성
+"""
+from __future__ import annotations
+
+import random
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from util.utils import get_config, log_event
+from services import answer_counter, question_catalog
+from services.reaction_prompt import build_reaction_request, reaction_stage_id
+from util.constants import DEFAULT_SESSION_QUESTION_LIMIT
+
+DEFAULT_REACTION_POOL_SIZE = 3
+
+# 생성 job 중복 실행 방지
+_job_lock = threading.Lock()
+
+
+def pick_reaction(db: Session, question_id: int, choice: str, stage_id: int, is_last: bool) -> str | None:
+    """풀에서 반응 1개 랜덤 선택 (없거나 테이블이 없으면 None → 실시간 생성)"""
+    try:
+        rows = db.execute(
+            text("""
+                SELECT reaction_text FROM psano_reaction_pool
+                WHERE question_id = :qid AND choice = :choice AND stage_id = :stage_id AND is_last = :is_last
+            """),
+            {"qid": question_id, "choice": choice, "stage_id": stage_id, "is_last": int(is_last)}
+        ).fetchall()
+    except Exception:
+        # 답변 저장 트랜잭션 안에서도 호출되므로 rollback 하지 않음 (SELECT 실패는 트랜잭션에 영향 없음)
+        return None
+
+    if not rows:
+        return None
+    return random.choice(rows)[0]
+
+
+def clear_pool(db: Session) -> int:
+    """풀 전체 삭제 (프롬프트/성장단계 수정 후 재생성용)"""
+    result = db.execute(text("DELETE FROM psano_reaction_pool"))
+    db.commit()
+    return result.rowcount or 0
+
+
+def is_generating() -> bool:
+    return _job_lock.locked()
+
+
+def _projected_answered_totals(db: Session, questions) -> dict[int, int]:
+    """
+    질문별로 답해질 시점의 answered_total 추정 (실시간 경로와 같은 사이클 답변 카운터 기준)
+    - current_question 이후: 현재 사이클 답변 수 + 남은 enabled 질문 순서
+    - 그 앞(이번 사이클엔 다시 안 나옴): 다음 사이클에서 0부터 enabled 순서대로
+    """
+    row = db.execute(
+        text("SELECT cycle_number, current_question FROM psano_state WHERE id = 1")
+    ).mappings().first()
+    cycle = int((row or {}).get("cycle_number") or 1)
+    current_q = int((row or {}).get("current_question") or 1)
+    answered_now = answer_counter.get_answered_total(db, cycle)
+
+    enabled = question_catalog.enabled_questions(db)
+    ahead = [int(q["id"]) for q in enabled if int(q["id"]) >= current_q]
+    position = {int(q["id"]): i + 1 for i, q in enumerate(enabled)}
+    position_ahead = {qid: i + 1 for i, qid in enumerate(ahead)}
+
+    totals = {}
+    for q in questions:
+        qid = int(q["id"])
+        if qid in position_ahead:
+            totals[qid] = answered_now + position_ahead[qid]
+        else:
+            totals[qid] = position.get(qid, qid)
+    return totals
+
+
+def generate_pool(per_key: int | None = None, question_ids: list[int] | None = None):
+    """
+    반응 풀 생성 job (BackgroundTasks에서 실행, 자체 DB 세션 사용)
+    - enabled 질문마다, 해당 질문을 답할 시점의 성장단계 기준으로 A/B × (일반/마지막) 반응 생성
+      (성장단계는 /answer와 같이 사이클 answered_total로 결정 → _projected_answered_totals)
+    - 이미 per_key개 있는 키는 건너뜀 (부족한 만큼만 채움)
+    - LLM 실패(fallback) 결과는 저장하지 않음
+    """
+    from database import SessionLocal
+    from services.llm_service import call_llm
+
+    if not _job_lock.acquire(blocking=False):
+        log_event("reaction_pool_skip", reason="already running")
+        return
+
+    db = SessionLocal()
+    inserted = 0
+    failed = 0
+    try:
+        per_key = per_key or get_config(db, "reaction_pool_size", DEFAULT_REACTION_POOL_SIZE)
+        session_limit = get_config(db, "session_question_limit", DEFAULT_SESSION_QUESTION_LIMIT)
+
+        questions = question_catalog.enabled_questions(db)
+        if question_ids:
+            wanted = set(question_ids)
+            questions = [q for q in questions if int(q["id"]) in wanted]
+
+        answered_totals = _projected_answered_totals(db, questions)
+
+        log_event("reaction_pool_start", questions=len(questions), per_key=per_key)
+
+        for idx, q in enumerate(questions):
+            qid = int(q["id"])
+            answered_total = answered_totals[qid]
+            stage_id = reaction_stage_id(db, answered_total)
+            next_question_text = questions[idx + 1]["question_text"] if idx + 1 < len(questions) else ""
+
+            for choice in ("A", "B"):
+                for is_last in (False, True):
+                    have = db.execute(
+                        text("""
+                            SELECT COUNT(*) FROM psano_reaction_pool
+                            WHERE question_id = :qid AND choice = :choice AND stage_id = :stage_id AND is_last = :is_last
+                        """),
+                        {"qid": qid, "choice": choice, "stage_id": stage_id, "is_last": int(is_last)}
+                    ).scalar() or 0
+
+                    for _ in range(max(0, per_key - int(have))):
+                        prompt, _fallback, max_tokens = build_reaction_request(
+                            db,
+                            q["question_text"] or "",
+                            choice,
+                            "",
+                            session_limit if is_last else 1,
+                            answered_total,
+                            "" if is_last else next_question_text,
+                        )
+                        result = call_llm(prompt, db=db, max_tokens=max_tokens)
+                        if not result.success or not result.content:
+                            failed += 1
+                            continue
+
+                        db.execute(
+                            text("""
+                                INSERT INTO psano_reaction_pool (question_id, choice, stage_id, is_last, reaction_text)
+                                VALUES (:qid, :choice, :stage_id, :is_last, :reaction)
+                            """),
+                            {"qid": qid, "choice": choice, "stage_id": stage_id,
+                             "is_last": int(is_last), "reaction": result.content[:255]}
+                        )
+                        db.commit()
+                        inserted += 1
+
+        log_event("reaction_pool_done", inserted=inserted, failed=failed)
+
+    except Exception as e:
+        db.rollback()
+        log_event("reaction_pool_error", error=str(e), inserted=inserted)
+    finally:
+        db.close()
+        _job_lock.release()
@@ -0,0 +1,105 @@
+"""
+형성기 반응 프롬프트 (/answer 실시간·prefetch 생성, 반응 풀 생성 job 공용)
+- 반응은 답변 시점의 성장단계로 만듦 → 단계는 현재 사이클 answered_total(answer_counter) 기준
+"""
+from __future__ import annotations
+
+import time
+
+from sqlalchemy.orm import Session
+
+from util.utils import load_growth_stage, get_config, get_prompt_template, render_prompt
+from util.constants import DEFAULT_SESSION_QUESTION_LIMIT
+
+# 하드코딩 fallback (DB 없을 때)
+_DEFAULT_FALLBACK_REACTIONS = ["흠, 그렇구나.", "알겠어.", "오케이."]
+_DEFAULT_FALLBACK_LAST = "좋아. 오늘은 여기까지 해보자."
+
+
+def reaction_stage_id(db: Session, answered_total: int) -> int:
+    """answered_total(해당 답변 포함 사이클 답변 수) 시점의 성장단계 id (반응 풀 키)"""
+    stage = load_growth_stage(db, answered_total) or {}
+    return int(stage.get("stage_id") or 1)
+
+
+def reaction_cache_key(db: Session, question_id: int, choice: str, answered_total: int, is_last: bool) -> tuple:
+    """
+    반응 응답 캐시 키: 성장단계 × 질문 × 선택 (+ 마지막 여부) - 반응 풀 키와 같은 단위.
+    프롬프트의 진행도/다음 질문 텍스트는 세션마다 달라 키에서 제외 (넣으면 세션 간 재사용이 거의 없음)
+    """
+    return ("reaction", reaction_stage_id(db, answered_total), int(question_id), choice, bool(is_last))
+
+
+def build_reaction_request(
+    db: Session,
+    question_text: str,
+    choice: str,
+    chosen_value_key: str,
+    session_question_index: int,
+    answered_total: int,
+    next_question_text: str = "",
+) -> tuple[str, str, int]:
+    """반응 프롬프트 구성 (DB 조회 포함) → (prompt, fallback_text, max_tokens)"""
+    # 설정 로드
+    session_limit = get_config(db, "session_question_limit", DEFAULT_SESSION_QUESTION_LIMIT)
+    fallback_reactions = get_config(db, "fallback_reactions", _DEFAULT_FALLBACK_REACTIONS)
+    fallback_last = get_config(db, "fallback_reaction_last", _DEFAULT_FALLBACK_LAST)
+    reaction_max_tokens = get_config(db, "reaction_max_tokens", 50)
+
+    is_last = session_question_index >= session_limit
+
+    # 성장단계 로드
+    stage = load_growth_stage(db, answered_total) or {}
+    stage_name = stage.get("stage_name_kr") or "태동기"
+    style_guide = stage.get("style_guide") or ""
+    notes = (stage.get("notes") or "").strip()
+
+    # 프롬프트 템플릿 로드 (DB에서)
+    prompt_template = get_prompt_template(db, "reaction_prompt")
+
+    if prompt_template:
+        # DB 템플릿 사용
+        notes_line = f"[말투 예시: {notes}]" if notes else ""
+        last_instruction = '마지막이니까 "오늘은 여기까지" 느낌으로' if is_last else "다음으로 넘어가는 느낌"
+
+        prompt = render_prompt(
+            prompt_template,
+            stage_name=stage_name,
+            style_guide=style_guide,
+            notes_line=notes_line,
+            question_text=question_text,
+            current_question_text=question_text,  # 템플릿 호환용 별칭
+            next_question_text=next_question_text,
+            choice=choice,
+            session_question_index=session_question_index,
+            session_question_limit=session_limit,
+            last_instruction=last_instruction,
+        )
+    else:
+        # fallback: 하드코딩 프롬프트
+        prompt = f"""너는 전시 작품 '사노'야. 관람객이 질문에 답했어.
+
+[성장단계: {stage_name}]
+[스타일: {style_guide}]
+{f'[말투 예시: {notes}]' if notes else ''}
+
+질문: {question_text}
+선택: {choice}
+진행: {session_question_index}/{session_limit}
+
+규칙:
+- 한국어, 30자 이내
+- 판단/평가 금지
+- 가볍게 수긍하거나 호기심 표현
+- {'마지막이니까 "오늘은 여기까지" 느낌으로' if is_last else '다음으로 넘어가는 느낌'}
+- 위 [말투 예시]의 톤과 어미를 참고해서 말해
+
+한 문장으로 반응해줘."""
+
+    # fallback 텍스트 결정
+    if is_last:
+        fallback_text = fallback_last
+    else:
+        fallback_text = fallback_reactions[int(time.time()) % len(fallback_reactions)]
+
+    return prompt, fallback_text, reaction_max_tokens
@@ -0,0 +1,269 @@
+"""
+스키마 마이그레이션 (버전 관리)
+- 서버 시작 시(main.py lifespan) run_migrations() 호출
+- psano_schema_migrations에 적용된 버전 기록 → 미적용 버전만 순서대로 실행
+- 여러 워커가 동시에 떠도 GET_LOCK으로 한 워커만 실행
+- 인덱스/컬럼 추가는 information_schema로 존재 여부 확인 후 실행 (기존 DB에 수동 생성된 경우 대비)
+"""
+from __future__ import annotations
+
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from util.utils import log_event
+
+MIGRATION_LOCK_NAME = "psano_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 30  # 초
+
+
+# =========================
+# 헬퍼
+# =========================
+
+def _index_exists(db: Session, table: str, index: str) -> bool:
+    row = db.execute(
+        text("""
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = :t AND index_name = :i
+            LIMIT 1
+        """),
+        {"t": table, "i": index}
+    ).first()
+    return row is not None
+
+
+def _column_exists(db: Session, table: str, column: str) -> bool:
+    row = db.execute(
+        text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = :t AND column_name = :c
+            LIMIT 1
+        """),
+        {"t": table, "c": column}
+    ).first()
+    return row is not None
+
+
+def _add_index(db: Session, table: str, index: str, columns: str, unique: bool = False):
+    if not _index_exists(db, table, index):
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        db.execute(text(f"CREATE {kind} {index} ON {table} ({columns})"))
+
+
+def _drop_index(db: Session, table: str, index: str):
+    if _index_exists(db, table, index):
+        db.execute(text(f"DROP INDEX {index} ON {table}"))
+
+
+def _add_column(db: Session, table: str, column: str, definition: str):
+    if not _column_exists(db, table, column):
+        db.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+
+
+# =========================
+# 마이그레이션 목록 (버전 순, 한 번 배포된 항목은 수정하지 말고 새 버전 추가)
+# =========================
+
+def _m1_state_and_answer_columns(db: Session):
+    """라우터들이 try/except로 감싸던 컬럼들"""
+    _add_column(db, "psano_state", "formed_at", "DATETIME NULL")
+    _add_column(db, "psano_state", "values_summary", "TEXT NULL")
+    _add_column(db, "psano_state", "global_turn_count", "INT NOT NULL DEFAULT 0")
+    _add_column(db, "psano_state", "cycle_number", "INT NOT NULL DEFAULT 1")
+    _add_column(db, "answers", "cycle_id", "INT NOT NULL DEFAULT 1")
+    _add_column(db, "answers", "assistant_reaction", "TEXT NULL")
+
+
+def _m2_reaction_pool(db: Session):
+    db.execute(text("""
+        CREATE TABLE IF NOT EXISTS psano_reaction_pool (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            question_id INT NOT NULL,
+            choice CHAR(1) NOT NULL,
+            stage_id INT NOT NULL,
+            is_last TINYINT(1) NOT NULL DEFAULT 0,
+            reaction_text VARCHAR(255) NOT NULL,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_reaction_pool_key (question_id, choice, stage_id, is_last)
+        )
+    """))
+
+
+def _m3_cycle_answer_counts(db: Session):
+    db.execute(text("""
+        CREATE TABLE IF NOT EXISTS psano_cycle_answer_counts (
+            cycle_id INT PRIMARY KEY,
+            answer_count INT NOT NULL DEFAULT 0,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """))
+
+
+def _m4_hot_path_indexes(db: Session):
+    _add_index(db, "answers", "idx_answers_session_question", "session_id, question_id")
+    _add_index(db, "answers", "idx_answers_cycle", "cycle_id")
+    _add_index(db, "sessions", "idx_sessions_ended_at", "ended_at")
+    _add_index(db, "sessions", "idx_sessions_started_at", "started_at")
+    _add_index(db, "idle_talk_messages", "idx_idle_talk_messages_session", "session_id, id")
+    _add_index(db, "psano_idle", "idx_psano_idle_enable_value", "enable, value")
+
+
+def _m5_answers_unique_session_question(db: Session):
+    """
+    중복 제출 체크 SELECT 대신 UNIQUE 키 (기존 중복 행은 가장 먼저 저장된 것만 남김)
+    지우는 행은 answers_m5_duplicates에 그대로 복사해 두고 건수/id를 로그로 남김 (운영자 확인용)
+    """
+    if _index_exists(db, "answers", "uq_answers_session_question"):
+        return
+    dup_ids = [int(r[0]) for r in db.execute(text("""
+        SELECT DISTINCT a1.id FROM answers a1
+        JOIN answers a2
+          ON a1.session_id = a2.session_id AND a1.question_id = a2.question_id AND a1.id > a2.id
+    """)).fetchall()]
+    if dup_ids:
+        db.execute(text("CREATE TABLE IF NOT EXISTS answers_m5_duplicates LIKE answers"))
+        params = {f"id{i}": v for i, v in enumerate(dup_ids)}
+        in_clause = ", ".join(f":{k}" for k in params)
+        db.execute(text(f"INSERT IGNORE INTO answers_m5_duplicates SELECT * FROM answers WHERE id IN ({in_clause})"), params)
+        db.execute(text(f"DELETE FROM answers WHERE id IN ({in_clause})"), params)
+        log_event("schema_migration_answers_duplicates_moved", count=len(dup_ids),
+                  backup_table="answers_m5_duplicates", ids=dup_ids[:100])
+    _add_index(db, "answers", "uq_answers_session_question", "session_id, question_id", unique=True)
+    # 같은 컬럼의 일반 인덱스(m4)는 UNIQUE 키로 대체
+    _drop_index(db, "answers", "idx_answers_session_question")
+
+
+def _m6_turn_counter_shards(db: Session):
+    db.execute(text("""
+        CREATE TABLE IF NOT EXISTS psano_turn_counter_shards (
+            slot INT PRIMARY KEY,
+            turn_count INT NOT NULL DEFAULT 0
+        )
+    """))
+    # 기존 psano_state.global_turn_count를 슬롯 0으로 이관
+    db.execute(text("""
+        INSERT IGNORE INTO psano_turn_counter_shards (slot, turn_count)
+        SELECT 0, COALESCE(global_turn_count, 0) FROM psano_state WHERE id = 1
+    """))
+
+
+def _m7_sessions_end_reason(db: Session):
+    """admin 세션 목록이 try/except로 감싸던 컬럼"""
+    _add_column(db, "sessions", "end_reason", "VARCHAR(32) NULL")
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Session], None]]] = [
+    (1, "state_and_answer_columns", _m1_state_and_answer_columns),
+    (2, "reaction_pool", _m2_reaction_pool),
+    (3, "cycle_answer_counts", _m3_cycle_answer_counts),
+    (4, "hot_path_indexes", _m4_hot_path_indexes),
+    (5, "answers_unique_session_question", _m5_answers_unique_session_question),
+    (6, "turn_counter_shards", _m6_turn_counter_shards),
+    (7, "sessions_end_reason", _m7_sessions_end_reason),
+]
+
+
+# =========================
+# 실행
+# =========================
+
+def _ensure_migrations_table(db: Session):
+    db.execute(text("""
+        CREATE TABLE IF NOT EXISTS psano_schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(128) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    db.commit()
+
+
+def applied_versions(db: Session) -> List[int]:
+    _ensure_migrations_table(db)
+    rows = db.execute(text("SELECT version FROM psano_schema_migrations ORDER BY version")).fetchall()
+    return [int(r[0]) for r in rows]
+
+
+def run_migrations(db: Session) -> List[int]:
+    """
+    미적용 마이그레이션 실행 → 이번에 적용된 버전 목록.
+    (MySQL DDL은 암묵적 commit이라 버전 단위로 기록, 실패 시 그 버전에서 중단)
+    """
+    got_lock = db.execute(
+        text("SELECT GET_LOCK(:name, :timeout)"),
+        {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT}
+    ).scalar()
+    if not got_lock:
+        log_event("schema_migration_skip", reason="lock timeout")
+        return []
+
+    applied: List[int] = []
+    try:
+        done = set(applied_versions(db))
+        for version, name, fn in MIGRATIONS:
+            if version in done:
+                continue
+            try:
+                fn(db)
+                db.execute(
+                    text("INSERT INTO psano_schema_migrations (version, name) VALUES (:v, :n)"),
+                    {"v": version, "n": name}
+                )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                log_event("schema_migration_error", version=version, name=name, error=str(e))
+                break
+            applied.append(version)
+            log_event("schema_migration_applied", version=version, name=name)
+    finally:
+        db.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+
+    return applied
+
+
+# =========================
+# 인덱스 사용 점검 (EXPLAIN)
+# =========================
+
+# (이름, 테이블, 쿼리) - 파라미터는 대표값
+HOT_QUERIES: List[Tuple[str, str, str]] = [
+    ("answer_count_by_session", "answers",
+     "SELECT COUNT(*) FROM answers WHERE session_id = 1"),
+    ("answer_count_by_cycle", "answers",
+     "SELECT COUNT(*) FROM answers WHERE cycle_id = 1"),
+    ("active_sessions", "sessions",
+     "SELECT COUNT(*) FROM sessions WHERE ended_at IS NULL"),
+    ("today_sessions", "sessions",
+     "SELECT COUNT(*) FROM sessions WHERE started_at >= CURDATE() AND started_at < CURDATE() + INTERVAL 1 DAY"),
+    ("recent_talk_messages", "idle_talk_messages",
+     "SELECT user_text, assistant_text FROM idle_talk_messages WHERE session_id = 1 ORDER BY id DESC LIMIT 6"),
+    ("idle_by_value", "psano_idle",
+     "SELECT id FROM psano_idle WHERE enable = 1 AND value = 'self_direction'"),
+]
+
+
+def explain_hot_queries(db: Session) -> List[dict]:
+    """
+    각 hot query의 EXPLAIN에서 해당 테이블이 인덱스(key)를 쓰는지 확인
+    (행이 아주 적은 테이블은 옵티마이저가 풀스캔을 고를 수 있음)
+    """
+    results = []
+    for name, table, sql in HOT_QUERIES:
+        try:
+            rows = db.execute(text(f"EXPLAIN {sql}")).mappings().all()
+            row = next((r for r in rows if r.get("table") == table), rows[0] if rows else {})
+            key = row.get("key")
+            results.append({
+                "name": name,
+                "table": table,
+                "key": key,
+                "type": row.get("type"),
+                "rows": row.get("rows"),
+                "uses_index": key is not None,
+            })
+        except Exception as e:
+            results.append({"name": name, "table": table, "key": None, "uses_index": False, "error": str(e)})
+    return results
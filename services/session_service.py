@@ -6,9 +6,25 @@ from fastapi import HTTPException
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from routers._store import LOCK, SESSIONS, GLOBAL_STATE, remove_session, clear_all_sessions, cleanup_ended_sessions
+from routers._store import (
+    SESSIONS, remove_session, clear_all_sessions,
+    update_global_state, publish_global_state,
+)
 from util.utils import now_kst_naive, iso, log_event
-from util.constants import ALLOWED_VALUE_KEYS, MAX_QUESTIONS
+from util.constants import VALUE_KEYS_ORDERED, MAX_QUESTIONS
+from services import answer_counter, question_catalog, idle_catalog, turn_counter
+
+
+# 세션 답변을 가치키별로 집계해 psano_personality에 한 번에 더함 (컬럼명은 상수 whitelist에서만 생성)
+_PERSONALITY_ROLLUP_SQL = text(
+    "UPDATE psano_personality p JOIN ("
+    " SELECT " + ", ".join(
+        f"COALESCE(SUM(chosen_value_key = '{k}'), 0) AS `{k}`" for k in VALUE_KEYS_ORDERED
+    ) +
+    " FROM answers WHERE session_id = :sid"
+    ") a SET " + ", ".join(f"p.`{k}` = p.`{k}` + a.`{k}`" for k in VALUE_KEYS_ORDERED) +
+    " WHERE p.id = 1"
+)
 
 
 def end_session_core(db: Session, sid: int, reason: str) -> Dict[str, Any]:
@@ -21,6 +37,7 @@ def end_session_core(db: Session, sid: int, reason: str) -> Dict[str, Any]:
     """
     sid = int(sid)
     reason = (reason or "completed")
+    new_current_q = None
 
     # 0) 세션 존재/현재 종료 상태 확인(멱등) + start_question_id 조회
     row = db.execute(
@@ -41,11 +58,7 @@ def end_session_core(db: Session, sid: int, reason: str) -> Dict[str, Any]:
         ended_at = row.get("ended_at")
         ended_iso = iso(ended_at) if ended_at else None
 
-        with LOCK:
-            sess = SESSIONS.get(sid)
-            if sess:
-                sess["ended_at"] = ended_at
-                sess["end_reason"] = row.get("end_reason")
+        SESSIONS.update(sid, ended_at=ended_at, end_reason=row.get("end_reason"))
 
         return {
             "session_id": sid,
@@ -58,66 +71,7 @@ def end_session_core(db: Session, sid: int, reason: str) -> Dict[str, Any]:
     try:
         ended_at = now_kst_naive()  # KST +9
 
-        if reason == "timeout":
-            # 타임아웃: answers 삭제, current_question은 그대로
-            db.execute(
-                text("DELETE FROM answers WHERE session_id = :sid"),
-                {"sid": sid}
-            )
-        else:
-            # 정상 종료: psano_personality 일괄 반영 + current_question 업데이트
-            # 1) 해당 세션의 answers에서 chosen_value_key 집계
-            answers = db.execute(
-                text("""
-                    SELECT chosen_value_key, COUNT(*) as cnt
-                    FROM answers
-                    WHERE session_id = :sid
-                    GROUP BY chosen_value_key
-                """),
-                {"sid": sid}
-            ).mappings().all()
-
-            # 2) psano_personality 업데이트 (SQL Injection 방지: whitelist 검증)
-            for ans in answers:
-                col = ans["chosen_value_key"]
-                cnt = int(ans["cnt"])
-                if col and cnt > 0 and col in ALLOWED_VALUE_KEYS:
-                    db.execute(
-                        text(f"UPDATE psano_personality SET `{col}` = `{col}` + :cnt WHERE id = 1"),
-                        {"cnt": cnt}
-                    )
-
-            # 3) current_question 업데이트 (start_question_id + 5 또는 다음 enabled)
-            answer_count = db.execute(
-                text("SELECT COUNT(*) AS cnt FROM answers WHERE session_id = :sid"),
-                {"sid": sid}
-            ).mappings().first()
-            answered_in_session = int(answer_count["cnt"]) if answer_count else 0
-
-            # 다음 질문 찾기: start_question_id + answered_in_session 이후의 enabled 질문
-            next_start = start_question_id + answered_in_session
-            next_q = db.execute(
-                text("""
-                    SELECT id FROM questions
-                    WHERE id >= :next_start AND enabled = 1
-                    ORDER BY id ASC
-                    LIMIT 1
-                """),
-                {"next_start": next_start}
-            ).mappings().first()
-
-            new_current_q = int(next_q["id"]) if next_q else (MAX_QUESTIONS + 1)  # 없으면 형성 완료
-
-            db.execute(
-                text("UPDATE psano_state SET current_question = :q WHERE id = 1"),
-                {"q": new_current_q}
-            )
-
-            # 메모리 캐시 동기화
-            with LOCK:
-                GLOBAL_STATE["current_question"] = new_current_q
-
-        # 세션 종료 처리 (ended_at IS NULL 조건으로 race condition 방지)
+        # 1) 세션 종료 선점 (ended_at IS NULL 조건: 동시 종료 요청 중 하나만 아래 반영을 수행)
         res = db.execute(
             text("""
                 UPDATE sessions
@@ -126,10 +80,10 @@ def end_session_core(db: Session, sid: int, reason: str) -> Dict[str, Any]:
             """),
             {"ended_at": ended_at, "end_reason": reason, "id": sid},
         )
-        db.commit()
 
         # rowcount==0이면 이미 종료됐을 가능성 → 재조회해서 반환
         if (getattr(res, "rowcount", 0) or 0) == 0:
+            db.rollback()
             row2 = db.execute(
                 text("""
                     SELECT ended_at, end_reason
@@ -148,18 +102,68 @@ def end_session_core(db: Session, sid: int, reason: str) -> Dict[str, Any]:
                 "ended_at": ended_iso,
             }
 
+        if reason == "timeout":
+            # 타임아웃: answers 삭제, current_question은 그대로 (사이클 카운터도 같이 차감)
+            deleted = db.execute(
+                text("""
+                    SELECT cycle_id, COUNT(*) AS cnt
+                    FROM answers
+                    WHERE session_id = :sid
+                    GROUP BY cycle_id
+                """),
+                {"sid": sid}
+            ).mappings().all()
+            db.execute(
+                text("DELETE FROM answers WHERE session_id = :sid"),
+                {"sid": sid}
+            )
+            for d in deleted:
+                if d["cycle_id"] is not None:
+                    answer_counter.decrement(db, int(d["cycle_id"]), int(d["cnt"]))
+        else:
+            # 정상 종료: psano_personality 일괄 반영 + current_question 업데이트
+            # 2) 세션 답변 수 (다음 질문 계산용)
+            answered_in_session = int(db.execute(
+                text("SELECT COUNT(*) FROM answers WHERE session_id = :sid"),
+                {"sid": sid}
+            ).scalar() or 0)
+
+            # 3) psano_personality 일괄 반영: 집계 서브쿼리 JOIN 한 문장 (id=1 행 잠금은 이 문장~commit 동안만)
+            if answered_in_session > 0:
+                db.execute(_PERSONALITY_ROLLUP_SQL, {"sid": sid})
+
+            # 4) current_question 전진 (start_question_id + 답변 수 이후의 enabled 질문, 점프 테이블)
+            #    여러 세션이 순서 없이 끝나도 뒤로 가지 않게 GREATEST, 결과값은 LAST_INSERT_ID로 받음
+            next_start = start_question_id + answered_in_session
+            next_q = question_catalog.next_enabled(db, next_start)
+            target_q = int(next_q["id"]) if next_q else (MAX_QUESTIONS + 1)  # 없으면 형성 완료
+
+            res_q = db.execute(
+                text("""
+                    UPDATE psano_state
+                    SET current_question = LAST_INSERT_ID(GREATEST(current_question, :q))
+                    WHERE id = 1
+                """),
+                {"q": target_q}
+            )
+            new_current_q = int(res_q.lastrowid or target_q)
+
+        db.commit()
+
+        # 메모리 캐시 동기화 (commit 후)
+        if new_current_q is not None:
+            update_global_state(current_question=new_current_q)
+            idle_catalog.bump_personality_version()
+
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"db error: {e}")
 
-    # 3) 메모리 캐시에서 세션 제거 (메모리 누수 방지)
+    # 3) 메모리 저장소에서 세션 제거 (종료된 세션은 더 쓰지 않음)
     remove_session(sid)
 
-    # 주기적 정리: 세션이 많으면 오래된 종료 세션 정리
-    cleanup_ended_sessions(max_keep=100)
-
     # 이벤트 로깅
     from util.utils import log_event
     log_event("session_end", session_id=sid, reason=reason)
@@ -173,77 +177,89 @@ def end_session_core(db: Session, sid: int, reason: str) -> Dict[str, Any]:
     }
 
 
-def reset_cycle_core(db: Session, reason: str = "global_token_exhausted") -> Dict[str, Any]:
+def reset_cycle_core(
+    db: Session,
+    reason: str = "global_token_exhausted",
+    expected_cycle: int | None = None,
+) -> Dict[str, Any]:
     """
     사이클 리셋: 새로운 사이클 시작 (데이터 보존)
     - cycle_number 증가
     - state 초기화 (phase=teach, current_question=1, global_turn_count=0, etc.)
     - personality 초기화 (모든 값 0)
     - 활성 세션 모두 종료
+    - expected_cycle: 지정하면 현재 사이클이 그 값일 때만 리셋 (이미 다른 요청이 리셋했으면 skipped)
+      psano_state 행을 FOR UPDATE로 잡고 확인하므로 동시에 호출돼도 사이클은 한 번만 증가
     """
     try:
-        # 1) 현재 cycle_number 조회
+        # 1) 현재 cycle_number 조회 (행 잠금: 리셋끼리 직렬화, 잠금 읽기라 최신 커밋 값을 봄)
         row = db.execute(
-            text("SELECT cycle_number FROM psano_state WHERE id = 1")
+            text("SELECT cycle_number FROM psano_state WHERE id = 1 FOR UPDATE")
         ).mappings().first()
         current_cycle = int(row.get("cycle_number") or 1) if row else 1
+
+        if expected_cycle is not None and current_cycle != int(expected_cycle):
+            db.rollback()
+            log_event("cycle_reset_skipped", current_cycle=current_cycle, expected_cycle=expected_cycle, reason=reason)
+            return {
+                "ok": False,
+                "skipped": True,
+                "previous_cycle": current_cycle,
+                "new_cycle": current_cycle,
+            }
+
         new_cycle = current_cycle + 1
 
-        # 2) psano_state 업데이트 (새 사이클 시작)
-        try:
-            db.execute(text("""
-                UPDATE psano_state
-                SET phase = 'teach',
-                    current_question = 1,
-                    formed_at = NULL,
-                    persona_prompt = NULL,
-                    values_summary = NULL,
-                    global_turn_count = 0,
-                    cycle_number = :new_cycle
-                WHERE id = 1
-            """), {"new_cycle": new_cycle})
-        except Exception:
-            # values_summary 컬럼이 없는 경우
-            db.execute(text("""
-                UPDATE psano_state
-                SET phase = 'teach',
-                    current_question = 1,
-                    global_turn_count = 0,
-                    cycle_number = :new_cycle
-                WHERE id = 1
-            """), {"new_cycle": new_cycle})
-
-        # 3) psano_personality 초기화 (새 페르소나 구축 준비)
+        # 2) psano_state 업데이트 (새 사이클 시작, 컬럼은 schema_migrations m1에서 보장)
         db.execute(text("""
-            UPDATE psano_personality
-            SET self_direction = 0, conformity = 0, stimulation = 0, security = 0,
-                hedonism = 0, tradition = 0, achievement = 0, benevolence = 0,
-                power = 0, universalism = 0
+            UPDATE psano_state
+            SET phase = 'teach',
+                current_question = 1,
+                formed_at = NULL,
+                persona_prompt = NULL,
+                values_summary = NULL,
+                global_turn_count = 0,
+                cycle_number = :new_cycle
             WHERE id = 1
-        """))
+        """), {"new_cycle": new_cycle})
 
-        # 4) 활성 세션 모두 종료
+        # 3) 활성 세션 모두 종료 (턴 저장과 같은 순서로 잠금: sessions → 턴 카운터 슬롯)
         db.execute(text("""
             UPDATE sessions
             SET ended_at = :now, end_reason = :reason
             WHERE ended_at IS NULL
         """), {"now": now_kst_naive(), "reason": reason})
 
-        # 5) 메모리 캐시 동기화
-        with LOCK:
-            GLOBAL_STATE["phase"] = "teach"
-            GLOBAL_STATE["current_question"] = 1
-            GLOBAL_STATE["formed_at"] = None
-            GLOBAL_STATE["persona_prompt"] = None
-            GLOBAL_STATE["values_summary"] = None
-            GLOBAL_STATE["global_turn_count"] = 0
-            GLOBAL_STATE["cycle_number"] = new_cycle
+        # 글로벌 턴 카운터 슬롯도 초기화
+        turn_counter.reset(db)
 
-        # 6) SESSIONS 메모리 캐시 정리 (메모리 누수 방지)
-        clear_all_sessions()
+        # 4) psano_personality 초기화 (새 페르소나 구축 준비)
+        db.execute(text("""
+            UPDATE psano_personality
+            SET self_direction = 0, conformity = 0, stimulation = 0, security = 0,
+                hedonism = 0, tradition = 0, achievement = 0, benevolence = 0,
+                power = 0, universalism = 0
+            WHERE id = 1
+        """))
 
         db.commit()
 
+        # 5) 메모리 캐시 동기화 (commit 후, 다른 워커에도 알림)
+        publish_global_state(
+            db,
+            phase="teach",
+            current_question=1,
+            formed_at=None,
+            persona_prompt=None,
+            values_summary=None,
+            global_turn_count=0,
+            cycle_number=new_cycle,
+        )
+        idle_catalog.bump_personality_version()
+
+        # 6) SESSIONS 메모리 캐시 정리 (메모리 누수 방지)
+        clear_all_sessions()
+
         # 이벤트 로깅
         log_event("cycle_reset", new_cycle=new_cycle, previous_cycle=current_cycle, reason=reason)
 
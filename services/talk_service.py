@@ -0,0 +1,166 @@
+"""
+대화 턴 저장 (talk/turn, monologue/nudge 공용)
+- idle_talk_messages INSERT + sessions 메모/턴수 UPDATE + 글로벌 턴 카운터 증가를 한 트랜잭션(commit 1번)으로
+- 중간에 실패하면 전부 rollback → 메시지만 저장되고 턴수는 안 오르는 식의 부분 반영 없음
+- 세션 저장소(SESSIONS)는 commit 성공 후에만 반영 (write-through)
+- 최근 메시지는 세션 레코드의 deque 버퍼에 (user, assistant, 포맷 문자열)로 쌓음
+  → 매 턴 idle_talk_messages 조회/포맷 없음, 버퍼가 없을 때(재시작 후 등)만 DB에서 채움
+"""
+from __future__ import annotations
+
+from typing import Deque, List, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from routers._store import SESSIONS, load_session, new_recent_buffer
+from services import turn_counter
+from util.constants import TALK_MEMORY_LIMIT, TALK_INPUT_LIMIT, TALK_OUTPUT_LIMIT, TALK_RECENT_BUFFER
+from util.utils import trim
+
+# (user_text, assistant_text, talk 프롬프트용 포맷 문자열)
+RecentEntry = Tuple[str, str, str]
+
+
+def format_turn(user_text: str, assistant_text: str) -> str:
+    """talk 프롬프트용 한 턴 포맷 (U:/A: 줄)"""
+    lines = []
+    u = trim(user_text or "", TALK_INPUT_LIMIT)
+    a = trim(assistant_text or "", TALK_OUTPUT_LIMIT)
+    if u:
+        lines.append(f"U: {u}")
+    if a:
+        lines.append(f"A: {a}")
+    return "\n".join(lines)
+
+
+def _recent_buffer(db: Session, session_id: int) -> Deque[RecentEntry]:
+    """세션의 최근 메시지 버퍼 (없으면 DB에서 최근 TALK_RECENT_BUFFER개로 채움)"""
+    rec = load_session(db, session_id)
+    if rec is None:
+        return new_recent_buffer()
+    if rec.recent is not None:
+        return rec.recent
+
+    rows = db.execute(
+        text("""
+            SELECT user_text, assistant_text
+            FROM idle_talk_messages
+            WHERE session_id = :sid
+            ORDER BY id DESC
+            LIMIT :lim
+        """),
+        {"sid": int(session_id), "lim": TALK_RECENT_BUFFER},
+    ).mappings().all()
+
+    buf = new_recent_buffer()
+    for r in reversed(rows):  # 오래된 -> 최신
+        u = r.get("user_text") or ""
+        a = r.get("assistant_text") or ""
+        buf.append((u, a, format_turn(u, a)))
+    with SESSIONS.lock_for(rec.id):
+        if rec.recent is None:  # 조회 중에 다른 요청이 먼저 채웠으면 그쪽 사용
+            rec.recent = buf
+        return rec.recent
+
+
+def _recent_entries(db: Session, session_id: int, limit: int) -> List[RecentEntry]:
+    if limit <= 0:
+        return []
+    buf = _recent_buffer(db, session_id)
+    with SESSIONS.lock_for(session_id):  # append 중 복사 방지
+        entries = list(buf)
+    return entries[-int(limit):]
+
+
+def recent_turns_text(db: Session, session_id: int, limit: int) -> str:
+    """최근 limit개 턴을 오래된 -> 최신 순으로 포맷한 문자열 (talk 프롬프트용)"""
+    entries = _recent_entries(db, session_id, limit)
+    return "\n".join(e[2] for e in entries if e[2]).strip()
+
+
+def recent_messages(db: Session, session_id: int, limit: int) -> List[dict]:
+    """최근 limit개 메시지 (시간순, nudge 프롬프트용)"""
+    return [{"user_text": u, "assistant_text": a} for u, a, _ in _recent_entries(db, session_id, limit)]
+
+
+def persist_turn(
+    db: Session,
+    session_id: int,
+    idle_id: int | None,
+    user_text: str,
+    assistant_text: str,
+    status: str,
+    *,
+    memory: str | None = None,
+    count_turn: bool = False,
+) -> None:
+    """
+    대화 한 턴 저장 (commit 포함).
+    - 세션이 DB에서 이미 종료됐으면(다른 워커 등) 아무것도 저장하지 않고 409
+    - memory: None이 아니면 sessions.idle_talk_memory 갱신 + idle_turn_count +1
+    - count_turn: True면 글로벌 턴 카운터 +1 (엔딩 판정은 호출자가 commit 후 합계로)
+    """
+    mem_trimmed = trim(memory or "", TALK_MEMORY_LIMIT) if memory is not None else None
+
+    try:
+        # 종료 여부는 저장소 레코드 대신 조건부 UPDATE(ended_at IS NULL)의 rowcount로 판정 (SELECT 없음)
+        # 먼저 실행해 세션 행을 잠금 → 다른 워커의 종료와 순서 보장, 종료됐으면 아래 INSERT/턴 증가 없음
+        # (MySQL dialect는 FOUND_ROWS → rowcount는 값이 안 바뀌어도 매칭된 행 수)
+        turn_count = None
+        if mem_trimmed is not None:
+            # 증가된 턴 수는 LAST_INSERT_ID로 받아 저장소에 그대로 반영 (다른 워커 증가분 포함)
+            res = db.execute(
+                text("""
+                    UPDATE sessions
+                    SET idle_talk_memory = :mem,
+                        idle_turn_count = LAST_INSERT_ID(COALESCE(idle_turn_count, 0) + 1)
+                    WHERE id = :sid AND ended_at IS NULL
+                """),
+                {"sid": session_id, "mem": mem_trimmed},
+            )
+        else:
+            res = db.execute(
+                text("UPDATE sessions SET idle_turn_count = idle_turn_count WHERE id = :sid AND ended_at IS NULL"),
+                {"sid": session_id},
+            )
+        if (res.rowcount or 0) == 0:
+            # 없는 세션이거나 (다른 워커 등에서) 이미 종료된 세션 → 아무것도 저장하지 않음
+            db.rollback()
+            SESSIONS.remove(session_id)
+            raise HTTPException(status_code=409, detail="session already ended")
+        if mem_trimmed is not None:
+            turn_count = int(res.lastrowid or 0)
+
+        db.execute(
+            text("""
+                INSERT INTO idle_talk_messages (session_id, idle_id, user_text, assistant_text, status)
+                VALUES (:sid, :iid, :u, :a, :s)
+            """),
+            {"sid": session_id, "iid": idle_id, "u": user_text, "a": assistant_text, "s": status},
+        )
+
+        if count_turn:
+            turn_counter.increment(db)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # 메모리 저장소 동기화 (commit 후)
+    rec = SESSIONS.get(session_id)
+    if rec is None:
+        return
+
+    entry = (user_text, assistant_text, format_turn(user_text, assistant_text))
+    with SESSIONS.lock_for(session_id):  # 턴 수 비교 + 버퍼 append를 한 번에
+        if mem_trimmed is not None:
+            if turn_count != rec.idle_turn_count + 1:
+                # 다른 워커에서도 턴이 저장됨 → 이 워커의 버퍼는 빠진 메시지가 있으니 다음 조회 때 DB에서 다시 채움
+                rec.recent = None
+            rec.idle_talk_memory = mem_trimmed
+            rec.idle_turn_count = turn_count
+        if rec.recent is not None:
+            rec.recent.append(entry)
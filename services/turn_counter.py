@@ -0,0 +1,58 @@
+"""
+글로벌 턴 카운터 (psano_turn_counter_shards)
+- /talk/turn마다 psano_state(id=1) 한 행을 UPDATE하면 모든 키오스크가 같은 행 잠금에 줄을 섬
+  → TURN_COUNTER_SLOTS개 슬롯 중 랜덤 1개를 증가, 합계는 읽을 때 SUM
+- 엔딩(global_turn_max) 판정은 commit 후 합계로 하고, psano_state 조건부 UPDATE로 한 요청만 선점
+  (동시에 여러 턴이 max를 넘겨도 사이클 리셋은 한 번)
+- psano_state.global_turn_count는 엔딩 선점 시점의 값만 기록 (평소 합계는 슬롯 SUM)
+- 테이블은 services/schema_migrations.py에서 생성
+"""
+from __future__ import annotations
+
+import random
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+TURN_COUNTER_SLOTS = 16
+
+
+def increment(db: Session) -> None:
+    """턴 1 증가 (commit은 호출자가). 슬롯 행이 없으면 생성"""
+    db.execute(
+        text("""
+            INSERT INTO psano_turn_counter_shards (slot, turn_count)
+            VALUES (:slot, 1)
+            ON DUPLICATE KEY UPDATE turn_count = turn_count + 1
+        """),
+        {"slot": random.randrange(TURN_COUNTER_SLOTS)}
+    )
+
+
+def get_total(db: Session) -> int:
+    """현재 글로벌 턴 수 (슬롯 합계, 잠금 없음)"""
+    total = db.execute(
+        text("SELECT COALESCE(SUM(turn_count), 0) FROM psano_turn_counter_shards")
+    ).scalar()
+    return int(total or 0)
+
+
+def reset(db: Session) -> None:
+    """사이클 리셋/관리자 리셋 시 같이 비움 (commit은 호출자가)"""
+    db.execute(text("DELETE FROM psano_turn_counter_shards"))
+
+
+def claim_ending(db: Session, total: int, turn_max: int) -> bool:
+    """
+    합계가 turn_max 이상이 된 요청 중 한 요청만 True (commit은 호출자가).
+    psano_state.global_turn_count < turn_max 인 동안에만 갱신되므로 두 번째부터는 rowcount 0.
+    """
+    res = db.execute(
+        text("""
+            UPDATE psano_state
+            SET global_turn_count = :total
+            WHERE id = 1 AND COALESCE(global_turn_count, 0) < :turn_max
+        """),
+        {"total": int(total), "turn_max": int(turn_max)}
+    )
+    return (res.rowcount or 0) > 0
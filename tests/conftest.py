@@ -0,0 +1,141 @@
+"""
+DB 통합 테스트 공용 fixture
+- 실제 MySQL(.env의 DB_*)에 붙어서 동시성 동작을 확인 → psano_state/세션 데이터가 바뀌므로 테스트 전용 DB에서만
+- PSANO_DB_TESTS=1 일 때만 실행 (없거나 DB에 못 붙으면 skip)
+- @pytest.mark.bench 벤치마크는 기본 실행에서 제외 (-m bench 또는 PSANO_BENCH=1로 실행)
+  결과는 "psano.bench" 로거 + junit property로 남김
+
+    PSANO_DB_TESTS=1 DB_NAME=psano_test python -m pytest -q
+    PSANO_DB_TESTS=1 DB_NAME=psano_test python -m pytest -q -m bench --log-cli-level=INFO
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import pytest
+from sqlalchemy import text
+
+# services.llm_service는 import 시 OpenAI 클라이언트를 만듦 (테스트에서 LLM 호출은 하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+bench_logger = logging.getLogger("psano.bench")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "bench: 벤치마크 (기본 실행 제외, -m bench 또는 PSANO_BENCH=1)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv("PSANO_BENCH") == "1" or "bench" in (config.getoption("markexpr") or ""):
+        return
+    skip = pytest.mark.skip(reason="벤치마크: -m bench 또는 PSANO_BENCH=1 일 때만 실행")
+    for item in items:
+        if "bench" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def bench_report(record_property):
+    """bench_report(name, **metrics) → psano.bench 로그 1줄 + junit property"""
+    def _report(name: str, **metrics):
+        for k, v in metrics.items():
+            record_property(f"{name}.{k}", v)
+        bench_logger.info("[bench] %s %s", name, " ".join(
+            f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in metrics.items()
+        ))
+    return _report
+
+
+def latency_summary(latencies_ms: List[float]) -> dict:
+    """지연 목록(ms) → p50/p95/max"""
+    ordered = sorted(latencies_ms)
+    if not ordered:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    return {
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[max(0, int(len(ordered) * 0.95) - 1)],
+        "max_ms": ordered[-1],
+    }
+
+
+@pytest.fixture(scope="session")
+def db_factory():
+    """SessionLocal (마이그레이션 적용 후)"""
+    if os.getenv("PSANO_DB_TESTS") != "1":
+        pytest.skip("PSANO_DB_TESTS=1 일 때만 실행 (테스트 전용 DB 필요)")
+
+    from database import SessionLocal, engine
+    from services import schema_migrations
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"DB 연결 불가: {e}")
+
+    db = SessionLocal()
+    try:
+        schema_migrations.run_migrations(db)
+    finally:
+        db.close()
+    return SessionLocal
+
+
+@pytest.fixture
+def make_sessions(db_factory):
+    """make_sessions(n) → 새 세션 id 목록 (테스트 끝나면 메시지/답변/세션 삭제)"""
+    from util.utils import now_kst_naive
+
+    created: List[int] = []
+
+    def _make(n: int, start_question_id: int = 1) -> List[int]:
+        db = db_factory()
+        try:
+            ids = []
+            for i in range(n):
+                res = db.execute(
+                    text("""
+                        INSERT INTO sessions (visitor_name, started_at, start_question_id, idle_talk_memory, idle_turn_count)
+                        VALUES (:name, :now, :q, '', 0)
+                    """),
+                    {"name": f"test{i}", "now": now_kst_naive(), "q": start_question_id},
+                )
+                ids.append(int(res.lastrowid))
+            db.commit()
+            created.extend(ids)
+            return ids
+        finally:
+            db.close()
+
+    yield _make
+
+    if created:
+        db = db_factory()
+        try:
+            params = {f"s{i}": sid for i, sid in enumerate(created)}
+            in_clause = ", ".join(f":{k}" for k in params)
+            db.execute(text(f"DELETE FROM idle_talk_messages WHERE session_id IN ({in_clause})"), params)
+            db.execute(text(f"DELETE FROM answers WHERE session_id IN ({in_clause})"), params)
+            db.execute(text(f"DELETE FROM sessions WHERE id IN ({in_clause})"), params)
+            db.commit()
+        finally:
+            db.close()
+
+
+def run_concurrently(n: int, fn: Callable[[int], object]) -> list:
+    """n개 스레드에서 fn(i)를 동시에 시작 (Barrier) → 결과 목록 (예외는 그대로 담아 반환)"""
+    barrier = threading.Barrier(n)
+
+    def _run(i: int):
+        barrier.wait()
+        try:
+            return fn(i)
+        except Exception as e:  # 호출한 테스트에서 종류별로 확인
+            return e
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(_run, range(n)))
@@ -0,0 +1,110 @@
+"""
+사이클 답변 카운터 (services/answer_counter) 벤치마크
+- 벤치 전용 cycle_id에 answers를 10,000 → 1,000,000행(PSANO_BENCH_ANSWERS)까지 채우고
+  카운터 PK 조회 vs COUNT(*) 지연을 비교 → 카운터는 행 수와 상관없이 일정 (O(1))
+- 테스트 끝나면 벤치 cycle의 answers/카운터 행 삭제
+"""
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+from sqlalchemy import text
+
+from tests.conftest import latency_summary
+
+SMALL = 10_000
+LARGE = int(os.getenv("PSANO_BENCH_ANSWERS", "1000000"))
+BATCH = 10_000
+READS = 200
+QUESTIONS = 365
+SESSION_BASE = 1_900_000_000  # 실제 세션과 겹치지 않는 id 대역 (UNIQUE(session_id, question_id))
+
+
+def _fill(db, cycle_id: int, start: int, stop: int):
+    """answers 행 번호 [start, stop) 삽입 (행 번호 → 세션/질문 id)"""
+    for lo in range(start, stop, BATCH):
+        rows = [
+            {"sid": SESSION_BASE + n // QUESTIONS, "qid": n % QUESTIONS + 1, "cycle": cycle_id}
+            for n in range(lo, min(lo + BATCH, stop))
+        ]
+        db.execute(
+            text("""
+                INSERT INTO answers (session_id, question_id, choice, chosen_value_key, cycle_id)
+                VALUES (:sid, :qid, 'A', 'self_direction', :cycle)
+            """),
+            rows,
+        )
+        db.commit()
+
+
+def _time_reads(db, fn) -> dict:
+    latencies = []
+    for _ in range(READS):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latency_summary(latencies)
+
+
+@pytest.fixture
+def bench_cycle(db_factory):
+    """기존 사이클과 겹치지 않는 cycle_id (끝나면 answers/카운터 정리)"""
+    db = db_factory()
+    try:
+        cycle_id = int(db.execute(text("SELECT COALESCE(MAX(cycle_id), 0) FROM answers")).scalar() or 0) + 1000
+    finally:
+        db.close()
+
+    yield cycle_id
+
+    db = db_factory()
+    try:
+        while True:
+            res = db.execute(text("DELETE FROM answers WHERE cycle_id = :c LIMIT 50000"), {"c": cycle_id})
+            db.commit()
+            if not res.rowcount:
+                break
+        db.execute(text("DELETE FROM psano_cycle_answer_counts WHERE cycle_id = :c"), {"c": cycle_id})
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.mark.bench
+def test_bench_answer_counter_reads_at_1m(db_factory, bench_cycle, bench_report):
+    from services import answer_counter
+
+    db = db_factory()
+    try:
+        results = {}
+        filled = 0
+        for size in (SMALL, LARGE):
+            _fill(db, bench_cycle, filled, size)
+            filled = size
+            answer_counter.reconcile(db)  # 직접 INSERT한 행 반영 (카운터 = answers 행 수)
+
+            assert answer_counter.get_answered_total(db, bench_cycle) == size
+            counter = _time_reads(db, lambda: answer_counter.get_answered_total(db, bench_cycle))
+            count_all = _time_reads(db, lambda: db.execute(
+                text("SELECT COUNT(*) FROM answers WHERE cycle_id = :c"), {"c": bench_cycle}
+            ).scalar())
+            db.commit()
+            results[size] = (counter, count_all)
+            bench_report(
+                "answer_counter",
+                answers=size,
+                counter_p50_ms=counter["p50_ms"],
+                counter_p95_ms=counter["p95_ms"],
+                count_p50_ms=count_all["p50_ms"],
+                count_p95_ms=count_all["p95_ms"],
+            )
+    finally:
+        db.close()
+
+    counter_small, _ = results[SMALL]
+    counter_large, count_large = results[LARGE]
+    # 카운터 조회는 행 수가 100배가 돼도 거의 그대로, COUNT(*)보다 빠름
+    assert counter_large["p50_ms"] <= max(2.0, counter_small["p50_ms"] * 3)
+    assert counter_large["p50_ms"] < count_large["p50_ms"]
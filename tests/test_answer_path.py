@@ -0,0 +1,167 @@
+"""
+/answer 저장 경로 벤치마크 (before/after)
+- before: 원래 _post_answer_core의 DB 작업 순서 그대로 (사이클 조회 → 세션 → 중복 체크 → 질문 → 답변 수
+  → INSERT → 사이클 COUNT(*) → commit → 다음 질문 → 반응 UPDATE + commit)
+- after: routers.answer._insert_answer (짧은 트랜잭션 1개)
+  - prefetched: 반응을 INSERT에 같이 저장
+  - live: 풀 조회 후 반응 없음 → LLM 이후 _save_reaction UPDATE
+- 답변 1건당 DB 왕복(문장 + commit) 수와 p50/p95를 psano.bench로 출력 (LLM 호출은 하지 않음)
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import event, text
+
+from tests.conftest import latency_summary, run_concurrently
+
+TALKERS = 20
+ANSWERS_EACH = 5
+REACTION = "흠, 그렇구나."
+
+_round_trips = threading.local()
+
+
+def _count_statement(*_args, **_kwargs):
+    _round_trips.n = getattr(_round_trips, "n", 0) + 1
+
+
+@pytest.fixture
+def round_trip_counter(db_factory):
+    """엔진의 문장 실행/commit을 스레드별로 셈"""
+    from database import engine
+
+    event.listen(engine, "before_cursor_execute", _count_statement)
+    event.listen(engine, "commit", _count_statement)
+    yield
+    event.remove(engine, "before_cursor_execute", _count_statement)
+    event.remove(engine, "commit", _count_statement)
+
+
+@pytest.fixture
+def answer_start(db_factory):
+    """ANSWERS_EACH개 연속 enabled 질문의 시작 id (make_sessions 정리 후 사이클 답변 카운터 재집계 → 테스트 인자에서 먼저 받음)"""
+    from services import answer_counter, question_catalog
+
+    db = db_factory()
+    try:
+        enabled = {int(q["id"]) for q in question_catalog.enabled_questions(db)}
+    finally:
+        db.close()
+    start = next((q for q in sorted(enabled) if all(q + i in enabled for i in range(ANSWERS_EACH))), None)
+    if start is None:
+        pytest.skip(f"연속된 enabled 질문 {ANSWERS_EACH}개 필요")
+
+    yield start
+
+    db = db_factory()
+    try:
+        answer_counter.reconcile(db)  # 세션/답변 삭제 후 카운터 보정
+    finally:
+        db.close()
+
+
+def _legacy_answer(db, sid: int, qid: int, choice: str):
+    """원래 /answer DB 경로 (LLM 반응은 고정 문자열)"""
+    current_cycle = int(db.execute(
+        text("SELECT cycle_number FROM psano_state WHERE id = 1")
+    ).scalar() or 1)
+    ses = db.execute(
+        text("SELECT id, ended_at, start_question_id FROM sessions WHERE id = :sid"), {"sid": sid}
+    ).mappings().first()
+    assert ses and ses["ended_at"] is None
+    dup = db.execute(
+        text("SELECT id FROM answers WHERE session_id = :sid AND question_id = :qid LIMIT 1"),
+        {"sid": sid, "qid": qid},
+    ).first()
+    assert dup is None
+    q = db.execute(
+        text("SELECT id, enabled, value_a_key, value_b_key, question_text FROM questions WHERE id = :qid"),
+        {"qid": qid},
+    ).mappings().first()
+    chosen_value_key = ((q["value_a_key"] if choice == "A" else q["value_b_key"]) or "").strip()
+    answered_before = int(db.execute(
+        text("SELECT COUNT(*) FROM answers WHERE session_id = :sid"), {"sid": sid}
+    ).scalar() or 0)
+    assert qid == int(ses["start_question_id"]) + answered_before
+    db.execute(
+        text("""
+            INSERT INTO answers (session_id, question_id, choice, chosen_value_key, cycle_id)
+            VALUES (:sid, :qid, :choice, :key, :cycle)
+        """),
+        {"sid": sid, "qid": qid, "choice": choice, "key": chosen_value_key, "cycle": current_cycle},
+    )
+    db.execute(text("SELECT COUNT(*) FROM answers WHERE cycle_id = :c"), {"c": current_cycle}).scalar()
+    db.commit()
+    db.execute(
+        text("SELECT id, question_text FROM questions WHERE id > :qid AND enabled = 1 ORDER BY id ASC LIMIT 1"),
+        {"qid": qid},
+    ).first()
+    db.execute(
+        text("UPDATE answers SET assistant_reaction = :r WHERE session_id = :sid AND question_id = :qid"),
+        {"r": REACTION, "sid": sid, "qid": qid},
+    )
+    db.commit()
+
+
+def _new_prefetched(db, sid: int, qid: int, choice: str):
+    from routers.answer import _insert_answer
+
+    _insert_answer(db, sid, qid, choice, REACTION)
+
+
+def _new_live(db, sid: int, qid: int, choice: str):
+    from routers.answer import _insert_answer, _save_reaction
+
+    ctx = _insert_answer(db, sid, qid, choice)
+    if ctx["reaction_text"] is None:
+        _save_reaction(db, sid, qid, REACTION)
+
+
+def _run_path(db_factory, make_sessions, start: int, answer_fn) -> dict:
+    sids = make_sessions(TALKERS, start_question_id=start)
+
+    def talker(i: int):
+        samples = []
+        db = db_factory()
+        try:
+            for n in range(ANSWERS_EACH):
+                _round_trips.n = 0
+                t0 = time.perf_counter()
+                answer_fn(db, sids[i], start + n, "A" if (i + n) % 2 else "B")
+                samples.append(((time.perf_counter() - t0) * 1000, _round_trips.n))
+            return samples
+        finally:
+            db.close()
+
+    results = run_concurrently(TALKERS, talker)
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert not errors, errors
+
+    samples = [s for r in results for s in r]
+    trips = [t for _ms, t in samples]
+    return {
+        "answers": len(samples),
+        "round_trips_avg": sum(trips) / len(trips),
+        "round_trips_max": max(trips),
+        **latency_summary([ms for ms, _t in samples]),
+    }
+
+
+@pytest.mark.bench
+def test_bench_answer_path_before_after(db_factory, answer_start, make_sessions, round_trip_counter, bench_report):
+    """20명 × 5답변 동시 제출: 답변 1건당 왕복 수 / 지연 비교"""
+    paths = {
+        "before": _legacy_answer,
+        "after_prefetched": _new_prefetched,
+        "after_live": _new_live,
+    }
+    stats = {}
+    for name, fn in paths.items():
+        stats[name] = _run_path(db_factory, make_sessions, answer_start, fn)
+        bench_report(f"answer_path.{name}", talkers=TALKERS, **stats[name])
+
+    assert stats["after_prefetched"]["round_trips_max"] < stats["before"]["round_trips_max"]
+    assert stats["after_live"]["round_trips_max"] < stats["before"]["round_trips_max"]
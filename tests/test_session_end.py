@@ -0,0 +1,120 @@
+"""
+세션 종료 (services/session_service.end_session_core) 동시성 테스트
+- 50개 세션을 동시에 종료 (세션마다 종료 요청 2개씩 경합)
+- 종료 선점 UPDATE: 세션당 한 요청만 반영 → psano_personality 증가분이 답변 수와 정확히 같음
+- current_question: GREATEST + LAST_INSERT_ID → 끝나는 순서와 상관없이 가장 앞선 값으로
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+
+from tests.conftest import run_concurrently
+
+SESSIONS_N = 50
+
+
+def _personality(db) -> dict:
+    from util.constants import VALUE_KEYS_ORDERED
+
+    row = db.execute(text("SELECT * FROM psano_personality WHERE id = 1")).mappings().first()
+    return {k: int((row or {}).get(k) or 0) for k in VALUE_KEYS_ORDERED}
+
+
+@pytest.fixture
+def saved_state(db_factory):
+    """테스트가 바꾸는 personality/current_question을 끝나고 되돌림"""
+    from routers.admin import ensure_psano_personality_row
+
+    db = db_factory()
+    try:
+        ensure_psano_personality_row(db)
+        db.commit()
+        before = _personality(db)
+        current_q = int(db.execute(text("SELECT current_question FROM psano_state WHERE id = 1")).scalar() or 1)
+    finally:
+        db.close()
+
+    yield before
+
+    db = db_factory()
+    try:
+        db.execute(
+            text("UPDATE psano_personality SET " + ", ".join(f"`{k}` = :{k}" for k in before) + " WHERE id = 1"),
+            before,
+        )
+        db.execute(text("UPDATE psano_state SET current_question = :q WHERE id = 1"), {"q": current_q})
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_concurrent_session_end_is_race_free(db_factory, make_sessions, saved_state):
+    from services import question_catalog
+    from services.session_service import end_session_core
+    from util.constants import MAX_QUESTIONS, VALUE_KEYS_ORDERED
+
+    db = db_factory()
+    try:
+        enabled = [int(q["id"]) for q in question_catalog.enabled_questions(db)]
+        if len(enabled) < 3:
+            pytest.skip("enabled 질문이 3개 이상 필요")
+        start = enabled[0]
+        db.execute(text("UPDATE psano_state SET current_question = :q WHERE id = 1"), {"q": start})
+        db.commit()
+        cycle = int(db.execute(text("SELECT cycle_number FROM psano_state WHERE id = 1")).scalar() or 1)
+    finally:
+        db.close()
+
+    sids = make_sessions(SESSIONS_N, start_question_id=start)
+
+    # 세션마다 1~3개 답변 (가치키는 돌아가며) → 기대 증가분/current_question 계산
+    expected_delta = {k: 0 for k in VALUE_KEYS_ORDERED}
+    expected_q = start
+    db = db_factory()
+    try:
+        for i, sid in enumerate(sids):
+            answered = i % 3 + 1
+            for n in range(answered):
+                key = VALUE_KEYS_ORDERED[(i + n) % len(VALUE_KEYS_ORDERED)]
+                db.execute(
+                    text("""
+                        INSERT INTO answers (session_id, question_id, choice, chosen_value_key, cycle_id)
+                        VALUES (:sid, :qid, 'A', :key, :cycle)
+                    """),
+                    {"sid": sid, "qid": enabled[n], "key": key, "cycle": cycle},
+                )
+                expected_delta[key] += 1
+            next_q = question_catalog.next_enabled(db, start + answered)
+            expected_q = max(expected_q, int(next_q["id"]) if next_q else MAX_QUESTIONS + 1)
+        db.commit()
+    finally:
+        db.close()
+
+    # 세션마다 종료 요청 2개 → 100 스레드 동시 시작
+    def end(i: int):
+        db = db_factory()
+        try:
+            return end_session_core(db, sids[i // 2], "completed")
+        finally:
+            db.close()
+
+    results = run_concurrently(SESSIONS_N * 2, end)
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert not errors, errors
+
+    winners = [r["session_id"] for r in results if not r["already_ended"]]
+    assert sorted(winners) == sorted(sids)  # 세션당 정확히 한 요청만 반영
+
+    db = db_factory()
+    try:
+        after = _personality(db)
+        assert {k: after[k] - saved_state[k] for k in after} == expected_delta
+        current_q = int(db.execute(text("SELECT current_question FROM psano_state WHERE id = 1")).scalar() or 0)
+        assert current_q == expected_q
+        active = db.execute(
+            text(f"SELECT COUNT(*) FROM sessions WHERE ended_at IS NULL AND id IN ({', '.join(map(str, sids))})")
+        ).scalar()
+        assert int(active or 0) == 0
+    finally:
+        db.close()
@@ -0,0 +1,130 @@
+"""
+routers/_store 락 경합 벤치마크 (DB 없음)
+- 200 스레드가 동시에 세션 레코드 갱신 + GLOBAL_STATE 읽기(+가끔 쓰기)
+- before: 프로세스 전역 RLock 1개 (GLOBAL_STATE dict 복사 읽기, 세션 갱신 모두 같은 락)
+- after: copy-on-write 스냅샷(락 없는 읽기) + 세션별 스트라이프 락 (SessionStore.lock_for)
+- 처리량과 op 지연(p50/p95)을 psano.bench로 출력, 양쪽 모두 갱신 유실 없음 확인
+"""
+from __future__ import annotations
+
+import time
+from threading import RLock
+
+import pytest
+
+from tests.conftest import latency_summary, run_concurrently
+
+THREADS = 200
+OPS_EACH = 500
+STATE_WRITE_EVERY = 50  # 이 간격마다 GLOBAL_STATE 쓰기 (세션 종료/턴 카운트 반영 등)
+STATE_READS_PER_OP = 3  # 요청 하나가 스냅샷을 읽는 횟수 (phase/cycle/turn 확인 등)
+
+
+class _SingleLockStore:
+    """이전 구조: LOCK 하나로 GLOBAL_STATE(dict 복사 반환)와 모든 세션 레코드를 보호"""
+
+    def __init__(self, sids):
+        self.lock = RLock()
+        self.state = {"version": 0, "global_turn_count": 0, "cycle_number": 1}
+        self.sessions = {sid: {"idle_turn_count": 0, "recent": []} for sid in sids}
+
+    def read_state(self):
+        with self.lock:
+            return dict(self.state)
+
+    def write_state(self):
+        with self.lock:
+            self.state["version"] += 1
+
+    def update_session(self, sid: int, entry: str):
+        with self.lock:
+            rec = self.sessions[sid]
+            rec["idle_turn_count"] += 1
+            rec["recent"].append(entry)
+
+    def turn_counts(self):
+        return [rec["idle_turn_count"] for rec in self.sessions.values()]
+
+    def version(self) -> int:
+        return self.state["version"]
+
+
+class _StripedStore:
+    """현재 구조: routers._store의 스냅샷 교체 + SessionStore 스트라이프 락 그대로 사용"""
+
+    def __init__(self, sids):
+        from routers import _store
+
+        self.store = _store
+        self.sids = list(sids)
+        self.sessions = _store.SessionStore(max_size=len(sids))
+        for sid in sids:
+            rec = _store.SessionRecord(id=sid)
+            rec.recent = _store.new_recent_buffer()
+            self.sessions.put(rec)
+        self.start_version = int(_store.GLOBAL_STATE.get("version") or 0)
+
+    def read_state(self):
+        return self.store.get_global_state()
+
+    def write_state(self):
+        self.store.update_global_state()
+
+    def update_session(self, sid: int, entry: str):
+        rec = self.sessions.get(sid)
+        with self.sessions.lock_for(sid):
+            rec.idle_turn_count += 1
+            rec.recent.append(entry)
+
+    def turn_counts(self):
+        return [self.sessions.get(sid).idle_turn_count for sid in self.sids]
+
+    def version(self) -> int:
+        return int(self.store.GLOBAL_STATE.get("version") or 0) - self.start_version
+
+
+def _run(store) -> dict:
+    def worker(i: int):
+        latencies = []
+        for n in range(OPS_EACH):
+            t0 = time.perf_counter()
+            for _ in range(STATE_READS_PER_OP):
+                store.read_state()
+            store.update_session(i, f"USER: {n}\nASSISTANT: {n}")
+            if n % STATE_WRITE_EVERY == 0:
+                store.write_state()
+            latencies.append((time.perf_counter() - t0) * 1000)
+        return latencies
+
+    t0 = time.perf_counter()
+    results = run_concurrently(THREADS, worker)
+    elapsed = time.perf_counter() - t0
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert not errors, errors
+
+    # 갱신 유실 없음: 세션별 턴 수, 스냅샷 버전 증가분
+    assert store.turn_counts() == [OPS_EACH] * THREADS
+    assert store.version() == THREADS * len(range(0, OPS_EACH, STATE_WRITE_EVERY))
+
+    latencies = [ms for r in results for ms in r]
+    return {"ops": len(latencies), "elapsed_s": elapsed, "ops_per_s": len(latencies) / elapsed,
+            **latency_summary(latencies)}
+
+
+@pytest.fixture
+def isolated_global_state(monkeypatch):
+    """스냅샷 만료로 DB를 읽지 않게 하고, 테스트가 올린 버전은 끝나면 원래 스냅샷으로 되돌림"""
+    from routers import _store
+
+    monkeypatch.setattr(_store, "_state_loaded_at", time.time() + 3600)
+    monkeypatch.setattr(_store, "GLOBAL_STATE", _store.GLOBAL_STATE)
+
+
+@pytest.mark.bench
+def test_bench_store_contention_200_threads(isolated_global_state, bench_report):
+    sids = list(range(THREADS))
+    before = _run(_SingleLockStore(sids))
+    bench_report("store_contention.before", threads=THREADS, **before)
+    after = _run(_StripedStore(sids))
+    bench_report("store_contention.after", threads=THREADS, **after)
+    bench_report("store_contention", speedup=after["ops_per_s"] / before["ops_per_s"])
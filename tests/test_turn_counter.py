@@ -0,0 +1,167 @@
+"""
+글로벌 턴 카운터 (services/turn_counter) 동시성 테스트 + 벤치마크
+- 20명이 동시에 대화해도 턴 수가 빠지지 않고, max 도달 시 엔딩/사이클 리셋은 한 번만
+- 벤치마크: 20 talker의 턴 저장 지연 (p50/p95)과 처리량 (-m bench, psano.bench 로그)
+"""
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from tests.conftest import latency_summary, run_concurrently
+
+TALKERS = 20
+
+
+def _current_cycle(db) -> int:
+    return int(db.execute(text("SELECT cycle_number FROM psano_state WHERE id = 1")).scalar() or 1)
+
+
+@pytest.fixture
+def fresh_counter(db_factory):
+    """턴 카운터/엔딩 선점 상태 초기화 + 이 워커 스냅샷 동기화"""
+    from routers._store import update_global_state
+    from services import turn_counter
+
+    db = db_factory()
+    try:
+        turn_counter.reset(db)
+        db.execute(text("UPDATE psano_state SET global_turn_count = 0 WHERE id = 1"))
+        db.commit()
+        cycle = _current_cycle(db)
+        update_global_state(global_turn_count=0, cycle_number=cycle)
+        return cycle
+    finally:
+        db.close()
+
+
+def _turn_ctx(cycle: int, turn_max: int) -> dict:
+    return {
+        "user_text": "안녕",
+        "fallback_text": "…",
+        "session_memory": "",
+        "remaining_turns": 100,
+        "global_turn_max": turn_max,
+        "idle_id": None,
+        "policy_category": None,
+        "warning_text": None,
+        "cycle_number": cycle,
+    }
+
+
+def test_concurrent_talkers_end_cycle_once(db_factory, make_sessions, fresh_counter):
+    from routers.talk import _finish_turn
+    from schemas.talk import TalkTurnRequest
+    from services.llm_service import LLMResult
+
+    turns_each = 5
+    turn_max = TALKERS * turns_each - 7  # 마지막 몇 턴 전에 max 도달
+    cycle = fresh_counter
+    sids = make_sessions(TALKERS)
+
+    def talker(i: int):
+        ended, rejected = 0, 0
+        db = db_factory()
+        try:
+            for _ in range(turns_each):
+                req = TalkTurnRequest(session_id=sids[i], user_text="안녕")
+                result = LLMResult(success=True, content="ASSISTANT: 응\nMEMORY: 기억", fallback_code=None)
+                try:
+                    out = _finish_turn(db, req, _turn_ctx(cycle, turn_max), result)
+                except HTTPException as e:
+                    assert e.status_code == 409  # 리셋으로 세션이 종료된 뒤의 턴
+                    rejected += 1
+                    continue
+                ended += int(bool(out["global_ended"]))
+            return ended, rejected
+        finally:
+            db.close()
+
+    results = run_concurrently(TALKERS, talker)
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert not errors, errors
+
+    db = db_factory()
+    try:
+        assert sum(r[0] for r in results) == 1        # 엔딩 응답은 한 요청만
+        assert _current_cycle(db) == cycle + 1        # 사이클은 한 번만 증가
+        assert sum(r[1] for r in results) > 0         # 리셋 이후 턴은 저장되지 않고 409
+        active = db.execute(
+            text(f"SELECT COUNT(*) FROM sessions WHERE ended_at IS NULL AND id IN ({', '.join(map(str, sids))})")
+        ).scalar()
+        assert int(active or 0) == 0
+    finally:
+        db.close()
+
+
+def test_recovery_reset_runs_once(db_factory, fresh_counter):
+    """리셋 실패 후 복구 경로가 동시에 여러 번 들어와도 사이클은 한 번만 증가"""
+    from services.session_service import reset_cycle_core
+
+    cycle = fresh_counter
+
+    def recover(_i: int):
+        db = db_factory()
+        try:
+            return reset_cycle_core(db, reason="test_recovery", expected_cycle=cycle)
+        finally:
+            db.close()
+
+    results = run_concurrently(10, recover)
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert not errors, errors
+    assert sum(1 for r in results if r.get("ok")) == 1
+    assert all(r.get("skipped") for r in results if not r.get("ok"))
+
+    db = db_factory()
+    try:
+        assert _current_cycle(db) == cycle + 1
+    finally:
+        db.close()
+
+
+@pytest.mark.bench
+def test_bench_20_talkers_turn_latency(db_factory, make_sessions, fresh_counter, bench_report):
+    """벤치마크: 20 talker × 10턴 동시 저장 (persist_turn, 슬롯 카운터) → 지연/처리량 출력, 턴 유실 없음"""
+    from services import turn_counter
+    from services.talk_service import persist_turn
+
+    turns_each = 10
+    sids = make_sessions(TALKERS)
+
+    def talker(i: int):
+        latencies = []
+        db = db_factory()
+        try:
+            for n in range(turns_each):
+                t0 = time.perf_counter()
+                persist_turn(db, sids[i], None, "안녕", "응", "ok", memory=f"m{n}", count_turn=True)
+                latencies.append((time.perf_counter() - t0) * 1000)
+            return latencies
+        finally:
+            db.close()
+
+    t0 = time.perf_counter()
+    results = run_concurrently(TALKERS, talker)
+    elapsed = time.perf_counter() - t0
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert not errors, errors
+
+    latencies = [ms for r in results for ms in r]
+    bench_report(
+        "turn_persist",
+        talkers=TALKERS,
+        turns=len(latencies),
+        elapsed_s=elapsed,
+        turns_per_s=len(latencies) / elapsed,
+        **latency_summary(latencies),
+    )
+
+    db = db_factory()
+    try:
+        assert turn_counter.get_total(db) == TALKERS * turns_each
+    finally:
+        db.close()
@@ -41,6 +41,7 @@ TALK_INPUT_LIMIT = 200       # 사용자 입력 최대 길이
 TALK_OUTPUT_LIMIT = 150      # 사노 응답 최대 길이
 TALK_MEMORY_LIMIT = 600      # 세션 메모리 최대 길이
 TALK_RECENT_TURNS = 3        # 최근 대화 턴 수
+TALK_RECENT_BUFFER = 12      # 세션별 최근 메시지 버퍼 크기 (nudge 최대 조회 수)
 
 # 닉네임 제한
 VISITOR_NAME_MAX_LEN = 12
\ No newline at end of file
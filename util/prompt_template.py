@@ -0,0 +1,124 @@
+"""
+프롬프트 템플릿 컴파일 (psano_prompts)
+- 템플릿을 캐시 로드 시점에 한 번만 파싱해 [리터럴, 자리표시자, 리터럴, ...] 조각 목록으로 보관
+- 렌더링은 자리표시자 자리만 값으로 바꿔 join 한 번 (키마다 전체 문자열 replace 반복 없음)
+- {name} 형태(식별자)만 자리표시자, JSON 예시 같은 나머지 중괄호는 그대로 둠
+- 키별 스키마(PROMPT_SCHEMAS)에 없는 자리표시자는 unknown으로 모아두고 리터럴로 남김
+- render_parts(): 첫 가변 자리표시자 앞까지를 system(사이클 동안 고정), 나머지를 user로 나눔
+  → LLM 제공자 prefix 캐시가 맞도록 고정 부분을 항상 같은 바이트로 앞에 둠
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, FrozenSet, NamedTuple, Tuple
+
+_PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+# 키별 허용 자리표시자 + str.format 호환({{ }} 이스케이프) 여부
+# - str.format으로 렌더링하던 템플릿은 {{/}}를 {/}로 풀어야 기존 결과와 같음
+PROMPT_SCHEMAS: Dict[str, Tuple[FrozenSet[str], bool]] = {
+    "talk_start_prompt": (frozenset({
+        "persona", "values_summary", "topic_ctx", "visitor_name", "output_limit",
+    }), False),
+    "talk_turn_prompt": (frozenset({
+        "persona", "values_summary", "topic_ctx", "session_memory", "recent_turns", "user_text",
+        "visitor_name", "output_limit", "memory_limit", "policy_guide", "local_warning", "ask_continue",
+    }), False),
+    "reaction_prompt": (frozenset({
+        "stage_name", "style_guide", "notes_line", "question_text", "current_question_text",
+        "next_question_text", "choice", "session_question_index", "session_question_limit",
+        "last_instruction",
+    }), True),
+    "policy_guide_prompt": (frozenset({"category", "fallback_message"}), True),
+}
+
+
+# 사이클 동안 바뀌지 않는 값 (persona/summary는 형성 시점에 고정, 나머지는 상수)
+STABLE_FIELDS: FrozenSet[str] = frozenset({"persona", "values_summary", "output_limit", "memory_limit"})
+
+
+class PromptParts(NamedTuple):
+    """LLM 요청 프롬프트 (system: 사이클 동안 고정된 앞부분, user: 요청마다 바뀌는 뒷부분)"""
+    system: str
+    user: str
+
+    @property
+    def text(self) -> str:
+        """한 덩어리 텍스트 (정책 검사/로그용)"""
+        return "\n\n".join(p for p in (self.system, self.user) if p)
+
+
+class PromptTemplate:
+    """컴파일된 템플릿 (불변). parts: 짝수 인덱스 = 리터럴, 홀수 인덱스 = 자리표시자 이름"""
+
+    __slots__ = ("key", "parts", "fields", "unknown", "split_at")
+
+    def __init__(self, key: str, parts: Tuple[str, ...], unknown: FrozenSet[str]):
+        self.key = key
+        self.parts = parts
+        self.fields = frozenset(parts[1::2])
+        self.unknown = unknown
+        # 첫 가변 자리표시자 위치 (없으면 전체가 고정)
+        self.split_at = next(
+            (i for i in range(1, len(parts), 2) if parts[i] not in STABLE_FIELDS), len(parts)
+        )
+
+    def _render_list(self, values: Dict[str, Any]) -> list[str]:
+        out = list(self.parts)
+        for i in range(1, len(out), 2):
+            name = out[i]
+            out[i] = str(values[name]) if name in values else "{" + name + "}"
+        return out
+
+    def render(self, **values: Any) -> str:
+        """값이 없는 자리표시자는 {name} 그대로 남김 (기존 replace 방식과 동일)"""
+        return "".join(self._render_list(values))
+
+    def render_parts(self, **values: Any) -> PromptParts:
+        """고정 앞부분(system) + 가변 뒷부분(user)으로 렌더링 (가변 부분이 없으면 전부 user)"""
+        out = self._render_list(values)
+        system = "".join(out[:self.split_at]).strip()
+        user = "".join(out[self.split_at:]).strip()
+        if not user:
+            return PromptParts("", system)
+        return PromptParts(system, user)
+
+
+def _unescape(literal: str) -> str:
+    return literal.replace("{{", "{").replace("}}", "}")
+
+
+def compile_prompt(key: str, source: str) -> PromptTemplate:
+    """템플릿 문자열 → PromptTemplate (스키마에 없는 키는 자리표시자 검사 없이 전부 허용)"""
+    allowed, format_escapes = PROMPT_SCHEMAS.get(key, (None, False))
+    source = source or ""
+
+    parts: list[str] = []
+    unknown: set[str] = set()
+    literal_start = 0
+    pos = 0
+    while True:
+        m = _PLACEHOLDER_RE.search(source, pos)
+        if m is None:
+            break
+        name = m.group(1)
+        start = m.start()
+        # str.format 호환: 앞의 "{" 개수가 홀수면 "{{name}}" 이스케이프 → 리터럴
+        if format_escapes:
+            braces = len(source[:start]) - len(source[:start].rstrip("{"))
+            if braces % 2 == 1:
+                pos = m.end()
+                continue
+        if allowed is not None and name not in allowed:
+            unknown.add(name)
+            pos = m.end()
+            continue
+        parts.append(source[literal_start:start])
+        parts.append(name)
+        literal_start = pos = m.end()
+    parts.append(source[literal_start:])
+
+    if format_escapes:
+        parts = [_unescape(p) if i % 2 == 0 else p for i, p in enumerate(parts)]
+
+    return PromptTemplate(key, tuple(parts), frozenset(unknown))
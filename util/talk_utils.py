@@ -9,7 +9,8 @@ from typing import Optional
 from sqlalchemy.orm import Session
 
 from routers.talk_policy import moderate_text
-from util.utils import get_prompt
+from util.utils import get_prompt_template, render_prompt, summary_to_text
+from util.prompt_template import compile_prompt
 from util.constants import TALK_OUTPUT_LIMIT
 
 # constants에서 import (하위 호환성을 위한 별칭)
@@ -28,6 +29,23 @@ _DEFAULT_POLICY_GUIDE = """[정책 안내]
 - 전달 후 전시/감정 관련 주제로 자연스럽게 전환
 - "I'm sorry", "죄송", "미안" 같은 사과 표현 금지
 - "할 수 없어", "다룰 수 없어" 같은 거부 표현 금지"""
+_DEFAULT_POLICY_GUIDE_TEMPLATE = compile_prompt("policy_guide_prompt", _DEFAULT_POLICY_GUIDE)
+
+
+def build_system_prefix(persona: str | None, values_summary) -> str:
+    """
+    talk/nudge/monologue 공용 system 앞부분 (persona + values_summary).
+    사이클 동안 persona/summary가 고정이므로 바이트 단위로 같은 문자열 → 제공자 prefix 캐시 적중.
+    """
+    persona = (persona or "").strip()
+    summary_text = summary_to_text(values_summary).strip()
+
+    base = []
+    if persona:
+        base.append(f"[persona_prompt]\n{persona}\n")
+    if summary_text:
+        base.append(f"[values_summary]\n{summary_text}\n")
+    return "\n".join(base).strip()
 
 
 def get_policy_guide(db: Session, text_for_check: str) -> tuple[Optional[str], Optional[str]]:
@@ -44,20 +62,17 @@ def get_policy_guide(db: Session, text_for_check: str) -> tuple[Optional[str], O
     rule, _kw = hit
 
     # DB에서 템플릿 로드 (없으면 기본값)
-    template = get_prompt(db, "policy_guide_prompt", _DEFAULT_POLICY_GUIDE)
+    template = get_prompt_template(db, "policy_guide_prompt")
+    if template is None or template.unknown:
+        # 템플릿에 모르는 자리표시자가 있으면 기본값 사용
+        template = _DEFAULT_POLICY_GUIDE_TEMPLATE
 
     # 템플릿에 값 주입
-    try:
-        guide = template.format(
-            category=rule.category,
-            fallback_message=rule.fallback_message,
-        )
-    except KeyError:
-        # 템플릿 형식 오류 시 기본값 사용
-        guide = _DEFAULT_POLICY_GUIDE.format(
-            category=rule.category,
-            fallback_message=rule.fallback_message,
-        )
+    guide = render_prompt(
+        template,
+        category=rule.category,
+        fallback_message=rule.fallback_message,
+    )
 
     return guide, rule.category
 
@@ -7,13 +7,17 @@ from __future__ import annotations
 
 import json
 import time
+import bisect
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from util.prompt_template import PromptParts, PromptTemplate, compile_prompt
+
 
 # ============================================================
 # 설정/프롬프트 캐시
@@ -23,7 +27,30 @@ _config_cache: Dict[str, Any] = {}
 _config_cache_time: float = 0
 _prompt_cache: Dict[str, str] = {}
 _prompt_cache_time: float = 0
-CONFIG_CACHE_TTL = 60  # 초
+_prompt_compiled: Dict[str, PromptTemplate] = {}  # 프롬프트 캐시와 같이 갱신/초기화
+_prompt_render_stats: Dict[str, Dict[str, float]] = {}
+CONFIG_CACHE_TTL = 3600  # 초 (admin 수정은 cache_version으로 즉시 반영)
+
+# 워커 간 캐시 무효화: psano_config.cache_version (admin 쓰기마다 +1)
+CACHE_VERSION_KEY = "cache_version"
+CACHE_VERSION_CHECK_SEC = 2  # 버전 확인 주기 (PK 단건 조회)
+_cache_version_seen: int | None = None
+_cache_version_checked_at: float = 0
+_cache_listeners: List[Callable[[], None]] = []
+
+# single-flight 갱신: 한 스레드만 SELECT, 나머지는 이전 스냅샷 사용 (stale-while-revalidate)
+_config_refresh_lock = threading.Lock()
+_prompt_refresh_lock = threading.Lock()
+_cache_refresh_stats: Dict[str, Dict[str, float]] = {
+    "config": {"count": 0, "last_ms": 0.0, "max_ms": 0.0},
+    "prompt": {"count": 0, "last_ms": 0.0, "max_ms": 0.0},
+    "growth_stage": {"count": 0, "last_ms": 0.0, "max_ms": 0.0},
+}
+
+# 성장단계 구간 인덱스: {"bounds": 구간 시작점(오름차순), "at": 구간별 단계, "lowest": 최저 단계}
+_stage_index: Dict[str, Any] | None = None
+_stage_index_time: float = 0
+_stage_refresh_lock = threading.Lock()
 
 
 # ============================================================
@@ -151,58 +178,242 @@ def summary_to_text(v: Any) -> str:
 # 성장단계 로드
 # ============================================================
 
-def load_growth_stage(db: Session, answered_total: int):
+_STAGE_COLUMNS = """
+    stage_id, stage_name_kr, stage_name_en,
+    min_answers, max_answers, metaphor_density, certainty,
+    sentence_length, empathy_level, notes
+"""
+
+
+def build_style_guide(stage, thresholds: Dict[str, float]) -> str:
+    """성장단계에 따른 스타일 가이드 문자열 (임계값은 style_* 설정)"""
+    if not stage:
+        return ""
+
+    metaphor = float(stage.get("metaphor_density") or 0.3)
+    certainty = float(stage.get("certainty") or 0.4)
+    empathy = float(stage.get("empathy_level") or 0.6)
+
+    guides = []
+    if metaphor <= thresholds["metaphor_low"]:
+        guides.append("은유 없이 직접적으로")
+    elif metaphor >= thresholds["metaphor_high"]:
+        guides.append("은유적으로")
+
+    if certainty <= thresholds["certainty_low"]:
+        guides.append("조심스럽게")
+
+    if empathy >= thresholds["empathy_high"]:
+        guides.append("공감하며")
+
+    return ", ".join(guides) if guides else "담백하게"
+
+
+def _style_thresholds(db: Session) -> Dict[str, float]:
+    return {
+        "metaphor_low": get_config(db, "style_metaphor_low", 0.25),
+        "metaphor_high": get_config(db, "style_metaphor_high", 0.45),
+        "certainty_low": get_config(db, "style_certainty_low", 0.45),
+        "empathy_high": get_config(db, "style_empathy_high", 0.70),
+    }
+
+
+def _fetch_growth_stages(db: Session) -> List[dict] | None:
+    """전체 성장단계 로드 (idle_greeting 컬럼 없으면 제외하고 재시도)"""
+    for extra in (", idle_greeting", ""):
+        try:
+            rows = db.execute(
+                text(f"SELECT {_STAGE_COLUMNS}{extra} FROM psano_growth_stages ORDER BY stage_id ASC")
+            ).mappings().all()
+            return [dict(r) for r in rows]
+        except Exception:
+            continue
+    return None
+
+
+def _build_stage_index(stages: List[dict]) -> Dict[str, Any]:
     """
-    psano_growth_stages에서 현재 answered_total에 맞는 성장단계 로드.
-    매칭되는 단계가 없으면 가장 낮은 단계 반환.
+    구간 경계(min_answers, max_answers+1)로 나눈 구간마다 매칭 단계를 미리 계산.
+    구간이 겹치면 SQL(ORDER BY stage_id LIMIT 1)과 같이 stage_id가 가장 낮은 단계.
     """
-    row = db.execute(
-        text("""
-            SELECT stage_id, stage_name_kr, stage_name_en,
-                   min_answers, max_answers, metaphor_density, certainty,
-                   sentence_length, empathy_level, notes
-            FROM psano_growth_stages
-            WHERE :n BETWEEN min_answers AND max_answers
-            ORDER BY stage_id ASC
-            LIMIT 1
-        """),
-        {"n": int(answered_total)},
-    ).mappings().first()
+    bounds = sorted({int(s["min_answers"]) for s in stages} | {int(s["max_answers"]) + 1 for s in stages})
+    at: List[dict | None] = []
+    for b in bounds:
+        at.append(next(
+            (s for s in stages if int(s["min_answers"]) <= b <= int(s["max_answers"])),
+            None
+        ))
+    return {
+        "bounds": bounds,
+        "at": at,
+        "lowest": stages[0] if stages else None,
+    }
+
+
+def _load_stage_index(db: Session) -> Dict[str, Any]:
+    """성장단계 구간 인덱스 (single-flight 갱신, cache_version 무효화)"""
+    global _stage_index, _stage_index_time
+
+    sync_cache_version(db)
+    if _stage_index is not None and (time.time() - _stage_index_time < CONFIG_CACHE_TTL):
+        return _stage_index
+
+    if not _acquire_refresh(_stage_refresh_lock, _stage_index is not None):
+        return _stage_index
+    try:
+        if _stage_index is not None and (time.time() - _stage_index_time < CONFIG_CACHE_TTL):
+            return _stage_index
+
+        t0 = time.perf_counter()
+        stages = _fetch_growth_stages(db)
+        if stages is None:
+            return _stage_index or _build_stage_index([])
+
+        thresholds = _style_thresholds(db)
+        for s in stages:
+            s["style_guide"] = build_style_guide(s, thresholds)
+
+        _stage_index = _build_stage_index(stages)
+        _stage_index_time = time.time()
+        _record_refresh("growth_stage", t0)
+        return _stage_index
+    finally:
+        _stage_refresh_lock.release()
+
+
+def load_growth_stage(db: Session, answered_total: int, fallback_lowest: bool = True):
+    """
+    현재 answered_total에 맞는 성장단계 (메모리 구간 인덱스 + bisect).
+    매칭되는 단계가 없으면 가장 낮은 단계 반환 (fallback_lowest=False면 None).
+    반환 dict에는 미리 계산된 style_guide 포함.
+    """
+    index = _load_stage_index(db)
+    i = bisect.bisect_right(index["bounds"], int(answered_total)) - 1
+    stage = index["at"][i] if i >= 0 else None
+    if stage is None and fallback_lowest:
+        stage = index["lowest"]
+    return dict(stage) if stage else None
+
+
+# ============================================================
+# 캐시 버전 (워커 간 무효화)
+# ============================================================
+
+def register_cache_listener(fn: Callable[[], None]):
+    """cache_version 변경 시 같이 비울 캐시 등록 (정책 규칙 등)"""
+    if fn not in _cache_listeners:
+        _cache_listeners.append(fn)
+
+
+def sync_cache_version(db: Session):
+    """
+    psano_config.cache_version이 바뀌었으면 이 워커의 캐시를 모두 비움.
+    CACHE_VERSION_CHECK_SEC마다 한 번만 조회.
+    """
+    global _cache_version_seen, _cache_version_checked_at
+
+    now = time.time()
+    if now - _cache_version_checked_at < CACHE_VERSION_CHECK_SEC:
+        return
+    _cache_version_checked_at = now
+
+    try:
+        row = db.execute(
+            text("SELECT config_value FROM psano_config WHERE config_key = :key"),
+            {"key": CACHE_VERSION_KEY}
+        ).first()
+    except Exception:
+        return
+
+    version = int(row[0]) if row and str(row[0]).isdigit() else 0
+    if _cache_version_seen is not None and version != _cache_version_seen:
+        clear_all_cache()
+        log_event("cache_version_changed", previous=_cache_version_seen, version=version)
+    _cache_version_seen = version
 
-    if row:
-        return row
 
-    # fallback: 가장 낮은 단계
-    return db.execute(
+def bump_cache_version(db: Session):
+    """
+    admin 쓰기 후 호출: cache_version +1 → 모든 워커가 CACHE_VERSION_CHECK_SEC 안에 캐시 갱신.
+    (호출한 워커는 즉시 비움)
+    """
+    db.execute(
         text("""
-            SELECT stage_id, stage_name_kr, stage_name_en,
-                   min_answers, max_answers, metaphor_density, certainty,
-                   sentence_length, empathy_level, notes
-            FROM psano_growth_stages
-            ORDER BY stage_id ASC
-            LIMIT 1
-        """)
-    ).mappings().first()
+            INSERT INTO psano_config (config_key, config_value, value_type, description)
+            VALUES (:key, '1', 'int', '캐시 무효화 버전 (admin 수정 시 자동 증가)')
+            ON DUPLICATE KEY UPDATE config_value = CAST(config_value AS UNSIGNED) + 1
+        """),
+        {"key": CACHE_VERSION_KEY}
+    )
+    db.commit()
+    clear_all_cache()
 
 
 # ============================================================
 # 설정 로더 (psano_config)
 # ============================================================
 
+def _record_refresh(name: str, t0: float):
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    stats = _cache_refresh_stats[name]
+    stats["count"] += 1
+    stats["last_ms"] = round(elapsed_ms, 1)
+    stats["max_ms"] = max(stats["max_ms"], round(elapsed_ms, 1))
+
+
+def get_cache_refresh_stats() -> Dict[str, Dict[str, float]]:
+    """설정/프롬프트/성장단계 캐시 갱신 횟수·소요시간 (모니터링용)"""
+    return {name: dict(stats) for name, stats in _cache_refresh_stats.items()}
+
+
+def _acquire_refresh(lock: threading.Lock, has_snapshot: bool) -> bool:
+    """
+    갱신 권한 획득
+    - 스냅샷이 있으면 non-blocking: 다른 스레드가 갱신 중이면 False (→ stale 스냅샷 반환)
+    - 스냅샷이 없으면 blocking: 먼저 들어간 스레드의 결과를 기다림
+    """
+    if has_snapshot:
+        return lock.acquire(blocking=False)
+    lock.acquire()
+    return True
+
+
 def _load_all_configs(db: Session) -> Dict[str, Any]:
-    """DB에서 모든 설정을 로드하고 타입 변환"""
+    """DB에서 모든 설정을 로드하고 타입 변환 (single-flight 갱신)"""
     global _config_cache, _config_cache_time
 
+    sync_cache_version(db)
     if _config_cache and (time.time() - _config_cache_time < CONFIG_CACHE_TTL):
         return _config_cache
 
+    if not _acquire_refresh(_config_refresh_lock, bool(_config_cache)):
+        return _config_cache
+    try:
+        # 대기하는 동안 다른 스레드가 갱신했으면 그대로 사용
+        if _config_cache and (time.time() - _config_cache_time < CONFIG_CACHE_TTL):
+            return _config_cache
+
+        t0 = time.perf_counter()
+        result = _fetch_all_configs(db)
+        if result is None:
+            # 테이블이 없으면 (있던 스냅샷 or) 빈 딕셔너리 반환
+            return _config_cache or {}
+
+        _config_cache = result
+        _config_cache_time = time.time()
+        _record_refresh("config", t0)
+        return result
+    finally:
+        _config_refresh_lock.release()
+
+
+def _fetch_all_configs(db: Session) -> Dict[str, Any] | None:
     try:
         rows = db.execute(
             text("SELECT config_key, config_value, value_type FROM psano_config")
         ).mappings().all()
     except Exception:
-        # 테이블이 없으면 빈 딕셔너리 반환
-        return {}
+        return None
 
     result = {}
     for row in rows:
@@ -230,8 +441,6 @@ def _load_all_configs(db: Session) -> Dict[str, Any]:
         else:
             result[key] = value
 
-    _config_cache = result
-    _config_cache_time = time.time()
     return result
 
 
@@ -252,28 +461,48 @@ def get_configs(db: Session, keys: list[str]) -> Dict[str, Any]:
 # ============================================================
 
 def _load_all_prompts(db: Session) -> Dict[str, str]:
-    """DB에서 모든 프롬프트 템플릿 로드"""
-    global _prompt_cache, _prompt_cache_time
+    """DB에서 모든 프롬프트 템플릿 로드 (single-flight 갱신)"""
+    global _prompt_cache, _prompt_cache_time, _prompt_compiled
 
+    sync_cache_version(db)
     if _prompt_cache and (time.time() - _prompt_cache_time < CONFIG_CACHE_TTL):
         return _prompt_cache
 
+    if not _acquire_refresh(_prompt_refresh_lock, bool(_prompt_cache)):
+        return _prompt_cache
     try:
-        rows = db.execute(
-            text("SELECT prompt_key, prompt_template FROM psano_prompts")
-        ).mappings().all()
-    except Exception:
-        return {}
-
-    result = {
-        row.get("prompt_key"): row.get("prompt_template", "")
-        for row in rows
-        if row.get("prompt_key")  # null key 방지
-    }
+        if _prompt_cache and (time.time() - _prompt_cache_time < CONFIG_CACHE_TTL):
+            return _prompt_cache
 
-    _prompt_cache = result
-    _prompt_cache_time = time.time()
-    return result
+        t0 = time.perf_counter()
+        try:
+            rows = db.execute(
+                text("SELECT prompt_key, prompt_template FROM psano_prompts")
+            ).mappings().all()
+        except Exception:
+            return _prompt_cache or {}
+
+        result = {
+            row.get("prompt_key"): row.get("prompt_template", "")
+            for row in rows
+            if row.get("prompt_key")  # null key 방지
+        }
+
+        # 템플릿 컴파일 + 자리표시자 검사 (로드 시 한 번)
+        compiled = {}
+        for key, source in result.items():
+            tpl = compile_prompt(key, source or "")
+            if tpl.unknown:
+                log_event("prompt_template_unknown_placeholders", key=key, names=sorted(tpl.unknown))
+            compiled[key] = tpl
+
+        _prompt_compiled = compiled
+        _prompt_cache = result
+        _prompt_cache_time = time.time()
+        _record_refresh("prompt", t0)
+        return result
+    finally:
+        _prompt_refresh_lock.release()
 
 
 def get_prompt(db: Session, key: str, default: str = "") -> str:
@@ -282,6 +511,46 @@ def get_prompt(db: Session, key: str, default: str = "") -> str:
     return prompts.get(key, default)
 
 
+def get_prompt_template(db: Session, key: str) -> PromptTemplate | None:
+    """컴파일된 프롬프트 템플릿 조회 (캐시 사용, DB에 없거나 비어 있으면 None)"""
+    _load_all_prompts(db)
+    tpl = _prompt_compiled.get(key)
+    if tpl is None or tpl.parts == ("",):
+        return None
+    return tpl
+
+
+def _record_render(key: str, t0: float):
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    stats = _prompt_render_stats.get(key)
+    if stats is None:
+        stats = _prompt_render_stats[key] = {"count": 0, "last_ms": 0.0, "max_ms": 0.0}
+    stats["count"] += 1
+    stats["last_ms"] = round(elapsed_ms, 3)
+    stats["max_ms"] = max(stats["max_ms"], round(elapsed_ms, 3))
+
+
+def render_prompt(template: PromptTemplate, **values: Any) -> str:
+    """컴파일된 템플릿 렌더링 + 키별 소요시간 기록 (모니터링용)"""
+    t0 = time.perf_counter()
+    out = template.render(**values)
+    _record_render(template.key, t0)
+    return out
+
+
+def render_prompt_parts(template: PromptTemplate, **values: Any) -> PromptParts:
+    """render_prompt와 같되 system(고정 앞부분) / user(가변 뒷부분)로 나눠 반환"""
+    t0 = time.perf_counter()
+    out = template.render_parts(**values)
+    _record_render(template.key, t0)
+    return out
+
+
+def get_prompt_render_stats() -> Dict[str, Dict[str, float]]:
+    """프롬프트 키별 렌더링 횟수·소요시간 (모니터링용)"""
+    return {key: dict(stats) for key, stats in _prompt_render_stats.items()}
+
+
 # ============================================================
 # 캐시 초기화
 # ============================================================
@@ -295,12 +564,26 @@ def clear_config_cache():
 
 def clear_prompt_cache():
     """프롬프트 캐시 강제 초기화"""
-    global _prompt_cache, _prompt_cache_time
+    global _prompt_cache, _prompt_cache_time, _prompt_compiled
     _prompt_cache = {}
+    _prompt_compiled = {}
     _prompt_cache_time = 0
 
 
+def clear_growth_stage_cache():
+    """성장단계 구간 인덱스 강제 초기화"""
+    global _stage_index, _stage_index_time
+    _stage_index = None
+    _stage_index_time = 0
+
+
 def clear_all_cache():
-    """모든 캐시 초기화"""
+    """모든 캐시 초기화 (등록된 리스너 포함, 이 워커만)"""
     clear_config_cache()
     clear_prompt_cache()
+    clear_growth_stage_cache()
+    for fn in _cache_listeners:
+        try:
+            fn()
+        except Exception:
+            pass